@@ -0,0 +1,258 @@
+"""Minimal mpv stand-in speaking the JSON IPC subset Rikka uses.
+
+Accepts mpv's command line, serves --input-ipc-server and answers
+get_property time-pos/duration. The first frame (playback-restart) shows up
+after RIKKA_FAKE_MPV_FIRST_FRAME seconds, followed by RIKKA_FAKE_MPV_STALLS
+short paused-for-cache stalls, and cache-speed reports
+RIKKA_FAKE_MPV_BANDWIDTH bytes/s; observed properties get property-change
+events and seek commands answer with seek + playback-restart. Playback
+"ends" (end-file, reason eof) after RIKKA_FAKE_MPV_PLAY seconds, or never
+when unset/0. URLs containing "fail403" fail to load like an expired stream
+link.
+
+Several files (each in a --{ url --start=.. --} group) play as a playlist:
+every entry gets its own first frame and play time, ends with an end-file
+carrying playlist_entry_id and moves playlist-pos on; playlist-next skips
+to the next entry (end-file reason stop).
+
+benchmarks.fakes.install_fake_mpv() puts it on PATH as "mpv".
+"""
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+DURATION = 1440.0
+CACHE_SECONDS = 12.5
+STALL_SECONDS = 0.05
+
+class FakeMPV:
+    def __init__(self, playlist: list, ipc_path: str, play_for: float = 0.0,
+                 first_frame: float = 0.05, stalls: int = 0, bandwidth: int = 2_000_000):
+        self.playlist = playlist or [("", 0.0)]
+        self.pos = 0
+        self.url, self.start = self.playlist[0]
+        self.ipc_path = ipc_path
+        self.play_for = play_for
+        self.first_frame = first_frame
+        self.stalls = stalls
+        self.bandwidth = bandwidth
+        self.observed = {}
+        self.started = time.monotonic()
+        self.clients = []
+        self.lock = threading.Lock()
+        self.connected = threading.Event()
+        self.skip = threading.Event()
+        self.done = threading.Event()
+
+    def position(self) -> float:
+        return self.start + time.monotonic() - self.started
+
+    def broadcast(self, msg: dict):
+        raw = json.dumps(msg).encode() + b"\n"
+        with self.lock:
+            for client in self.clients:
+                try:
+                    client.sendall(raw)
+                except OSError:
+                    pass
+
+    def end_file(self, reason: str, file_error: str = None):
+        msg = {"event": "end-file", "reason": reason, "playlist_entry_id": self.pos + 1}
+        if file_error:
+            msg["file_error"] = file_error
+        self.broadcast(msg)
+
+    def finish(self, reason: str, file_error: str = None):
+        self.end_file(reason, file_error)
+        self.done.set()
+
+    def next_entry(self, reason: str, file_error: str = None):
+        self.end_file(reason, file_error)
+        self.pos += 1
+        self.url, self.start = self.playlist[self.pos]
+        self.started = time.monotonic()
+        self.property_changed("playlist-pos", self.pos)
+
+    def properties(self) -> dict:
+        return {
+            "time-pos": self.position(),
+            "duration": DURATION,
+            "path": self.url,
+            "paused-for-cache": False,
+            "demuxer-cache-duration": CACHE_SECONDS,
+            "frame-drop-count": 0,
+            "cache-speed": self.bandwidth,
+            "playlist-pos": self.pos,
+            "playlist-count": len(self.playlist),
+        }
+
+    def property_changed(self, name: str, value):
+        for observe_id, observed in list(self.observed.items()):
+            if observed == name:
+                self.broadcast({"event": "property-change", "id": observe_id, "name": name, "data": value})
+
+    def seek(self):
+        self.broadcast({"event": "seek"})
+        time.sleep(STALL_SECONDS)
+        self.broadcast({"event": "playback-restart"})
+
+    def reply(self, command: list, request_id: int) -> dict:
+        name = command[0] if command else None
+        if name == "get_property":
+            values = self.properties()
+            if command[1] not in values:
+                return {"error": "property unavailable", "request_id": request_id}
+            return {"data": values[command[1]], "error": "success", "request_id": request_id}
+
+        if name == "observe_property":
+            self.observed[command[1]] = command[2]
+            value = self.properties().get(command[2])
+            threading.Thread(target=self.property_changed, args=(command[2], value), daemon=True).start()
+
+        if name == "seek":
+            threading.Thread(target=self.seek, daemon=True).start()
+
+        if name == "playlist-next" and self.pos < len(self.playlist) - 1:
+            self.skip.set()
+
+        if name == "quit":
+            threading.Thread(target=self.finish, args=("quit",), daemon=True).start()
+        return {"error": "success", "request_id": request_id}
+
+    def handle(self, client: socket.socket):
+        buffer = b""
+        while not self.done.is_set():
+            try:
+                data = client.recv(4096)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if not data:
+                break
+
+            buffer += data
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                try:
+                    msg = json.loads(line)
+                except ValueError:
+                    continue
+                response = self.reply(msg.get("command", []), msg.get("request_id", 0))
+                with self.lock:
+                    client.sendall(json.dumps(response).encode() + b"\n")
+
+    def play_entry(self):
+        """Play the current entry, returns its end-file reason or None if it plays until quit"""
+        if "fail403" in self.url:
+            time.sleep(0.05)
+            self.broadcast({"event": "log-message", "level": "error", "text": "HTTP error 403 Forbidden\n"})
+            return "error"
+
+        time.sleep(self.first_frame)
+        self.broadcast({"event": "playback-restart"})
+        for _ in range(self.stalls):
+            time.sleep(STALL_SECONDS)
+            self.property_changed("paused-for-cache", True)
+            time.sleep(STALL_SECONDS)
+            self.property_changed("paused-for-cache", False)
+
+        while not self.done.is_set():
+            remaining = self.play_for - (time.monotonic() - self.started) if self.play_for > 0 else 0.1
+            if self.skip.wait(max(0.0, min(remaining, 0.1))):
+                self.skip.clear()
+                return "stop"
+            if self.play_for > 0 and remaining <= 0.1:
+                return "eof"
+        return None
+
+    def clock(self):
+        self.connected.wait(5)
+        while True:
+            reason = self.play_entry()
+            if reason is None or self.done.is_set():
+                return
+
+            file_error = "loading failed" if reason == "error" else None
+            if self.pos == len(self.playlist) - 1:
+                self.finish(reason, file_error)
+                return
+            self.next_entry(reason, file_error)
+
+    def serve(self):
+        if os.path.exists(self.ipc_path):
+            os.unlink(self.ipc_path)
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.ipc_path)
+        server.listen(4)
+        server.settimeout(0.1)
+        threading.Thread(target=self.clock, daemon=True).start()
+
+        try:
+            while not self.done.is_set():
+                try:
+                    client, _ = server.accept()
+                except socket.timeout:
+                    continue
+                client.settimeout(0.1)
+                with self.lock:
+                    self.clients.append(client)
+                self.connected.set()
+                threading.Thread(target=self.handle, args=(client,), daemon=True).start()
+
+            time.sleep(0.05)
+        finally:
+            server.close()
+            with self.lock:
+                for client in self.clients:
+                    client.close()
+
+def parse_playlist(argv) -> tuple:
+    """(url, start) entries and the IPC path from an mpv command line"""
+    playlist, ipc_path, start, group = [], None, 0.0, None
+    for arg in argv:
+        if arg == "--{":
+            group = {"url": "", "start": None}
+        elif arg == "--}":
+            playlist.append(group)
+            group = None
+        elif arg.startswith("--input-ipc-server="):
+            ipc_path = arg.split("=", 1)[1]
+        elif arg.startswith("--start="):
+            value = float(arg.split("=", 1)[1] or 0)
+            if group is not None:
+                group["start"] = value
+            else:
+                start = value
+        elif not arg.startswith("-"):
+            if group is not None:
+                group["url"] = arg
+            else:
+                playlist.append({"url": arg, "start": None})
+
+    # Files without a --start of their own use the global one
+    return [(entry["url"], start if entry["start"] is None else entry["start"]) for entry in playlist], ipc_path
+
+def main(argv) -> int:
+    playlist, ipc_path = parse_playlist(argv)
+
+    if not ipc_path:
+        print("fake mpv: --input-ipc-server is required", file=sys.stderr)
+        return 2
+
+    env = os.environ.get
+    FakeMPV(
+        playlist, ipc_path,
+        play_for=float(env("RIKKA_FAKE_MPV_PLAY") or 0),
+        first_frame=float(env("RIKKA_FAKE_MPV_FIRST_FRAME") or 0.05),
+        stalls=int(env("RIKKA_FAKE_MPV_STALLS") or 0),
+        bandwidth=int(env("RIKKA_FAKE_MPV_BANDWIDTH") or 2_000_000),
+    ).serve()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,146 @@
+"""Provider and mpv stand-ins shared by the benchmark scripts."""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from anipy_api.provider import (
+    LanguageTypeEnum,
+    ProviderInfoResult,
+    ProviderSearchResult,
+    ProviderStream,
+)
+
+
+def isolate_dirs() -> str:
+    """Point Rikka's cache/config/data/log/runtime (sockets) dirs at a throwaway directory"""
+    root = tempfile.mkdtemp(prefix="rikka-bench-")
+    for var in ("XDG_CACHE_HOME", "XDG_CONFIG_HOME", "XDG_DATA_HOME", "XDG_STATE_HOME", "XDG_RUNTIME_DIR"):
+        os.environ[var] = os.path.join(root, var.lower())
+    return root
+
+def install_fake_mpv() -> str:
+    """Put benchmarks/fake_mpv.py on PATH as "mpv" so the real MPVControl can be driven"""
+    bin_dir = tempfile.mkdtemp(prefix="rikka-mpv-")
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_mpv.py")
+    shim = os.path.join(bin_dir, "mpv")
+    with open(shim, "w") as f:
+        f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n')
+    os.chmod(shim, 0o755)
+
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+    return bin_dir
+
+class FakeProvider:
+    """In-memory anipy provider with configurable size and latency."""
+    BASE_URL = "https://fake.invalid"
+
+    def __init__(self, name: str = "fake", results: int = 50, episodes: int = 12, latency: float = 0.0,
+                 ids_per_query: bool = False, dub_episodes: int = 0):
+        self.NAME = name
+        self.results = results
+        self.episodes = episodes
+        self.dub_episodes = dub_episodes  # shows also list DUB, with only this many episodes dubbed
+        self.latency = latency
+        self.ids_per_query = ids_per_query  # every query finds different shows (memory soak)
+        self.calls = 0
+
+    def _wait(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_search(self, query, filters=None):
+        self._wait()
+        return [
+            ProviderSearchResult(
+                f"{self.NAME}-{query}-{i}" if self.ids_per_query else f"{self.NAME}-{i}",
+                f"{query} {i}",
+                {LanguageTypeEnum.SUB, LanguageTypeEnum.DUB} if self.dub_episodes else {LanguageTypeEnum.SUB},
+            )
+            for i in range(self.results)
+        ]
+
+    def get_info(self, identifier):
+        self._wait()
+        return ProviderInfoResult(name=f"Show {identifier}", synopsis="<p>A show.</p>", release_year=2024)
+
+    def get_episodes(self, identifier, lang):
+        self._wait()
+        if lang == LanguageTypeEnum.DUB:
+            return list(range(1, self.dub_episodes + 1))
+        return list(range(1, self.episodes + 1))
+
+    def get_video(self, identifier, episode, lang):
+        self._wait()
+        expires = int(time.time()) + 3600
+        return [
+            ProviderStream(
+                url=f"https://cdn.fake.invalid/{identifier}/{lang.value}/{episode}/{res}.m3u8?expires={expires}",
+                resolution=res,
+                episode=episode,
+                language=lang,
+                referrer="https://fake.invalid",
+            )
+            for res in (480, 720, 1080)
+        ]
+
+class FakePlayer:
+    """MPVControl stand-in that never spawns a process.
+
+    Like MPVControl, callbacks are captured at launch, so finish() and
+    report_progress() act for the launch they belong to.
+    """
+
+    def __init__(self, launch_delay: float = 0.0):
+        self.launch_delay = launch_delay
+        self.running = False
+        self.on_exit = None
+        self.on_load_error = None
+        self.on_entry_change = None
+        self.load_error = None
+        self.current_duration = None
+        self.launches = []
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._on_exit = None
+        self._progress = None
+
+    def launch(self, url, start_time=0, extra_args=None):
+        if self.launch_delay:
+            time.sleep(self.launch_delay)
+        with self._lock:
+            self.generation += 1
+            self.launches.append((url, start_time))
+            self._on_exit = self.on_exit
+            self._progress = None
+            self.running = True
+        return True
+
+    def launch_playlist(self, entries, extra_args=None):
+        """Only the first entry plays, the rest of the playlist is never reached"""
+        return self.launch(entries[0].url, entries[0].start_time, extra_args)
+
+    def start_progress_tracker(self, callback, interval=10):
+        self._progress = callback
+
+    def get_elapsed_time(self):
+        return 0
+
+    def report_progress(self, elapsed: int, duration: int = 1440):
+        """Pretend the progress tracker fired"""
+        callback = self._progress
+        if callback:
+            callback(elapsed, duration)
+
+    def finish(self):
+        """Pretend mpv reached the end of the file"""
+        with self._lock:
+            on_exit, self._on_exit = self._on_exit, None
+            self.running = False
+        if on_exit:
+            on_exit()
+
+    def close(self):
+        self.running = False
@@ -0,0 +1,119 @@
+"""Memory over a long headless TUI session.
+
+Drives the real app against a fake provider: every round searches for a new
+query (so new shows keep arriving), opens a few of the results' episode
+lists and goes back, then visits continue watching. Memory is traced
+(tracemalloc) from the start and sampled after a gc every few rounds once
+warmed up, i.e. once the pooled screens and capped caches are full; from
+there on it should stay flat.
+
+    python -m benchmarks.memory_soak --rounds 100 --budget-kib 1024   # exits 1 over budget
+"""
+import argparse
+import asyncio
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from benchmarks.fakes import FakePlayer, FakeProvider, isolate_dirs
+
+isolate_dirs()
+
+from textual.widgets import Input, ListView  # noqa: E402
+
+from src.rikka.app import Rikka  # noqa: E402
+from src.rikka.backend.backend import AnimeBackend  # noqa: E402
+from src.rikka.screens.continue_watching import ContinueWatchingScreen  # noqa: E402
+from src.rikka.screens.episode_view import EpisodeDetailScreen  # noqa: E402
+from src.rikka.screens.home import Home  # noqa: E402
+from src.rikka.screens.search import SearchScreen  # noqa: E402
+
+RESULTS = 40
+OPENED_PER_ROUND = 3
+TIMEOUT = 60
+
+async def wait_until(predicate, timeout: float = TIMEOUT):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("soak condition never became true")
+        await asyncio.sleep(0.005)
+
+def traced_kib() -> float:
+    gc.collect()
+    return round(tracemalloc.get_traced_memory()[0] / 1024, 1)
+
+async def soak(rounds: int, warmup: int, sample_every: int) -> dict:
+    backend = AnimeBackend(
+        providers=[FakeProvider(results=RESULTS, ids_per_query=True)], player=FakePlayer()
+    )
+    backend.cache.clear()
+    app = Rikka(backend=backend)
+    samples = []
+
+    async with app.run_test() as pilot:
+        for n in range(rounds):
+            await pilot.press("s")
+            await wait_until(lambda: isinstance(app.screen, SearchScreen))
+            search = app.screen
+            results = search.query_one("#search_results", ListView)
+
+            search.query_one("#search_input", Input).value = f"soak {n}"
+            await search.query_one("#search_input", Input).action_submit()
+            await app.workers.wait_for_complete()
+            await wait_until(lambda: len(results.children) == RESULTS)
+
+            for i in range(OPENED_PER_ROUND):
+                results.focus()
+                results.index = (n + i) % RESULTS
+                await pilot.pause()
+                await pilot.press("enter")
+                await wait_until(lambda: isinstance(app.screen, EpisodeDetailScreen))
+                await app.workers.wait_for_complete()
+                await pilot.press("escape")
+                await wait_until(lambda: app.screen is search)
+
+            await pilot.press("escape")
+            await wait_until(lambda: isinstance(app.screen, Home))
+            await pilot.press("c")
+            await wait_until(lambda: isinstance(app.screen, ContinueWatchingScreen))
+            await app.workers.wait_for_complete()
+            await pilot.press("escape")
+            await wait_until(lambda: isinstance(app.screen, Home))
+
+            if n >= warmup and (n - warmup) % sample_every == 0:
+                samples.append({"round": n, "traced_kib": traced_kib()})
+
+        pool = app.screen_pool.stats()
+        caches = backend.memory_stats()
+
+    backend.close()
+    return {"samples": samples, "pool": pool, "caches": caches}
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=30, help="Rounds before the first sample (caches fill up)")
+    parser.add_argument("--sample-every", type=int, default=10)
+    parser.add_argument("--budget-kib", type=float, default=1024.0, help="Allowed traced growth after warmup")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    tracemalloc.start()
+    report = asyncio.run(soak(args.rounds, args.warmup, args.sample_every))
+    samples = report["samples"]
+    report["growth_kib"] = round(samples[-1]["traced_kib"] - samples[0]["traced_kib"], 1) if samples else 0.0
+    report["budget_kib"] = args.budget_kib
+    report["seconds"] = round(time.perf_counter() - start, 1)
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+    if report["growth_kib"] > args.budget_kib:
+        print(f"Traced memory grew {report['growth_kib']} KiB, over budget ({args.budget_kib} KiB)", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""Select-episode to first-frame latency, end to end, per stage.
+
+Runs the real TUI headlessly against a fake provider and the fake mpv
+(benchmarks/fake_mpv.py), presses Enter on an episode and times every hop
+until mpv reports its first frame (playback-restart):
+
+    dispatch      Enter -> get_episode_stream starts (key handling, worker, scheduler)
+    stream        get_episode_stream (provider get_video, stream selection)
+    history       stream resolved -> watch_history.get_entry done
+    play_dispatch history -> play_episode starts
+    prepare       play_episode -> MPVControl.launch (session, cache profile, args)
+    spawn         MPVControl.launch -> mpv process started
+    ipc_connect   mpv started -> IPC socket connected
+    first_frame   IPC connected -> playback-restart
+
+Every run plays a different episode so no stream comes from the cache. The
+median of each stage is checked against its budget:
+
+    python -m benchmarks.playback_bench --runs 7
+    python -m benchmarks.playback_bench --budget ipc_connect=100 --budget total=400   # exits 1 over budget
+"""
+import argparse
+import asyncio
+import functools
+import json
+import statistics
+import sys
+import time
+
+from benchmarks.fakes import FakeProvider, install_fake_mpv, isolate_dirs
+
+isolate_dirs()
+install_fake_mpv()
+
+from textual.widgets import ListView  # noqa: E402
+
+from src.rikka.app import Rikka  # noqa: E402
+from src.rikka.backend.backend import AnimeBackend  # noqa: E402
+from src.rikka.screens.episode_view import EpisodeDetailScreen  # noqa: E402
+
+STAGES = (
+    ("dispatch", "enter", "stream_start"),
+    ("stream", "stream_start", "stream_end"),
+    ("history", "stream_end", "history_end"),
+    ("play_dispatch", "history_end", "play_start"),
+    ("prepare", "play_start", "launch_start"),
+    ("spawn", "launch_start", "connect_start"),
+    ("ipc_connect", "connect_start", "connect_end"),
+    ("first_frame", "connect_end", "first_frame"),
+    ("total", "enter", "first_frame"),
+)
+# Roughly twice the medians against the fake mpv, whose ~80 ms interpreter start lands in ipc_connect
+BUDGETS_MS = {
+    "dispatch": 25,
+    "stream": 50,
+    "history": 25,
+    "play_dispatch": 25,
+    "prepare": 25,
+    "spawn": 25,
+    "ipc_connect": 175,
+    "first_frame": 100,
+    "total": 300,
+}
+TIMEOUT = 30
+
+class StageClock:
+    """First time each mark is reached, from any thread"""
+
+    def __init__(self):
+        self.marks = {}
+
+    def mark(self, name: str):
+        self.marks.setdefault(name, time.perf_counter())
+
+    def wrap(self, obj, method: str, start: str, end: str):
+        fn = getattr(obj, method)
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            self.mark(start)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.mark(end)
+
+        setattr(obj, method, timed)
+
+    def stages(self) -> dict:
+        return {
+            stage: round((self.marks[end] - self.marks[start]) * 1000, 2)
+            for stage, start, end in STAGES
+        }
+
+def instrument(backend: AnimeBackend, clock: StageClock):
+    clock.wrap(backend, "get_episode_stream", "stream_start", "stream_end")
+    clock.wrap(backend.watch_history, "get_entry", "history_start", "history_end")
+    clock.wrap(backend, "play_episode", "play_start", "play_end")
+    clock.wrap(backend.player, "launch", "launch_start", "launch_end")
+    clock.wrap(backend.player, "_connect_to_ipc", "connect_start", "connect_end")
+
+    handle = backend.player._handle_ipc_message
+
+    def watch_first_frame(conn, msg):
+        if msg.get("event") == "playback-restart":
+            clock.mark("first_frame")
+        return handle(conn, msg)
+
+    backend.player._handle_ipc_message = watch_first_frame
+
+async def wait_until(predicate, timeout: float = TIMEOUT):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("benchmark condition never became true")
+        await asyncio.sleep(0.001)
+
+async def bench(runs: int, provider_latency: float) -> list:
+    backend = AnimeBackend(providers=[FakeProvider(episodes=runs + 1, latency=provider_latency)])
+    backend.cache.clear()
+    backend.fullscreen = False
+    show = backend.search_anime("bench")[0]
+
+    clock = StageClock()
+    instrument(backend, clock)
+    app = Rikka(backend=backend)
+    results = []
+
+    async with app.run_test() as pilot:
+        screen = EpisodeDetailScreen(show, backend)
+        await app.push_screen(screen)
+        episode_list = screen.query_one("#episode_list", ListView)
+        await wait_until(lambda: len(episode_list.children) == runs + 1)
+        episode_list.focus()
+
+        for run in range(runs):
+            episode_list.index = run + 1
+            await pilot.pause()
+
+            clock.marks = {}
+            clock.mark("enter")
+            await pilot.press("enter")
+            await wait_until(lambda: "first_frame" in clock.marks)
+            results.append(clock.stages())
+
+            # Each run starts cold, with the last mpv fully gone
+            process = backend.player.process
+            backend.player.send("quit")
+            await wait_until(lambda: process.poll() is not None)
+            await app.workers.wait_for_complete()
+
+    backend.player.close()
+    backend.close()
+    return results
+
+def parse_budget(value: str) -> tuple:
+    stage, _, ms = value.partition("=")
+    if stage not in BUDGETS_MS or not ms:
+        raise argparse.ArgumentTypeError(f"expected STAGE=MS with STAGE one of {', '.join(BUDGETS_MS)}")
+    return stage, float(ms)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7, help="Episodes played, the median is reported")
+    parser.add_argument("--provider-latency", type=float, default=0.0, help="Seconds per fake provider call")
+    parser.add_argument("--budget", type=parse_budget, action="append", default=[], metavar="STAGE=MS",
+                        help="Override a stage budget (repeatable)")
+    parser.add_argument("--output", help="Also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    budgets = {**BUDGETS_MS, **dict(args.budget)}
+    runs = asyncio.run(bench(args.runs, args.provider_latency))
+    medians = {stage: round(statistics.median(run[stage] for run in runs), 2) for stage, _, _ in STAGES}
+    report = {
+        "median_ms": medians,
+        "max_ms": {stage: max(run[stage] for run in runs) for stage, _, _ in STAGES},
+        "budget_ms": budgets,
+        "runs": len(runs),
+    }
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    over = [stage for stage, ms in medians.items() if ms > budgets[stage]]
+    for stage in over:
+        print(f"{stage}: {medians[stage]} ms, over budget ({budgets[stage]} ms)", file=sys.stderr)
+    return 1 if over else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""Time-to-interactive of the TUI, cold and warm, in fresh processes.
+
+Every run spawns a new interpreter that starts Rikka headless with a
+fake backend and reports, relative to the spawn:
+
+    interactive_ms  Home mounted and taking input
+    restored_ms     the first page of the last session's search results shown
+                    over Home, from the snapshot (warm runs)
+    backend_ms      the backend built by the background startup worker
+    reconciled_ms   restored results matched against a live search
+
+The cold run has no snapshot; it searches and exits from the search screen so
+the app itself writes the snapshot that the warm runs start from.
+
+The budget applies to the warm interactive_ms. Interpreter start, importing
+Textual and its first layout cost the same for any Textual app, so the same is
+timed for an empty one (textual_ms) next to each warm run, and what Rikka adds
+on top of it is reported as warm_over_textual_ms:
+
+    python -m benchmarks.startup_bench --runs 5 --budget-ms 200   # exits 1 over budget
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+RESULTS = 50
+QUERY = "bench"
+TIMEOUT = 60
+
+def fake_backend():
+    """Runs on the startup worker thread, like the real factory it pays for the backend imports"""
+    from benchmarks.fakes import FakePlayer, FakeProvider
+    from src.rikka.backend.backend import AnimeBackend
+
+    return AnimeBackend(providers=[FakeProvider(results=RESULTS)], player=FakePlayer())
+
+async def wait_until(predicate, timeout: float = TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise TimeoutError("benchmark condition never became true")
+        await asyncio.sleep(0.001)
+
+async def child() -> dict:
+    from textual.widgets import Input, ListView
+
+    from src.rikka.app import Rikka
+    from src.rikka.screens.home import Home
+    from src.rikka.screens.search import FIRST_PAGE, SearchScreen
+
+    app = Rikka(backend_factory=fake_backend)
+    warm = app.snapshot.last_screen == "search"
+    marks = {}
+
+    def results():
+        return list(app.screen.query_one("#search_results", ListView).children)
+
+    async def session(pilot):
+        """Textual calls this once the app processes input, i.e. at time-to-interactive"""
+        await wait_until(lambda: isinstance(app.screen, Home) or len(app.screen_stack) > 2)
+        marks["interactive"] = time.monotonic()
+
+        if warm:
+            await wait_until(lambda: isinstance(app.screen, SearchScreen) and len(results()) >= FIRST_PAGE)
+            marks["restored"] = time.monotonic()
+
+        backend = await app.get_backend()
+        marks["backend"] = time.monotonic()
+
+        if warm:
+            await wait_until(lambda: all(getattr(item, "anime", None) for item in results()))
+            marks["reconciled"] = time.monotonic()
+        else:
+            screen = SearchScreen(backend)
+            await app.push_screen(screen)
+            screen.query_one("#search_input", Input).value = QUERY
+            await screen.query_one("#search_input", Input).action_submit()
+            await wait_until(lambda: app.snapshot.find_search(QUERY) is not None)
+
+        await app.workers.wait_for_complete()
+        app.exit()
+
+    # Not run_test(): it waits for the app to go idle before handing over the pilot
+    await app.run_async(headless=True, auto_pilot=session)
+    app.backend.close()
+    return marks
+
+async def empty_child() -> dict:
+    from textual.app import App
+
+    marks = {}
+
+    async def session(pilot):
+        marks["interactive"] = time.monotonic()
+        pilot.app.exit()
+
+    await App().run_async(headless=True, auto_pilot=session)
+    return marks
+
+def spawn(mode: str = "--child") -> dict:
+    start = time.monotonic()
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup_bench", mode],
+        capture_output=True, text=True, timeout=TIMEOUT,
+    )
+    if proc.returncode:
+        raise RuntimeError(f"startup run failed:\n{proc.stderr}")
+
+    marks = json.loads(proc.stdout.strip().splitlines()[-1])
+    return {f"{name}_ms": round((mark - start) * 1000, 1) for name, mark in marks.items()}
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Warm runs, the median is reported")
+    parser.add_argument("--budget-ms", type=float, default=200.0,
+                        help="Warm time-to-interactive budget")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--empty-child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(asyncio.run(child())))
+        return 0
+    if args.empty_child:
+        print(json.dumps(asyncio.run(empty_child())))
+        return 0
+
+    from benchmarks.fakes import isolate_dirs
+    isolate_dirs()
+
+    cold = spawn()
+    # Paired runs, so both sides of each difference see the same machine load
+    warm, empty = [], []
+    for _ in range(args.runs):
+        warm.append(spawn())
+        empty.append(spawn("--empty-child")["interactive_ms"])
+
+    report = {
+        "textual_ms": statistics.median(empty),
+        "cold": cold,
+        "warm": {metric: round(statistics.median(run[metric] for run in warm), 1) for metric in warm[0]},
+        "warm_over_textual_ms": round(
+            statistics.median(run["interactive_ms"] - ms for run, ms in zip(warm, empty)), 1
+        ),
+        "budget_ms": args.budget_ms,
+    }
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+    if report["warm"]["interactive_ms"] > args.budget_ms:
+        print(
+            f"Warm time-to-interactive over budget: {report['warm']['interactive_ms']} ms > {args.budget_ms} ms "
+            f"(an empty Textual app takes {report['textual_ms']} ms, Rikka adds {report['warm_over_textual_ms']} ms)",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""Concurrency stress test for AnimeBackend.
+
+Phase "fake" fires hundreds of mixed operations (search, info, episodes,
+streams, play, mpv exit with auto-next, progress reports, resume) at one
+backend from a thread pool, against FakeProvider/FakePlayer stand-ins.
+Phase "mpv" drives the real MPVControl through benchmarks/fake_mpv.py with
+short episodes, so exits auto-play the next one while other threads keep
+starting playback, some of it alongside in players of its own.
+
+Afterwards it checks that every player has at most one active session and
+that it owns the player, that watch history on disk is intact, and that no
+listener or tracker threads / mpv processes were leaked. Exits 1 on any
+violation.
+
+    python -m benchmarks.stress_backend --ops 500 --workers 32
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import FakePlayer, FakeProvider, install_fake_mpv, isolate_dirs
+
+isolate_dirs()
+
+from src.rikka.backend.backend import AnimeBackend  # noqa: E402
+from src.rikka.backend.mpv_control import MPVControl  # noqa: E402
+
+QUERIES = ("frieren", "bocchi", "mushishi", "haibane", "kaiba")
+MPV_THREAD_PREFIXES = ("mpv-ipc-", "mpv-progress-")
+ALONGSIDE_SHARE = 0.3
+
+def make_backend(player, player_factory=None) -> AnimeBackend:
+    backend = AnimeBackend(
+        providers=[
+            FakeProvider("fake-a", results=20, latency=0.002),
+            FakeProvider("fake-b", results=20, latency=0.005),
+        ],
+        player=player,
+        player_factory=player_factory,
+    )
+    backend.cache.clear()
+    backend.auto_next_episode = True
+    backend.skip_intro_seconds = 0
+    return backend
+
+def record_sessions(backend: AnimeBackend) -> list:
+    """Wrap _start_session so every session the backend creates is kept for the checks"""
+    sessions = []
+    start_session = backend._start_session
+
+    def _recording(*args, **kwargs):
+        session = start_session(*args, **kwargs)
+        if session is not None:
+            sessions.append(session)
+        return session
+
+    backend._start_session = _recording
+    return sessions
+
+def mpv_threads() -> list:
+    return [t for t in threading.enumerate() if t.name.startswith(MPV_THREAD_PREFIXES)]
+
+def fake_mpv_processes() -> int:
+    """Live fake mpv children of this process (Linux only, 0 elsewhere)"""
+    if not os.path.isdir("/proc"):
+        return 0
+
+    count = 0
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                cmdline = f.read()
+        except OSError:
+            continue
+        if fields[0] != "Z" and int(fields[1]) == os.getpid() and b"fake_mpv.py" in cmdline:
+            count += 1
+    return count
+
+def check_sessions(backend: AnimeBackend, sessions: list, problems: list):
+    for player in backend.sessions.players:
+        active = [s for s in sessions if s.active and s.player is player]
+        if len(active) > 1:
+            problems.append(f"{len(active)} playback sessions active on one player: {active}")
+        if active and not backend.sessions.owns(active[0]):
+            problems.append(f"active session {active[0]} does not own its player")
+
+def check_history(backend: AnimeBackend, problems: list):
+    path = backend.watch_history.file_path
+    if not path.exists():
+        return
+
+    try:
+        on_disk = json.loads(path.read_text())
+    except ValueError as e:
+        problems.append(f"watch history on disk is corrupt: {e}")
+        return
+
+    if on_disk != backend.watch_history.history:
+        problems.append("watch history on disk differs from memory")
+    for anime_id, entry in on_disk.items():
+        if set(entry) != {"anime_name", "episode", "timestamp", "total_duration", "last_watched", "progress_percent"}:
+            problems.append(f"malformed history entry for {anime_id}: {entry}")
+
+def run_ops(ops: dict, count: int, workers: int, rng: random.Random) -> list:
+    names = rng.choices(list(ops), k=count)
+    errors = []
+    counts = {}
+
+    def _run(name):
+        try:
+            ops[name]()
+        except Exception as e:
+            errors.append(f"{name}: {type(e).__name__}: {e}")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stress") as pool:
+        for name in names:
+            counts[name] = counts.get(name, 0) + 1
+            pool.submit(_run, name)
+
+    return errors, counts
+
+def fake_phase(count: int, workers: int, rng: random.Random) -> dict:
+    player = FakePlayer()
+    backend = make_backend(player)
+    sessions = record_sessions(backend)
+    anime = backend.search_anime(QUERIES[0])
+
+    def play():
+        show = rng.choice(anime)
+        episode = rng.randint(1, 12)
+        stream = backend.get_episode_stream(show, episode, 720)
+        backend.play_episode(show, episode, stream, start_time=rng.randint(0, 600))
+
+    def resume():
+        entries = backend.get_continue_watching_list(5)
+        if entries:
+            backend.resume_anime(rng.choice(entries)["anime_id"])
+
+    ops = {
+        "search": lambda: backend.search_anime(rng.choice(QUERIES)),
+        "info": lambda: backend.get_info(rng.choice(anime)),
+        "episodes": lambda: backend.get_episodes(rng.choice(anime)),
+        "stream": lambda: backend.get_episode_stream(rng.choice(anime), rng.randint(1, 12), 720),
+        "play": play,
+        "finish": player.finish,
+        "progress": lambda: player.report_progress(rng.randint(10, 1300)),
+        "resume": resume,
+        "continue": lambda: backend.get_continue_watching_list(10),
+        "prefetch_resume": lambda: backend.prefetch_resume(3),
+    }
+
+    start = time.perf_counter()
+    errors, counts = run_ops(ops, count, workers, rng)
+    elapsed = time.perf_counter() - start
+
+    problems = list(errors)
+    check_sessions(backend, sessions, problems)
+    if backend.session and player.launches[-1][0] != backend.session.url:
+        problems.append("the player is not playing the current session's stream")
+    check_history(backend, problems)
+    backend.close()
+
+    return {
+        "ops": counts,
+        "seconds": round(elapsed, 3),
+        "sessions": len(sessions),
+        "launches": len(player.launches),
+        "problems": problems,
+    }
+
+def mpv_phase(launches: int, workers: int, rng: random.Random) -> dict:
+    install_fake_mpv()
+    os.environ["RIKKA_FAKE_MPV_PLAY"] = "0.3"
+
+    backend = make_backend(MPVControl(), player_factory=MPVControl)
+    backend.save_progress_interval = 0.1
+    sessions = record_sessions(backend)
+    anime = backend.search_anime(QUERIES[1])
+    peak_threads = 0
+    stop = threading.Event()
+
+    def sample_threads():
+        nonlocal peak_threads
+        while not stop.is_set():
+            peak_threads = max(peak_threads, len(mpv_threads()))
+            time.sleep(0.01)
+
+    def play():
+        show = rng.choice(anime)
+        episode = rng.randint(1, 11)
+        alongside = rng.random() < ALONGSIDE_SHARE
+        backend.play_episode(show, episode, backend.get_episode_stream(show, episode, 720), alongside=alongside)
+        time.sleep(rng.uniform(0, 0.4))
+
+    sampler = threading.Thread(target=sample_threads, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    errors, _ = run_ops({"play": play}, launches, workers, rng)
+    time.sleep(1.0)  # let the last episodes end and auto-next
+    elapsed = time.perf_counter() - start
+
+    problems = list(errors)
+    check_sessions(backend, sessions, problems)
+    check_history(backend, problems)
+    players = backend.sessions.players
+    generations = sum(player.generation for player in players)
+
+    for player in players:
+        player.close()
+    deadline = time.monotonic() + 3
+    while (mpv_threads() or fake_mpv_processes()) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    stop.set()
+
+    if mpv_threads():
+        problems.append(f"leaked mpv threads: {[t.name for t in mpv_threads()]}")
+    if fake_mpv_processes():
+        problems.append(f"{fake_mpv_processes()} mpv processes still running")
+    if peak_threads > 4 * len(players):
+        problems.append(f"{peak_threads} mpv listener/tracker threads alive at once")
+    backend.close()
+
+    return {
+        "seconds": round(elapsed, 3),
+        "sessions": len(sessions),
+        "launches": generations,
+        "players": len(players),
+        "peak_mpv_threads": peak_threads,
+        "problems": problems,
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=500, help="Operations in the fake phase")
+    parser.add_argument("--launches", type=int, default=20, help="play_episode calls in the mpv phase")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--skip-mpv", action="store_true", help="Only run the fake phase")
+    args = parser.parse_args(argv)
+
+    seed = args.seed if args.seed is not None else random.randrange(1 << 30)
+    rng = random.Random(seed)
+    report = {"seed": seed, "fake": fake_phase(args.ops, args.workers, rng)}
+    if not args.skip_mpv and sys.platform != "win32":
+        report["mpv"] = mpv_phase(args.launches, min(args.workers, 8), rng)
+
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 1 if any(phase["problems"] for phase in report.values() if isinstance(phase, dict)) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
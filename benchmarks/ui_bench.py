@@ -0,0 +1,221 @@
+"""Headless TUI benchmarks.
+
+Mounts the real screens through Textual's run_test() pilot against fake
+providers and measures time-to-first-paint, time-to-fully-populated and
+keypress-to-response latency for 50/500/5000 item lists.
+
+    python -m benchmarks.ui_bench --output bench.json
+    python -m benchmarks.ui_bench --compare bench.json   # exits 1 on regressions
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+
+from benchmarks.fakes import FakePlayer, FakeProvider, isolate_dirs
+
+isolate_dirs()
+
+import textual  # noqa: E402
+from textual.widgets import Button, Input, ListView  # noqa: E402
+
+from src.rikka.app import Rikka  # noqa: E402
+from src.rikka.backend.backend import AnimeBackend  # noqa: E402
+from src.rikka.screens.continue_watching import ContinueWatchingScreen  # noqa: E402
+from src.rikka.screens.episode_view import EpisodeDetailScreen  # noqa: E402
+from src.rikka.screens.home import Home  # noqa: E402
+from src.rikka.screens.search import SearchScreen  # noqa: E402
+
+SIZES = (50, 500, 5000)
+KEYPRESSES = 20
+TIMEOUT = 120
+
+def ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+def make_backend(results: int = 50, episodes: int = 12, history: int = 0) -> AnimeBackend:
+    backend = AnimeBackend(
+        providers=[FakeProvider(results=results, episodes=episodes)],
+        player=FakePlayer(),
+    )
+    backend.cache.clear()
+    backend.watch_history.history = {
+        f"fake-{i}": {
+            "anime_name": f"Show {i}",
+            "episode": 3,
+            "timestamp": 600,
+            "total_duration": 1400,
+            "last_watched": f"2024-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}",
+            "progress_percent": 42.9,
+        }
+        for i in range(history)
+    }
+    return backend
+
+async def wait_until(predicate, timeout: float = TIMEOUT):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("benchmark condition never became true")
+        await asyncio.sleep(0.001)
+
+async def push_and_paint(app, pilot, screen) -> float:
+    start = time.perf_counter()
+    await app.push_screen(screen)
+    await pilot.pause()
+    return time.perf_counter() - start
+
+async def keypress_latency(pilot, list_view: ListView, presses: int = KEYPRESSES):
+    list_view.focus()
+    await pilot.pause()
+    samples = []
+    for _ in range(presses):
+        before = list_view.index
+        start = time.perf_counter()
+        await pilot.press("down")
+        await wait_until(lambda: list_view.index != before)
+        samples.append(time.perf_counter() - start)
+
+    samples.sort()
+    return {
+        "keypress_p50_ms": ms(statistics.median(samples)),
+        "keypress_p95_ms": ms(samples[int(0.95 * (len(samples) - 1))]),
+    }
+
+async def bench_home(_size: int) -> dict:
+    backend = make_backend()
+    app = Rikka(backend=backend)
+    start = time.perf_counter()
+    async with app.run_test() as pilot:
+        await wait_until(lambda: isinstance(app.screen, Home))
+        await pilot.pause()
+        result = {"first_paint_ms": ms(time.perf_counter() - start)}
+    backend.close()
+    return result
+
+async def bench_search(size: int) -> dict:
+    backend = make_backend(results=size)
+    app = Rikka(backend=backend)
+    async with app.run_test() as pilot:
+        screen = SearchScreen(backend)
+        result = {"first_paint_ms": ms(await push_and_paint(app, pilot, screen))}
+        list_view = screen.query_one("#search_results", ListView)
+
+        search_input = screen.query_one("#search_input", Input)
+        search_input.value = "bench"
+        start = time.perf_counter()
+        # Not pilot.press(): it waits for the app to go idle, i.e. for the whole list
+        await search_input.action_submit()
+        await wait_until(lambda: len(list_view.children) > 0)
+        result["first_result_ms"] = ms(time.perf_counter() - start)
+        await wait_until(lambda: len(list_view.children) >= size)
+        result["populated_ms"] = ms(time.perf_counter() - start)
+
+        result.update(await keypress_latency(pilot, list_view))
+    backend.close()
+    return result
+
+async def bench_episodes(size: int) -> dict:
+    backend = make_backend(episodes=size)
+    anime = backend.search_anime("bench")[0]
+    app = Rikka(backend=backend)
+    async with app.run_test() as pilot:
+        screen = EpisodeDetailScreen(anime, backend)
+        start = time.perf_counter()
+        result = {"first_paint_ms": ms(await push_and_paint(app, pilot, screen))}
+        list_view = screen.query_one("#episode_list", ListView)
+        await wait_until(lambda: len(list_view.children) >= size)
+        result["populated_ms"] = ms(time.perf_counter() - start)
+
+        result.update(await keypress_latency(pilot, list_view))
+    backend.close()
+    return result
+
+async def bench_continue(size: int) -> dict:
+    backend = make_backend(history=size)
+    app = Rikka(backend=backend)
+    async with app.run_test() as pilot:
+        screen = ContinueWatchingScreen(backend)
+        start = time.perf_counter()
+        result = {"first_paint_ms": ms(await push_and_paint(app, pilot, screen))}
+        await wait_until(lambda: len(screen.query(Button)) >= min(size, 10))
+        result["populated_ms"] = ms(time.perf_counter() - start)
+    backend.close()
+    return result
+
+SCENARIOS = {
+    "home": (bench_home, (0,)),
+    "search": (bench_search, SIZES),
+    "episodes": (bench_episodes, SIZES),
+    "continue_watching": (bench_continue, SIZES),
+}
+
+async def run_all(scenarios, sizes, repeat: int) -> dict:
+    results = {}
+    for name in scenarios:
+        fn, default_sizes = SCENARIOS[name]
+        for size in (default_sizes if name == "home" else sizes):
+            runs = [await fn(size) for _ in range(repeat)]
+            for metric in runs[0]:
+                key = f"{name}/{size}/{metric}"
+                results[key] = round(statistics.median(r[metric] for r in runs), 2)
+                print(f"{key:45} {results[key]:>10.2f}", file=sys.stderr)
+    return results
+
+def compare(current: dict, baseline: dict, tolerance: float, floor_ms: float) -> int:
+    """Print a comparison table, return the number of regressions"""
+    regressions = 0
+    print(f"{'metric':45} {'baseline':>10} {'current':>10} {'change':>8}")
+    for key, value in current.items():
+        old = baseline.get(key)
+        if old is None:
+            print(f"{key:45} {'-':>10} {value:>10.2f}")
+            continue
+
+        change = (value - old) / old if old else 0.0
+        regressed = value - old > floor_ms and change > tolerance
+        regressions += regressed
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{key:45} {old:>10.2f} {value:>10.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="*", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--sizes", nargs="*", type=int, default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario, the median is reported")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before flagging (0.2 = 20%%)")
+    parser.add_argument("--floor-ms", type=float, default=5.0, help="Ignore differences smaller than this")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run_all(args.scenarios, args.sizes, args.repeat))
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "textual": textual.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        return 1 if compare(results, baseline, args.tolerance, args.floor_ms) else 0
+
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
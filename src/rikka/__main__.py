@@ -1,20 +1,16 @@
-from textual.app import App
+import sys
 
-from src.rikka.screens.home import Home
-from src.rikka.backend.backend import AnimeBackend
-
-class Rikka(App):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.backend = AnimeBackend()
-
-    def on_mount(self):
-        self.push_screen(Home(self.backend))
-
-app = Rikka()
 
 def run():
-    app.run()
+    if len(sys.argv) > 1:
+        # Only the headless commands pay for importing the backend up front
+        from src.rikka.cli import COMMANDS
+        from src.rikka.cli import main as cli_main
+        if sys.argv[1] in COMMANDS:
+            sys.exit(cli_main(sys.argv[1:]))
+
+    from src.rikka.app import Rikka
+    Rikka().run()
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    run()
@@ -0,0 +1,111 @@
+import asyncio
+from typing import TYPE_CHECKING
+
+from textual import work
+from textual.app import App
+from textual.binding import Binding
+
+from src.rikka.backend.snapshot import CONTINUE_ROWS, Snapshot
+from src.rikka.screens.continue_watching import ContinueWatchingScreen
+from src.rikka.screens.home import Home
+from src.rikka.screens.memory_stats import MemoryStatsScreen
+from src.rikka.screens.playback_stats import PlaybackStatsScreen
+from src.rikka.screens.pool import ScreenPool
+from src.rikka.screens.search import SearchScreen
+from src.rikka.utils import profiling
+from src.rikka.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from src.rikka.backend.backend import AnimeBackend
+
+def default_backend():
+    """The daemon when one runs, else an in-process AnimeBackend (imported here, it drags in anipy)"""
+    from src.rikka.backend.backend import AnimeBackend
+    from src.rikka.backend.daemon import connect
+    return connect() or AnimeBackend()
+
+class Rikka(App):
+    """The TUI. Home and the last session's snapshot paint first, the backend is built in the background."""
+    BINDINGS = [
+        Binding("f7", "memory_stats", "Memory", show=False),
+        Binding("f8", "playback_stats", "Playback stats", show=False),
+        Binding("f9", "toggle_profiling", "Toggle profiling", show=False),
+    ]
+
+    def __init__(self, *args, backend: "AnimeBackend" = None, backend_factory=None, snapshot: Snapshot = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.backend = backend
+        self.backend_factory = backend_factory or default_backend
+        self.snapshot = snapshot or Snapshot()
+        self.screen_pool = ScreenPool(self)
+        self.logger = get_logger("Rikka")
+        self._backend_ready = asyncio.Event()
+
+    def on_mount(self):
+        self.push_screen(Home())
+        # Home paints and takes input first, the last session's screen opens over it right after
+        self.call_after_refresh(self.restore_last_screen)
+
+        if self.backend is None:
+            self.call_after_refresh(self.start_backend)
+        else:
+            self._backend_ready.set()
+
+    def restore_last_screen(self) -> bool:
+        """Reopen the screen the last session ended on, over Home"""
+        if self.snapshot.last_screen == "search" and self.snapshot.latest_search():
+            self.screen_pool.open("search", lambda: SearchScreen(self.backend, recent=self.snapshot.latest_search()))
+
+        elif self.snapshot.last_screen == "continue_watching" and self.snapshot.continue_watching is not None:
+            self.screen_pool.open(
+                "continue_watching", lambda: ContinueWatchingScreen(self.backend, rows=self.snapshot.continue_watching)
+            )
+
+        else:
+            return False
+        return True
+
+    @work(exclusive=True, group='backend', name='BackendStartupWorker')
+    async def start_backend(self) -> None:
+        self.backend = await asyncio.to_thread(self.backend_factory)
+        self._backend_ready.set()
+
+    async def get_backend(self) -> "AnimeBackend":
+        """The backend, waiting for start_backend if it is still being built"""
+        await self._backend_ready.wait()
+        return self.backend
+
+    def save_snapshot(self) -> None:
+        restorable = [s for s in self.screen_stack if isinstance(s, (SearchScreen, ContinueWatchingScreen))]
+        if not restorable:
+            self.snapshot.last_screen = None
+        elif isinstance(restorable[-1], SearchScreen):
+            self.snapshot.last_screen = "search"
+        else:
+            self.snapshot.last_screen = "continue_watching"
+
+        if self.backend is not None:
+            try:
+                self.snapshot.set_continue_watching(self.backend.get_continue_watching_list(limit=CONTINUE_ROWS))
+            except Exception as e:
+                self.logger.error("Failed to read continue watching for the snapshot: %s :/", e)
+
+        self.snapshot.save()
+
+    def exit(self, *args, **kwargs) -> None:
+        self.save_snapshot()
+        super().exit(*args, **kwargs)
+
+    async def action_playback_stats(self) -> None:
+        if not isinstance(self.screen, PlaybackStatsScreen):
+            self.push_screen(PlaybackStatsScreen(await self.get_backend()))
+
+    def action_memory_stats(self) -> None:
+        if not isinstance(self.screen, MemoryStatsScreen):
+            self.push_screen(MemoryStatsScreen())
+
+    def action_toggle_profiling(self) -> None:
+        if profiling.toggle():
+            self.notify(f"Profiling on, reports go to {profiling.get_profile_dir()}", timeout=4)
+        else:
+            self.notify("Profiling off", timeout=2)
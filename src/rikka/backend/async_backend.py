@@ -0,0 +1,98 @@
+import asyncio
+from typing import TYPE_CHECKING
+
+from src.rikka.backend.scheduler import Priority, PriorityScheduler
+from src.rikka.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from src.rikka.backend.backend import AnimeBackend
+
+class AsyncAnimeBackend:
+    """asyncio facade over AnimeBackend.
+
+    Blocking provider I/O runs on the backend's PriorityScheduler: user actions are
+    INTERACTIVE, filling in visible lists VISIBLE and prefetching SPECULATIVE.
+    Cancelling the awaiting task (e.g. when Textual pops the screen that owns the
+    worker) drops the job if it has not started yet.
+    """
+
+    def __init__(self, backend: "AnimeBackend", scheduler: PriorityScheduler):
+        self.backend = backend
+        self.scheduler = scheduler
+        self.logger = get_logger("AsyncAnimeBackend")
+
+    async def _run(self, fn, *args, priority: Priority = Priority.VISIBLE, **kwargs):
+        future = self.scheduler.submit(fn, *args, priority=priority, **kwargs)
+        return await self._wait(future, fn)
+
+    async def _wait(self, future, fn):
+        try:
+            return await asyncio.wrap_future(future)
+
+        except asyncio.CancelledError:
+            if future.cancel():
+                self.logger.debug("Cancelled queued call to %s", fn.__name__)
+            raise
+
+    async def search(self, query: str, priority: Priority = Priority.INTERACTIVE):
+        return await self._run(self.backend.search_anime, query, priority=priority)
+
+    async def iter_search(self, query: str):
+        """Async iterator over the backend's first-responder search batches"""
+        batches = self.backend.iter_search(query)
+        done = object()
+        pending = None
+        try:
+            while True:
+                pending = self.scheduler.submit(next, batches, done, priority=Priority.INTERACTIVE)
+                batch = await self._wait(pending, next)
+                if batch is done:
+                    break
+                yield batch
+
+        finally:
+            if pending is not None and not pending.done():
+                # Cancelled while next() runs on a worker, the generator can only be closed
+                # (cancelling its provider futures) once that call returns
+                pending.add_done_callback(lambda _: batches.close())
+            else:
+                batches.close()
+
+    async def episodes(self, anime):
+        return await self._run(self.backend.get_episodes, anime, priority=Priority.INTERACTIVE)
+
+    async def stream(self, anime, episode, quality=None):
+        quality = quality or self.backend.global_quality
+        return await self._run(self.backend.get_episode_stream, anime, episode, quality, priority=Priority.INTERACTIVE)
+
+    async def info(self, anime, priority: Priority = Priority.VISIBLE):
+        return await self._run(self.backend.get_info, anime, priority=priority)
+
+    async def resume(self, anime_id, quality=None):
+        return await self._run(self.backend.resolve_resume, anime_id, quality, priority=Priority.INTERACTIVE)
+
+    async def continue_watching(self, limit: int = 10):
+        return await self._run(self.backend.get_continue_watching_list, limit)
+
+    async def prefetch_resume(self, limit: int = 3):
+        return await self._run(self.backend.prefetch_resume, limit, priority=Priority.SPECULATIVE)
+
+    async def prefetch(self, anime):
+        return await self._run(self.backend.prefetch_anime, anime, priority=Priority.SPECULATIVE)
+
+    async def prefetch_stream(self, anime, episode):
+        return await self._run(self.backend.prefetch_stream, anime, episode, priority=Priority.SPECULATIVE)
+
+    async def play(self, anime, episode, stream, start_time: int = 0, alongside: bool = False):
+        return await self._run(
+            self.backend.play_episode, anime, episode, stream, start_time, alongside, priority=Priority.INTERACTIVE
+        )
+
+    async def resolve_queue(self, anime, episodes, quality=None):
+        return await self._run(self.backend.resolve_queue, anime, episodes, quality, priority=Priority.INTERACTIVE)
+
+    async def play_queue(self, anime, entries):
+        return await self._run(self.backend.play_queue, anime, entries, priority=Priority.INTERACTIVE)
+
+    async def playback_stats(self):
+        return await self._run(self.backend.get_playback_stats)
@@ -1,35 +1,166 @@
+import functools
+import logging
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import CancelledError, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import asdict
 from pathlib import Path
 from typing import Optional
+
+from anipy_api.anime import Anime
+from anipy_api.provider import LanguageTypeEnum, ProviderStream, get_provider
+from anipy_api.provider.providers.allanime_provider import AllAnimeProvider
 from diskcache import Cache
 from platformdirs import user_cache_dir
 
-from src.rikka.utils.logger import get_logger
-from src.rikka.utils.general import get_referrer_for_url
-from src.rikka.backend.mpv_control import MPVControl
-from src.rikka.backend.watch_history import WatchHistory
+from src.rikka.backend import cache_profiles, records
+from src.rikka.backend.async_backend import AsyncAnimeBackend
+from src.rikka.backend.http_session import (
+    build_session,
+    inject_session,
+    session_stats,
+    with_deadline,
+)
+from src.rikka.backend.mpv_control import MPVControl, PlaylistEntry, cleanup_orphaned_sockets
+from src.rikka.backend.playback import MAX_SESSIONS, PlaybackManager, PlaybackSession
+from src.rikka.backend.provider_pool import ProviderProcessPool
+from src.rikka.backend.resilience import CircuitOpenError, ResilientCaller
+from src.rikka.backend.scheduler import Priority, PriorityScheduler
 from src.rikka.backend.settings_control import AnimeSettings
+from src.rikka.backend.stream_cache import StreamCache
+from src.rikka.backend.telemetry import Telemetry, stream_host
+from src.rikka.backend.watch_history import WatchHistory
+from src.rikka.utils.general import get_referrer_for_url
+from src.rikka.utils.logger import configure_log_levels, get_logger
+from src.rikka.utils.lru import LRUDict
+from src.rikka.utils.profiling import profiled
 
-from anipy_api.anime import Anime
-from anipy_api.provider import ProviderStream, LanguageTypeEnum
-from anipy_api.provider.providers.allanime_provider import AllAnimeProvider
+ANIME_REGISTRY_SIZE = 512
+DEFAULT_LANGUAGES = (LanguageTypeEnum.SUB, LanguageTypeEnum.DUB)
+
+_YEAR_RE = re.compile(r"[(\[]((?:19|20)\d{2})[)\]]")
+
+def build_provider(name: str):
+    """Instantiate an anipy provider by name, None if it is unknown"""
+    if name == AllAnimeProvider.NAME:
+        return AllAnimeProvider()
+
+    return get_provider(name)
+
+def dedup_key(name: str):
+    """Normalized (title, year) key used to merge results across providers"""
+    match = _YEAR_RE.search(name)
+    year = int(match.group(1)) if match else None
+
+    title = _YEAR_RE.sub("", name)
+    title = unicodedata.normalize("NFKD", title).casefold()
+    title = "".join(c if c.isalnum() else " " for c in title)
+    return " ".join(title.split()), year
+
+def parse_languages(names) -> list:
+    """Preferred languages, in order, from the languages setting (unknown names are skipped)"""
+    languages = []
+    for name in names or ():
+        try:
+            lang = LanguageTypeEnum(str(name).lower())
+        except ValueError:
+            continue
+        if lang not in languages:
+            languages.append(lang)
+    return languages or list(DEFAULT_LANGUAGES)
 
 class AnimeBackend:
-    def __init__(self, settings: AnimeSettings = None):
+    def __init__(self, settings: AnimeSettings = None, providers=None, player: MPVControl = None,
+                 player_factory=None):
+        """providers and player can be injected (benchmarks, stand-ins), otherwise they come from settings.
+
+        player_factory makes the players of sessions played alongside; an injected player
+        without one means a single player.
+        """
         self.logger = get_logger("AnimeBackend")
         cache_dir = Path(user_cache_dir("Rikka"))
         cache_dir.mkdir(parents=True, exist_ok=True)
 
         self.cache_path = str(cache_dir / "cache_data")
         self.cache = Cache(self.cache_path)
-        self.provider = AllAnimeProvider()
         self.watch_history = WatchHistory()
-        self.player = MPVControl()
-        self.current_anime = None
-        self.current_episode = None
+        self.telemetry = Telemetry(self.watch_history.data_dir)
+        if player is None:
+            player, player_factory = MPVControl(), player_factory or MPVControl
+            removed = cleanup_orphaned_sockets()
+            if removed:
+                self.logger.info("Removed %s orphaned mpv sockets", removed)
+        self.player = player
+        self.sessions = PlaybackManager(player, player_factory)
+        # Guards the playback session and player callbacks, and the provider registry
+        self._lock = threading.RLock()
+        # Per player, serialises launches outside self._lock in the order sessions took the player
+        self._launch_locks = {}
+        # Telemetry of sessions ended under self._lock, written by _flush_telemetry once it is released
+        self._pending_telemetry = []
+
+        # Anime seen in searches and history lookups, capped so a long session stays flat
+        self._anime_by_id = LRUDict(ANIME_REGISTRY_SIZE)
+        self.stream_cache = StreamCache()
 
         self.settings = settings or AnimeSettings()
         s = self.settings
+        self._apply_settings()
+
+        http_config = {
+            "pool_size": s.get("http_pool_size", 10),
+            "connect_timeout": s.get("http_connect_timeout", 5),
+            "read_timeout": s.get("http_read_timeout", 20),
+            "retries": s.get("http_retries", 1),
+            "rate_limit": s.get("http_rate_limit", 8),
+            "rate_burst": s.get("http_rate_burst", 16),
+            "host_concurrency": s.get("http_host_concurrency", 6),
+            "host_limits": s.get("http_host_limits") or {},
+        }
+        self.http = build_session(**http_config)
+        self.resilience = ResilientCaller(
+            hedge_min_delay=s.get("hedge_min_delay", 1.0),
+            failure_threshold=s.get("breaker_failure_threshold", 5),
+            reset_timeout=s.get("breaker_reset_seconds", 30),
+        )
+        self.providers = list(providers or self._load_providers(s.get("providers") or [AllAnimeProvider.NAME]))
+        self.provider = self.providers[0]
+        self._providers_by_name = {p.NAME: p for p in self.providers}
+        for provider in self.providers:
+            self._share_session(provider)
+
+        self.process_pool = None
+        if s.get("provider_processes", 0) > 0 and providers is None:
+            self.process_pool = ProviderProcessPool(s.get("provider_processes"), http_config)
+
+        self.scheduler = PriorityScheduler(s.get("io_workers", 4), s.get("background_workers"))
+        self.aio = AsyncAnimeBackend(self, self.scheduler)
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("AnimeBackend ready with settings: %s", s.get_all())
+
+    @property
+    def session(self) -> Optional[PlaybackSession]:
+        """The foreground playback session, the last one started"""
+        return self.sessions.foreground
+
+    @property
+    def current_anime(self):
+        return self.session.anime if self.session else None
+
+    @property
+    def current_episode(self):
+        return self.session.episode if self.session else None
+
+    def _apply_settings(self):
+        """Copy the playback-related settings onto the backend"""
+        s = self.settings
+        configure_log_levels(s.get("log_levels"))
         self.global_quality = s.get("quality")
+        self.languages = parse_languages(s.get("languages"))
         self.auto_resume = s.get("auto_resume")
         self.fullscreen = s.get("fullscreen")
         self.skip_intro_seconds = s.get("skip_intro_seconds")
@@ -38,69 +169,427 @@ class AnimeBackend:
         self.save_progress_interval = s.get("save_progress_interval")
         self.minimal_progress_threshold = s.get("minimal_progress_threshold")
         self.history_limit = s.get("history_limit")
+        self.provider_timeout = s.get("provider_timeout", 10)
+        self.queue_concurrency = s.get("queue_concurrency", 3)
+        self.sessions.max_sessions = max(1, s.get("max_playback_sessions", MAX_SESSIONS))
+        self.cache_profile = s.get("cache_profile", cache_profiles.AUTO)
+        self.cache_profiles = cache_profiles.resolve_profiles(s.get("cache_profiles"))
+
+    def reload_settings(self):
+        """Pick up settings saved by the settings screen (providers and pools keep their setup)"""
+        self.settings.load()
+        self._apply_settings()
+
+    def _load_providers(self, names):
+        providers = []
+        for name in names:
+            try:
+                provider = build_provider(name)
+            except Exception as e:
+                self.logger.exception("Failed to set up provider %s: %s :/", name, e)
+                continue
+
+            if provider is None:
+                self.logger.warning("Unknown provider '%s', skipping :/", name)
+                continue
+            providers.append(provider)
+
+        if not providers:
+            self.logger.warning("No usable providers configured, falling back to allanime")
+            providers.append(AllAnimeProvider())
+        return providers
+
+    def _provider_for(self, name: str):
+        """Live provider instance for a provider name, creating it if it is not configured"""
+        provider = self._providers_by_name.get(name)
+        if provider is not None:
+            return provider
+
+        with self._lock:
+            provider = self._providers_by_name.get(name)
+            if provider is None:
+                provider = build_provider(name)
+                if provider is not None:
+                    self._share_session(provider)
+                    self._providers_by_name[name] = provider
+        return provider
+
+    def _share_session(self, provider):
+        if hasattr(provider, "session"):
+            inject_session(provider, self.http)
+
+    def _rehydrate(self, anime_records):
+        anime_list = []
+        for record in anime_records:
+            provider = self._provider_for(record.provider)
+            if provider is not None:
+                anime_list.append(record.to_anime(provider))
+        return anime_list
+
+    def anime_to_record(self, anime) -> dict:
+        """Plain dict form of an Anime, for state kept outside the backend (the UI snapshot)"""
+        return asdict(records.AnimeRecord.from_anime(anime))
+
+    def anime_from_record(self, data: dict):
+        record = records.AnimeRecord(**{**data, "languages": tuple(data["languages"])})
+        anime_list = self._rehydrate([record])
+        if not anime_list:
+            return None
+
+        anime = anime_list[0]
+        self._anime_by_id.setdefault(anime.identifier, anime)
+        return anime
+
+    def _call_provider(self, provider, method: str, *args, deadline: float = None, **kwargs):
+        """Call a provider method through the hedging / circuit breaker layer.
+
+        With provider_processes set, the call itself runs in the process pool. With a
+        deadline (time.monotonic()) the provider's requests give up by then, freeing the worker.
+        """
+        if self.process_pool:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            fn = functools.partial(self.process_pool.call, provider.NAME, method, timeout=timeout)
+        else:
+            fn = getattr(provider, method)
+            if deadline is not None:
+                fn = with_deadline(fn, deadline)
+        return self.resilience.call(f"{provider.NAME}.{method}", fn, *args, **kwargs)
+
+    @staticmethod
+    def _stale_search_key(provider, query) -> str:
+        return f"stale_search_{provider.NAME}_{query.lower().replace(' ', '_')}"
+
+    def _stale_search(self, provider, query) -> list:
+        """provider's last results for query, for when it cannot be asked"""
+        cached = records.unpack_anime_list(self.cache.get(self._stale_search_key(provider, query)))
+        return self._rehydrate(cached or [])
+
+    def _search_provider(self, provider, query, deadline: float = None):
+        results = self._call_provider(provider, "get_search", query, deadline=deadline)
+        return [Anime.from_search_result(provider, r) for r in results]
+
+    def iter_search(self, query):
+        """Search every configured provider concurrently.
+
+        Yields batches of new (deduplicated) Anime in the order providers answer.
+        Providers slower than provider_timeout are dropped from this search, their
+        requests are bounded by the same deadline so they do not hold on to a worker.
+        """
+        self.logger.info("Searching for: %s :]", query)
+
+        names = "+".join(p.NAME for p in self.providers)
+        search_key = f"search_{names}_{query.lower().replace(' ', '_')}"
+        cached = records.unpack_anime_list(self.cache.get(search_key))
+        if cached is not None:
+            anime_list = self._rehydrate(cached)
+            for anime in anime_list:
+                self._anime_by_id[anime.identifier] = anime
+            yield anime_list
+            return
+
+        # Provider calls run in the class of the job searching (a prefetch stays speculative)
+        priority = self.scheduler.current_priority(Priority.INTERACTIVE)
+        deadline = time.monotonic() + self.provider_timeout
+        futures = {
+            self.scheduler.submit(self._search_provider, provider, query, deadline, priority=priority): provider
+            for provider in self.providers
+        }
+        seen = set()
+        merged = []
+        complete = True
 
-        self.logger.debug(f"AnimeBackend ready with settings: {s.get_all()}")
-
+        try:
+            for future in self.scheduler.as_completed(futures, timeout=self.provider_timeout):
+                provider = futures[future]
+                try:
+                    results = future.result()
+                    self.cache.set(self._stale_search_key(provider, query), records.pack_anime_list(results))
+
+                except CircuitOpenError as e:
+                    self.logger.warning("%s, serving cached %s results :/", e, provider.NAME)
+                    complete = False
+                    results = self._stale_search(provider, query)
+
+                except Exception as e:
+                    self.logger.exception("Error during search on %s: %s :/", provider.NAME, e)
+                    complete = False
+                    results = self._stale_search(provider, query)
+
+                batch = []
+                for anime in results:
+                    key = dedup_key(anime.name)
+                    if key in seen:
+                        continue
+
+                    seen.add(key)
+                    batch.append(anime)
+                    self._anime_by_id[anime.identifier] = anime
+
+                merged.extend(batch)
+                if batch:
+                    yield batch
+
+        except FutureTimeoutError:
+            complete = False
+            slow = [futures[f].NAME for f in futures if not f.done()]
+            self.logger.warning("Providers timed out for '%s': %s :/", query, ', '.join(slow))
+
+        finally:
+            # Queued calls never start, running ones give up at the deadline
+            for future in futures:
+                future.cancel()
+
+        if merged:
+            self.cache.set(search_key, records.pack_anime_list(merged), expire=3600 if complete else 300)
+
+    @profiled("backend.search")
     def search_anime(self, query):
         """Search for anime by query string"""
-        self.logger.info(f"Searching for: {query} :]")
+        return [anime for batch in self.iter_search(query) for anime in batch]
+
+    @staticmethod
+    def select_stream(streams, quality) -> Optional[ProviderStream]:
+        """Pick a stream the same way Anime.get_video does"""
+        if not streams:
+            return None
+
+        streams = sorted(streams, key=lambda st: st.resolution + (10 if st.subtitle else 0))
+        if quality == "worst":
+            return streams[0]
+
+        if quality is None or quality == "best":
+            return streams[-1]
+
+        return next((st for st in streams if st.resolution == quality), streams[-1])
+
+    def _fetch_stream(self, anime, episode, quality, lang=None) -> Optional[ProviderStream]:
+        """Resolve a stream, reusing a cached one until its URL expires.
+
+        Without lang the first preferred language the episode is available in is used.
+        A cached stream is also served while the provider's breaker is open.
+        """
+        if lang is None:
+            lang = self.episode_language(anime, episode)
+            if lang is None:
+                self.logger.warning("%s EP%s is not available in %s :/", anime.name, episode,
+                                    "/".join(lang.value for lang in self.languages))
+                return None
 
-        search_key = f"search_{query.lower().replace(' ', '_')}"
-        if search_key in self.cache:
-            return self.cache[search_key]
+        key = StreamCache.key(anime.identifier, episode, quality, lang)
+        stream = self.stream_cache.get(key)
+        if stream:
+            self.logger.debug("Stream cache hit for %s EP%s", anime.name, episode)
+            return stream
 
         try:
-            results = self.provider.get_search(query)
-            anime_list = [Anime.from_search_result(self.provider, r) for r in results]
+            streams = self._call_provider(anime.provider, "get_video", anime.identifier, episode, lang)
 
-            self.cache.set(search_key, anime_list, expire=3600)
-            return anime_list
+        except CircuitOpenError as e:
+            self.logger.warning("%s, no cached stream to fall back on :/", e)
+            return None
 
         except Exception as e:
-            self.logger.exception(f"Error during search: {e} :/")
-            return []
+            self.logger.exception("Error fetching stream: %s :/", e)
+            return None
 
+        stream = self.select_stream(streams, quality)
+        if stream:
+            self.stream_cache.put(key, stream)
+        return stream
+
+    @profiled("backend.stream")
     def get_episode_stream(self, anime, episode, quality) -> Optional[ProviderStream]:
         """Return a single ProviderStream (best matching quality) or None"""
+        stream = self._fetch_stream(anime, episode, quality)
+        self.logger.info("stream fetched: %s :]", stream)
+        return stream
+
+    @profiled("backend.info")
+    def get_info(self, anime):
+        """Get the ProviderInfoResult for anime (cached), or None on failure"""
+        key = f"info_{anime.provider.NAME}_{anime.identifier}"
+        info = records.unpack_info(self.cache.get(key))
+        if info is not None:
+            return info
+
         try:
-            stream = anime.get_video(
-                episode=episode, lang=LanguageTypeEnum.SUB, preferred_quality=quality
-            )
-            self.logger.info(f"stream fetched: {stream} :]")
-            if not stream:
-                return None
+            info = self._call_provider(anime.provider, "get_info", anime.identifier)
+            payload = records.pack_info(info)
+            self.cache.set(key, payload, expire=43200)
+            self.cache.set(f"stale_{key}", payload)
+            return info
 
-            return stream
+        except CircuitOpenError as e:
+            self.logger.warning("%s, serving cached info for %s :/", e, anime.name)
 
         except Exception as e:
-            self.logger.exception(f"Error fetching stream: {str(e)} :/")
-        return None
-
+            self.logger.exception("Error fetching info for %s: %s :(", anime.name, e)
+
+        return records.unpack_info(self.cache.get(f"stale_{key}"))
+
+    def prefetch_anime(self, anime):
+        """Warm the info and episode caches for anime ahead of the user opening it"""
+        self.get_info(anime)
+        self.get_episodes(anime)
+
+    def prefetch_stream(self, anime, episode, quality=None):
+        """Resolve a stream into the stream cache without playing it"""
+        self._fetch_stream(anime, episode, quality or self.global_quality)
+
+    @profiled("backend.languages")
+    def get_languages(self, anime) -> dict:
+        """Episode lists per language anime is available in, {LanguageTypeEnum: [episodes]}.
+
+        Every language the show lists is queried in parallel and the result is cached per show,
+        the preferred order is only applied when reading it.
+        """
+        key = f"langs_{anime.provider.NAME}_{anime.identifier}"
+        stale_key = f"stale_{key}"
+
+        available = records.unpack_languages(self.cache.get(key))
+        if available is not None:
+            return available
+
+        candidates = [lang for lang in LanguageTypeEnum if lang in (anime.languages or ())]
+        candidates = candidates or list(DEFAULT_LANGUAGES)
+        priority = self.scheduler.current_priority(Priority.INTERACTIVE)
+        futures = {
+            lang: self.scheduler.submit(
+                self._call_provider, anime.provider, "get_episodes", anime.identifier, lang, priority=priority
+            )
+            for lang in candidates
+        }
+        with self.scheduler.waiting():
+            wait(futures.values())
+
+        available = {}
+        complete = True
+        for lang, future in futures.items():
+            try:
+                episodes = future.result()
+            except CancelledError:
+                self.logger.debug("%s episodes for %s were preempted", lang.value, anime.name)
+                complete = False
+                continue
+            except CircuitOpenError as e:
+                self.logger.warning("%s, no %s episodes for %s :/", e, lang.value, anime.name)
+                complete = False
+                continue
+            except Exception as e:
+                self.logger.exception("Error fetching %s episodes for %s: %s :(", lang.value, anime.name, e)
+                complete = False
+                continue
+
+            if episodes:
+                available[lang] = list(episodes)
+
+        if not available and not complete:
+            self.logger.warning("Serving cached languages for %s :/", anime.name)
+            return records.unpack_languages(self.cache.get(stale_key)) or {}
+
+        payload = records.pack_languages(available)
+        self.cache.set(key, payload, expire=43200 if complete else 300)
+        if complete:
+            self.cache.set(stale_key, payload)
+        return available
+
+    def episode_language(self, anime, episode) -> Optional[LanguageTypeEnum]:
+        """First preferred language anime has episode in, None if it is in none of them.
+
+        When availability is unknown (provider down, nothing cached) the first preference is tried.
+        """
+        available = self.get_languages(anime)
+        if not available:
+            return self.languages[0]
+        return next((lang for lang in self.languages if episode in available.get(lang, ())), None)
+
+    @profiled("backend.episodes")
     def get_episodes(self, anime):
-        """Get a list of episodes for anime, with caching."""
-        anime_id = anime.identifier
-        key = f"eps_{anime_id}"
+        """Episodes of anime available in any of the preferred languages"""
+        available = self.get_languages(anime)
+        episodes = set()
+        for lang in self.languages:
+            episodes.update(available.get(lang, ()))
+        return sorted(episodes)
+
+    def refresh_episodes(self, anime):
+        """Drop the cached episode lists for anime and fetch them again"""
+        self.cache.delete(f"langs_{anime.provider.NAME}_{anime.identifier}")
+        return self.get_episodes(anime)
+
+    @profiled("backend.play")
+    def play_episode(self, anime: Anime, episode: int, stream: ProviderStream, start_time: int = 0,
+                     alongside: bool = False):
+        """Play a specific episode using MPVPlayer with user-configurable settings.
+
+        alongside keeps the current session playing and opens another mpv next to it.
+        """
+        return self._start_session(anime, episode, stream, start_time, alongside=alongside)
+
+    @profiled("backend.queue")
+    def resolve_queue(self, anime, episodes: list, quality: int = None) -> list:
+        """Resolve streams for several episodes, at most queue_concurrency at a time.
+
+        Returns (episode, stream) pairs in episode order, episodes without a stream are left out.
+        """
+        quality = quality or self.global_quality
+        workers = max(1, min(self.queue_concurrency, len(episodes)))
+        priority = self.scheduler.current_priority(Priority.INTERACTIVE)
+
+        def fetch(chunk):
+            return [self._fetch_stream(anime, ep, quality) for ep in chunk]
+
+        # One job per worker slot, each walking its share of the episodes
+        chunks = [episodes[i::workers] for i in range(workers)]
+        futures = [self.scheduler.submit(fetch, chunk, priority=priority) for chunk in chunks]
+        with self.scheduler.waiting():
+            wait(futures)
+        by_episode = {}
+        for chunk, future in zip(chunks, futures):
+            by_episode.update(zip(chunk, future.result()))
+        streams = [by_episode[ep] for ep in episodes]
+
+        missing = [ep for ep, stream in zip(episodes, streams) if not stream]
+        if missing:
+            self.logger.warning("No stream for %s EP%s, leaving them out of the queue :/", anime.name, missing)
+        return [(ep, stream) for ep, stream in zip(episodes, streams) if stream]
+
+    def _queue_start_time(self, anime_id, episode: int) -> int:
+        """Where a queued episode starts: its saved position if history is on that episode"""
+        entry = self.watch_history.get_entry(anime_id)
+        if entry and entry.get("episode") == episode:
+            return entry.get("timestamp", 0)
+        return 0
 
-        if key in self.cache:
-            return self.cache[key]
+    @profiled("backend.play")
+    def play_queue(self, anime: Anime, entries: list):
+        """Play (episode, stream) pairs back to back as one mpv playlist.
 
-        try:
-            lang = self.settings.get("language", LanguageTypeEnum.SUB)
-            episodes = anime.get_episodes(lang=lang)
-            self.cache.set(key, episodes, expire=43200)
-            return episodes
+        Progress, history and telemetry follow the playlist entry mpv is on.
+        """
+        if not entries:
+            return None
 
-        except Exception as e:
-            self.logger.exception(f"Error fetching episodes for {anime.name}: {e} :(")
-            return []
+        anime_id = getattr(anime, "identifier", str(id(anime)))
+        (episode, stream), rest = entries[0], entries[1:]
+        queue = [(ep, st, self._queue_start_time(anime_id, ep)) for ep, st in rest]
+        return self._start_session(
+            anime, episode, stream, self._queue_start_time(anime_id, episode), queue=queue
+        )
+
+    def _start_session(self, anime, episode, stream, start_time=0, follows: PlaybackSession = None, queue=(),
+                       alongside: bool = False):
+        """Replace a playback session with a new one and launch mpv for it on that session's player.
 
-    def play_episode(self, anime: Anime, episode: int, stream: ProviderStream, start_time: int = 0):
-        """Play a specific episode using MPVPlayer with user-configurable settings."""
+        By default the foreground session is replaced, with alongside the new one gets a player
+        of its own. With follows set (auto-next) follows is replaced, or nothing happens if
+        another session took over its player meanwhile.
+        queue holds (episode, stream, start_time) entries to play after this one in the same mpv.
+        Returns the new PlaybackSession, or None if playback did not start.
+        """
         url = stream.url
         anime_id = getattr(anime, "identifier", str(id(anime)))
         anime_name = getattr(anime, "name", "Unknown")
-        self.current_anime = anime
-        self.current_episode = episode
 
         start_time += self.skip_intro_seconds
         referrer = getattr(stream, "referrer", None) or get_referrer_for_url(url)
@@ -108,82 +597,269 @@ class AnimeBackend:
         extra_args = []
         if self.fullscreen:
             extra_args.append("-fs")
-        extra_args.append(f"--referrer={referrer}")
+        quality = getattr(stream, "resolution", None)
+        profile = self.pick_cache_profile(url, quality)
+        extra_args += cache_profiles.mpv_cache_args(self.cache_profiles[profile])
+
+        playlist = [PlaylistEntry(url, start_time, referrer)]
+        entries = [(episode, url, quality)]
+        for ep, st, start in queue:
+            playlist.append(PlaylistEntry(
+                st.url, start + self.skip_intro_seconds, getattr(st, "referrer", None) or get_referrer_for_url(st.url)
+            ))
+            entries.append((ep, st.url, getattr(st, "resolution", None)))
+
+        with self._lock:
+            if follows is not None and not self.sessions.owns(follows):
+                self.logger.info("Playback moved on, not auto-playing %s EP%s", anime_name, episode)
+                return None
 
-        self.logger.info(
-            f"Playing {anime_name} EP{episode} with referrer: {referrer}, "
-            f"start_time: {start_time}"
-        )
+            session = PlaybackSession(anime, episode, anime_id, anime_name, url, quality, queue=entries)
+            session.cache_profile = profile
+            player = self.sessions.player_for(follows, alongside)
+            previous = self.sessions.bind(player, session)
+            if previous is not None:
+                if alongside and previous.active:
+                    self.logger.info("%s sessions playing, replacing %s", len(self.sessions.active()), previous)
+                # Replaced while playing, its exit is ignored. One already exiting finishes in on_mpv_exit
+                if self._end_session(previous):
+                    previous.finish()
+            launch_lock = self._launch_locks.setdefault(player, threading.Lock())
+        self._flush_telemetry()
+
+        # Launching takes seconds (mpv spawn, IPC connect), so it runs outside self._lock. Launches
+        # on one player run one at a time, a session replaced while waiting never starts its mpv
+        with launch_lock:
+            with self._lock:
+                if not self.sessions.owns(session):
+                    self.logger.info("%s EP%s was replaced before mpv started", anime_name, episode)
+                    return None
+                player.on_exit = lambda: self.on_mpv_exit(session)
+                player.on_load_error = lambda reason: self._on_stream_failed(session.url, reason)
+                player.on_entry_change = (
+                    lambda previous, position, reason, qoe: self._on_queue_advance(session, previous, position, reason, qoe)
+                )
+
+            self.logger.info(
+                "Playing %s EP%s with referrer: %s, start_time: %s",
+                anime_name, episode, referrer, start_time
+            )
+            if len(playlist) > 1:
+                self.logger.info("Queued %s more episodes after EP%s :3", len(playlist) - 1, episode)
+                launched = player.launch_playlist(playlist, extra_args=extra_args)
+            else:
+                launched = player.launch(url, start_time=start_time, extra_args=extra_args + [f"--referrer={referrer}"])
+
+            with self._lock:
+                if not launched:
+                    # mpv missing, spawn or IPC failure: local, the cached stream stays valid.
+                    # Unloadable URLs are reported through on_load_error instead
+                    self.logger.error("MPV failed to start %s EP%s :(", anime_name, episode)
+                    session.end()
+                    session.finish()
+                    return None
+                replaced = not self.sessions.owns(session)
+                if not replaced:
+                    session.qoe = getattr(player, "qoe", None)
+                    player.start_progress_tracker(
+                        lambda elapsed, duration: self._save_progress(session, elapsed, duration),
+                        interval=self.save_progress_interval,
+                    )
+                    return session
+
+            # Taken over while launching: the replacement launches next, don't leave this mpv playing
+            self.logger.info("%s EP%s was replaced while mpv started, stopping it", anime_name, episode)
+            player.close()
+            return None
+
+    def _end_session(self, session: PlaybackSession) -> bool:
+        """End session and record its playback telemetry, False if it had already ended"""
+        if not session.end():
+            return False
 
-        self.player.on_exit = lambda: self.on_mpv_exit(anime=anime, episode=episode, anime_id=anime_id, anime_name=anime_name)
-        self.player.launch(url, start_time=start_time, extra_args=extra_args)
+        if session.qoe is not None:
+            self._pending_telemetry.append(Telemetry.entry(
+                session.url, session.quality, session.anime_name, session.episode, session.qoe, session.cache_profile
+            ))
+        return True
 
-        self.player.start_progress_tracker(
-            lambda elapsed, duration: self.watch_history.update_progress(
-                anime_id, anime_name, episode, elapsed, duration
-            ),
-            interval=self.save_progress_interval,
-        )
+    def _flush_telemetry(self):
+        """Write the telemetry queued under self._lock, called after releasing it"""
+        with self._lock:
+            entries, self._pending_telemetry = self._pending_telemetry, []
+        self.telemetry.add(*entries)
+
+    def pick_cache_profile(self, url: str, quality) -> str:
+        """Cache profile for a stream: the configured one, or chosen from the host's history"""
+        profile = self.cache_profile
+        if profile == cache_profiles.AUTO:
+            host = stream_host(url)
+            history = self.telemetry.host_history(host)
+            profile = cache_profiles.classify(history, quality)
+            self.logger.debug("Cache profile for %s at %sp: %s (history %s)", host, quality, profile, history)
+
+        if profile not in self.cache_profiles:
+            self.logger.warning("Unknown cache profile '%s', using %s :/", profile, cache_profiles.DEFAULT_PROFILE)
+            profile = cache_profiles.DEFAULT_PROFILE
+        return profile
+
+    def _save_progress(self, session: PlaybackSession, elapsed: int, duration: int):
+        """Progress tracker callback, ignored once session has been replaced"""
+        if session.active:
+            session.last_progress = (elapsed, duration)
+            self.watch_history.update_progress(
+                session.anime_id, session.anime_name, session.episode, elapsed, duration
+            )
 
-    def on_mpv_exit(self, anime: Anime, episode: int, anime_id: str, anime_name: str):
-        """Called when MPV closes, save watch history"""
+    def _on_queue_advance(self, session: PlaybackSession, previous: int, position: int, reason, qoe):
+        """mpv moved to another entry of session's playlist: close out the previous episode"""
+        with self._lock:
+            if not self.sessions.owns(session) or not session.active:
+                return
+
+            if qoe is not None:
+                self._pending_telemetry.append(Telemetry.entry(
+                    session.url, session.quality, session.anime_name, session.episode, qoe, session.cache_profile
+                ))
+
+            if reason == "eof" and session.last_progress:
+                duration = session.last_progress[1]
+                self.watch_history.update_progress(
+                    session.anime_id, session.anime_name, session.episode, duration, duration
+                )
+
+            self.logger.info(
+                "Queue moved from EP%s to entry %s of %s :3", session.episode, position + 1, len(session.queue)
+            )
+            session.select(position)
+            session.qoe = getattr(session.player, "qoe", None)
+        self._flush_telemetry()
+
+    def _on_stream_failed(self, url: str, reason: str):
+        """Forget a cached stream that mpv could not load (expired link, 403, ...)"""
+        dropped = self.stream_cache.invalidate_url(url)
+        self.logger.warning("Stream failed to load (%s), dropped %s cached entries :/", reason, dropped)
 
-        self.logger.info(f"MPV closed, saving history for {anime_name} EP:{episode} :)")
+    def on_mpv_exit(self, session: PlaybackSession):
+        """Called when MPV closes, save watch history"""
+        with self._lock:
+            if not self.sessions.owns(session) or not self._end_session(session):
+                self.logger.debug("Ignoring exit of replaced %s", session)
+                return
+        self._flush_telemetry()
+
+        anime, episode = session.anime, session.episode
+        anime_id, anime_name = session.anime_id, session.anime_name
+        self.logger.info("MPV closed, saving history for %s EP:%s :)", anime_name, episode)
         try:
-            elapsed = self.player.get_elapsed_time()
-            duration = self.player.current_duration or (elapsed + 300)
+            player = session.player
+            elapsed = player.get_elapsed_time()
+            if player.load_error and not elapsed:
+                self.logger.info("MPV could not load %s EP:%s, keeping saved progress", anime_name, episode)
+                return
+
+            duration = player.current_duration or (elapsed + 300)
             self.watch_history.update_progress(
                 anime_id, anime_name, episode, elapsed, duration
             )
 
             if self.auto_next_episode:
+                # Only carry on in the language this episode played in
                 next_ep = episode + 1
-                episodes = self.get_episodes(anime)
+                lang = self.episode_language(anime, episode)
+                episodes = self.get_languages(anime).get(lang, ())
 
-                if next_ep <= len(episodes):
+                if next_ep in episodes:
                     next_stream = self.get_episode_stream(anime, next_ep, self.global_quality)
 
                     if next_stream:
-                        self.logger.info(f"Auto-playing next episode: EP{next_ep} :3")
-                        self.play_episode(anime, next_ep, next_stream)
+                        self.logger.info("Auto-playing next episode: EP%s :3", next_ep)
+                        self._start_session(anime, next_ep, next_stream, follows=session)
 
         except Exception as e:
-            self.logger.debug(f"Failed to save final progress: {e} :/")
+            self.logger.debug("Failed to save final progress: %s :/", e)
 
-    def resume_anime(self, anime_id, quality: int = None):
-        """Resume anime playback from watch history, using user settings."""
+        finally:
+            session.finish()
+
+    def find_anime(self, anime_id, anime_name):
+        """Look up an Anime by identifier, falling back to a search by name"""
+        anime = self._anime_by_id.get(anime_id)
+        if anime:
+            return anime
+
+        results = self.search_anime(anime_name)
+        for candidate in results:
+            if candidate.identifier == anime_id:
+                return candidate
+
+        return results[0] if results else None
+
+    def get_anime(self, anime_id):
+        """Build an Anime for a bare identifier, using history or the provider for its name"""
+        anime = self._anime_by_id.get(anime_id)
+        if anime:
+            return anime
+
+        entry = self.watch_history.get_entry(anime_id)
+        if entry:
+            return self.find_anime(anime_id, entry["anime_name"])
+
+        try:
+            info = self._call_provider(self.provider, "get_info", anime_id)
+        except Exception as e:
+            self.logger.exception("Error looking up anime %s: %s :/", anime_id, e)
+            return None
+
+        anime = Anime(self.provider, info.name or anime_id, anime_id, set(DEFAULT_LANGUAGES))
+        self._anime_by_id[anime_id] = anime
+        return anime
+
+    @profiled("backend.resume")
+    def resolve_resume(self, anime_id, quality: int = None):
+        """Resolve everything needed to resume anime_id.
+
+        Returns a (anime, episode, stream, start_time) tuple or None.
+        """
         quality = quality or self.global_quality
         entry = self.watch_history.get_entry(anime_id)
 
         if not entry:
-            self.logger.warning(f"No history found for anime_id {anime_id} :(")
-            return False
+            self.logger.warning("No history found for anime_id %s :(", anime_id)
+            return None
 
-        anime = (
-                self.cache.get(anime_id)
-                or (self.search_anime(entry["anime_name"]) or [None])[0]
-        )
+        episode = entry["episode"]
+        start_time = entry.get("timestamp", 0)
+
+        anime = self.find_anime(anime_id, entry["anime_name"])
         if not anime:
             self.logger.error("Could not find anime to resume :/")
-            return False
-
-        lang = LanguageTypeEnum.SUB
-        try:
-            stream = anime.get_video(
-                episode=entry["episode"], lang=lang, preferred_quality=quality
-            )
-
-        except Exception as e:
-            self.logger.exception(f"Error fetching stream for resume: {e}")
-            return False
+            return None
 
+        stream = self._fetch_stream(anime, episode, quality)
         if not stream:
             self.logger.warning("No stream available to resume")
+            return None
+
+        return anime, episode, stream, start_time
+
+    def prefetch_resume(self, limit: int = 3):
+        """Resolve streams for the top continue-watching entries ahead of time."""
+        for entry in self.get_continue_watching_list(limit=limit):
+            if self.resolve_resume(entry["anime_id"]):
+                self.logger.debug("Pre-resolved resume stream for %s :3", entry['anime_name'])
+
+    def resume_anime(self, anime_id, quality: int = None):
+        """Resume anime playback from watch history, using user settings."""
+        resolved = self.resolve_resume(anime_id, quality)
+        if not resolved:
             return False
 
-        start_time = entry.get("timestamp", 0)
-        self.play_episode(anime, entry["episode"], stream, start_time=start_time)
-        return True
+        anime, episode, stream, start_time = resolved
+        return self.play_episode(anime, episode, stream, start_time=start_time) is not None
+
+    def get_history_entry(self, anime_id):
+        return self.watch_history.get_entry(anime_id)
 
     def get_continue_watching_list(self, limit=10):
         cont = self.watch_history.get_continue_watching(limit)
@@ -202,5 +878,70 @@ class AnimeBackend:
             )
         return result
 
+    def probe_stream(self, stream: ProviderStream) -> Optional[int]:
+        """Check a stream URL is still reachable, returns the HTTP status or None"""
+        referrer = stream.referrer or get_referrer_for_url(stream.url)
+        try:
+            response = self.http.get(
+                stream.url,
+                headers={"Referer": referrer, "Range": "bytes=0-0"},
+                stream=True,
+            )
+            response.close()
+            return response.status_code
+
+        except Exception as e:
+            self.logger.warning("Probe failed for %s: %s :/", stream.url, e)
+            return None
+
+    def player_running(self) -> bool:
+        """True while any session's mpv is running"""
+        return self.sessions.running()
+
+    def wait_for_playback(self, timeout: float = None) -> bool:
+        """Block until every session has finished, its exit handling (final progress, auto-next) included.
+
+        False if timeout ran out first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                pending = self.sessions.unfinished()
+            if not pending:
+                return True
+
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not pending[0].wait_finished(remaining) and remaining is not None:
+                return False
+
+    def get_playback_stats(self, recent: int = 20) -> dict:
+        """Playback telemetry summarized per host/quality, plus the latest sessions"""
+        return {
+            "summary": self.telemetry.summary(),
+            "recent": self.telemetry.sessions[-recent:][::-1],
+            "scheduler": self.scheduler.stats(),
+        }
+
+    def http_stats(self) -> dict:
+        return session_stats(self.http)
+
+    def memory_stats(self) -> dict:
+        """Sizes of the in-memory caches that grow with use"""
+        return {
+            "anime_registry": len(self._anime_by_id),
+            "anime_evicted": self._anime_by_id.evicted,
+            "stream_cache": len(self.stream_cache),
+        }
+
+    def close(self):
+        """Release worker pools and the disk cache"""
+        self.logger.info("HTTP session stats: %s", self.http_stats())
+        self.logger.info("Scheduler stats: %s", self.scheduler.stats())
+        self.scheduler.shutdown()
+        if self.process_pool:
+            self.process_pool.shutdown()
+        self.cache.close()
+        self.http.close()
+
     def _on_play_start(self, anime):
-        self.logger.info(f"Playback started: {anime}")
+        self.logger.info("Playback started: %s", anime)
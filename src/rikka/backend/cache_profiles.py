@@ -0,0 +1,77 @@
+from typing import Optional
+
+AUTO = "auto"
+DEFAULT_PROFILE = "balanced"
+
+# mpv cache/demuxer flags per profile, overridable (or extended) through the cache_profiles setting
+BUILTIN_PROFILES = {
+    "lean": {
+        "cache": "yes",
+        "cache-secs": 30,
+        "demuxer-readahead-secs": 20,
+        "demuxer-max-bytes": "48MiB",
+        "demuxer-max-back-bytes": "16MiB",
+    },
+    "balanced": {
+        "cache": "yes",
+        "cache-secs": 120,
+        "demuxer-readahead-secs": 60,
+        "demuxer-max-bytes": "150MiB",
+        "demuxer-max-back-bytes": "50MiB",
+    },
+    "buffered": {
+        "cache": "yes",
+        "cache-secs": 600,
+        "demuxer-readahead-secs": 300,
+        "demuxer-max-bytes": "600MiB",
+        "demuxer-max-back-bytes": "64MiB",
+        "cache-pause-wait": 5,
+    },
+}
+
+# Rough stream bitrates in bytes/s, to judge a host's measured bandwidth against
+BITRATES = {360: 90_000, 480: 150_000, 720: 350_000, 1080: 700_000}
+
+MIN_SESSIONS = 2
+SLOW_STALLS_PER_HOUR = 6
+SLOW_HEADROOM = 1.5
+FAST_HEADROOM = 4.0
+
+def required_bitrate(quality) -> int:
+    if quality in BITRATES:
+        return BITRATES[quality]
+
+    lower = [res for res in BITRATES if isinstance(quality, int) and res <= quality]
+    return BITRATES[max(lower)] if lower else BITRATES[1080]
+
+def classify(history: Optional[dict], quality) -> str:
+    """Pick a built-in profile from a host's history (see Telemetry.host_history)
+
+    Hosts that stall or barely keep up with the bitrate get a deep cache, hosts with
+    plenty of headroom and no stalls a small one. Too little history means balanced.
+    """
+    if not history or history["sessions"] < MIN_SESSIONS:
+        return DEFAULT_PROFILE
+
+    need = required_bitrate(quality)
+    bandwidth = history.get("bandwidth")
+    stalls_per_hour = history.get("stalls_per_hour") or 0
+
+    if stalls_per_hour >= SLOW_STALLS_PER_HOUR or (bandwidth and bandwidth < need * SLOW_HEADROOM):
+        return "buffered"
+
+    if not stalls_per_hour and bandwidth and bandwidth >= need * FAST_HEADROOM:
+        return "lean"
+
+    return DEFAULT_PROFILE
+
+def resolve_profiles(overrides: Optional[dict]) -> dict:
+    """Built-in profiles with user overrides merged in, new names become extra profiles"""
+    profiles = {name: dict(flags) for name, flags in BUILTIN_PROFILES.items()}
+    for name, flags in (overrides or {}).items():
+        if isinstance(flags, dict):
+            profiles.setdefault(name, {}).update(flags)
+    return profiles
+
+def mpv_cache_args(flags: dict) -> list:
+    return [f"--{flag}={value}" for flag, value in flags.items()]
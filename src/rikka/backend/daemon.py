@@ -0,0 +1,436 @@
+"""Optional background daemon that owns AnimeBackend and the mpv controller.
+
+`rikka daemon` keeps the disk cache, providers, pooled HTTP session and
+in-memory caches warm between TUI/CLI launches, and keeps tracking playback
+progress after the UI closes. Clients talk to it over a Unix socket with
+newline-delimited JSON:
+
+    -> {"id": 1, "method": "search", "params": {"query": "frieren"}}
+    <- {"id": 1, "result": [...]}
+
+Streaming methods send {"id": .., "partial": ...} lines before the final result.
+"""
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from anipy_api.anime import Anime
+from platformdirs import user_runtime_dir
+
+from src.rikka.backend.async_backend import AsyncAnimeBackend
+from src.rikka.backend.records import AnimeRecord, InfoRecord, stream_from_dict, stream_to_dict
+from src.rikka.backend.scheduler import Priority, PriorityScheduler
+from src.rikka.backend.settings_control import AnimeSettings
+from src.rikka.utils.logger import get_logger
+
+SOCKET_NAME = "daemon.sock"
+
+def get_socket_path() -> Path:
+    return Path(user_runtime_dir("rikka", "XeonXE534")) / SOCKET_NAME
+
+class DaemonError(Exception):
+    """Raised on the client side when the daemon reports an error or is unreachable."""
+
+def anime_to_wire(anime) -> dict:
+    return asdict(AnimeRecord.from_anime(anime))
+
+class ProviderRef:
+    """Stand-in for a provider on the client side, only its NAME is needed."""
+
+    def __init__(self, name: str):
+        self.NAME = name
+
+    def __str__(self):
+        return self.NAME
+
+def anime_from_wire(data: dict, providers: dict) -> Anime:
+    provider = providers.setdefault(data["provider"], ProviderRef(data["provider"]))
+    return AnimeRecord(**{**data, "languages": tuple(data["languages"])}).to_anime(provider)
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if line.strip():
+                self.server.rikka.dispatch(line, self.wfile)
+
+class RikkaDaemon:
+    """Serves one AnimeBackend to any number of local clients."""
+
+    def __init__(self, backend, socket_path: Path = None, refresh_interval: int = None):
+        self.backend = backend
+        self.socket_path = Path(socket_path or get_socket_path())
+        self.refresh_interval = refresh_interval or backend.settings.get("daemon_refresh_interval", 900)
+        self.started_at = time.time()
+        self.new_episodes = {}
+        self.logger = get_logger("RikkaDaemon")
+
+        self._server = None
+        self._stop = threading.Event()
+        self._known_episodes = {}
+
+    def _rehydrate(self, data):
+        record = AnimeRecord(**{**data, "languages": tuple(data["languages"])})
+        anime_list = self.backend._rehydrate([record])
+        if not anime_list:
+            raise ValueError(f"Unknown provider '{record.provider}'")
+        return anime_list[0]
+
+    # RPC methods, each takes the request params as keyword arguments
+
+    def rpc_search(self, query):
+        return [anime_to_wire(a) for a in self.backend.search_anime(query)]
+
+    def rpc_iter_search(self, query):
+        for batch in self.backend.iter_search(query):
+            yield [anime_to_wire(a) for a in batch]
+
+    def rpc_get_anime(self, anime_id):
+        anime = self.backend.get_anime(anime_id)
+        return anime_to_wire(anime) if anime else None
+
+    def rpc_info(self, anime):
+        info = self.backend.get_info(self._rehydrate(anime))
+        return asdict(InfoRecord.from_info(info)) if info else None
+
+    def rpc_episodes(self, anime):
+        return list(self.backend.get_episodes(self._rehydrate(anime)))
+
+    def rpc_stream(self, anime, episode, quality=None):
+        stream = self.backend.get_episode_stream(self._rehydrate(anime), episode, quality)
+        return stream_to_dict(stream) if stream else None
+
+    def rpc_play(self, anime, episode, stream, start_time=0, alongside=False):
+        session = self.backend.play_episode(
+            self._rehydrate(anime), episode, stream_from_dict(stream), start_time, alongside
+        )
+        return session is not None
+
+    def rpc_resolve_queue(self, anime, episodes, quality=None):
+        queue = self.backend.resolve_queue(self._rehydrate(anime), episodes, quality)
+        return [[episode, stream_to_dict(stream)] for episode, stream in queue]
+
+    def rpc_play_queue(self, anime, entries):
+        session = self.backend.play_queue(
+            self._rehydrate(anime), [(episode, stream_from_dict(stream)) for episode, stream in entries]
+        )
+        return session is not None
+
+    def rpc_resolve_resume(self, anime_id, quality=None):
+        resolved = self.backend.resolve_resume(anime_id, quality)
+        if not resolved:
+            return None
+
+        anime, episode, stream, start_time = resolved
+        return {
+            "anime": anime_to_wire(anime),
+            "episode": episode,
+            "stream": stream_to_dict(stream),
+            "start_time": start_time,
+        }
+
+    def rpc_prefetch(self, anime):
+        self.backend.prefetch_anime(self._rehydrate(anime))
+
+    def rpc_prefetch_stream(self, anime, episode, quality=None):
+        self.backend.prefetch_stream(self._rehydrate(anime), episode, quality)
+
+    def rpc_prefetch_resume(self, limit=3):
+        self.backend.prefetch_resume(limit)
+
+    def rpc_continue_watching(self, limit=10):
+        return self.backend.get_continue_watching_list(limit=limit)
+
+    def rpc_history_entry(self, anime_id):
+        return self.backend.get_history_entry(anime_id)
+
+    def rpc_probe(self, stream):
+        return self.backend.probe_stream(stream_from_dict(stream))
+
+    def rpc_player_running(self):
+        return self.backend.player_running()
+
+    def rpc_reload_settings(self):
+        self.backend.reload_settings()
+
+    def rpc_playback_stats(self, recent=20):
+        return self.backend.get_playback_stats(recent)
+
+    def rpc_status(self):
+        return {
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started_at),
+            "playing": self.backend.player_running(),
+            "sessions": len(self.backend.sessions.active()),
+            "new_episodes": self.new_episodes,
+            "http": self.backend.http_stats(),
+            "providers": self.backend.resilience.stats(),
+            "scheduler": self.backend.scheduler.stats(),
+        }
+
+    def rpc_shutdown(self):
+        threading.Thread(target=self.stop, daemon=True).start()
+        return True
+
+    def dispatch(self, line: bytes, wfile):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            method = getattr(self, f"rpc_{request.get('method')}", None)
+            if method is None:
+                raise ValueError(f"Unknown method '{request.get('method')}'")
+
+            result = method(**request.get("params", {}))
+            if hasattr(result, "__next__"):
+                for part in result:
+                    self._send(wfile, {"id": request_id, "partial": part})
+                result = None
+
+            self._send(wfile, {"id": request_id, "result": result})
+
+        except Exception as e:
+            self.logger.exception("Daemon request failed: %s", e)
+            self._send(wfile, {"id": request_id, "error": str(e)})
+
+    @staticmethod
+    def _send(wfile, message: dict):
+        wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+        wfile.flush()
+
+    def _maintenance(self):
+        """Periodically refresh episode lists of shows in progress and pre-resolve resumes"""
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.backend.scheduler.submit(self.check_new_episodes, priority=Priority.MAINTENANCE).result()
+                self.backend.scheduler.submit(self.backend.prefetch_resume, priority=Priority.MAINTENANCE).result()
+            except Exception as e:
+                self.logger.exception("Daemon maintenance failed: %s", e)
+
+    def check_new_episodes(self):
+        for entry in self.backend.get_continue_watching_list(limit=self.backend.history_limit):
+            anime = self.backend.find_anime(entry["anime_id"], entry["anime_name"])
+            if not anime:
+                continue
+
+            episodes = self.backend.refresh_episodes(anime)
+            latest = max(episodes) if episodes else None
+            known = self._known_episodes.get(anime.identifier)
+            if known is not None and latest is not None and latest > known:
+                self.new_episodes[anime.identifier] = {"anime_name": anime.name, "latest": latest}
+                self.logger.info("New episode for %s: EP%s :3", anime.name, latest)
+            self._known_episodes[anime.identifier] = latest
+
+    def serve_forever(self):
+        if DaemonClient.is_running(self.socket_path):
+            raise DaemonError(f"A daemon is already listening on {self.socket_path}")
+
+        self.socket_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self.socket_path.unlink(missing_ok=True)
+
+        # Created owner-only, there is no window where others can connect
+        umask = os.umask(0o077)
+        try:
+            self._server = _Server(str(self.socket_path), _Handler)
+        finally:
+            os.umask(umask)
+        self._server.rikka = self
+
+        threading.Thread(target=self._maintenance, name="rikka-daemon-maintenance", daemon=True).start()
+        self.logger.info("Daemon listening on %s", self.socket_path)
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+            self.backend.close()
+
+    def stop(self):
+        self._stop.set()
+        if self._server:
+            self._server.shutdown()
+
+class DaemonClient:
+    """One short-lived connection per call, so it is safe to share across threads."""
+
+    def __init__(self, socket_path: Path = None, connect_timeout: float = 1.0):
+        self.socket_path = str(socket_path or get_socket_path())
+        self.connect_timeout = connect_timeout
+        self._ids = iter(range(1, 2**62))
+
+    @staticmethod
+    def is_running(socket_path: Path = None) -> bool:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(0.5)
+                sock.connect(str(socket_path or get_socket_path()))
+            return True
+        except OSError:
+            return False
+
+    def stream(self, method: str, **params):
+        """Yield partial results of a streaming call, then the final result if any"""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.connect_timeout)
+            sock.connect(self.socket_path)
+            sock.settimeout(None)
+        except OSError as e:
+            sock.close()
+            raise DaemonError(f"Daemon unreachable: {e}") from e
+
+        with sock, sock.makefile("rwb") as f:
+            request = {"id": next(self._ids), "method": method, "params": params}
+            f.write(json.dumps(request).encode("utf-8") + b"\n")
+            f.flush()
+
+            for line in f:
+                message = json.loads(line)
+                if "error" in message:
+                    raise DaemonError(message["error"])
+                if "partial" in message:
+                    yield message["partial"]
+                    continue
+
+                if message.get("result") is not None:
+                    yield message["result"]
+                return
+
+        raise DaemonError("Daemon closed the connection")
+
+    def call(self, method: str, **params):
+        result = None
+        for result in self.stream(method, **params):
+            pass
+        return result
+
+class RemoteBackend:
+    """AnimeBackend look-alike for the TUI and CLI that forwards to a running daemon."""
+
+    def __init__(self, client: DaemonClient = None, settings: AnimeSettings = None):
+        self.client = client or DaemonClient()
+        self.settings = settings or AnimeSettings()
+        self.global_quality = self.settings.get("quality")
+        self.logger = get_logger("RemoteBackend")
+        self._providers = {}
+        self.scheduler = PriorityScheduler(self.settings.get("io_workers", 4), self.settings.get("background_workers"))
+        self.aio = AsyncAnimeBackend(self, self.scheduler)
+
+    def _anime(self, data):
+        return anime_from_wire(data, self._providers) if data else None
+
+    def anime_to_record(self, anime) -> dict:
+        return anime_to_wire(anime)
+
+    def anime_from_record(self, data: dict):
+        return self._anime(data)
+
+    def iter_search(self, query):
+        for batch in self.client.stream("iter_search", query=query):
+            yield [self._anime(a) for a in batch]
+
+    def search_anime(self, query):
+        return [anime for batch in self.iter_search(query) for anime in batch]
+
+    def get_anime(self, anime_id):
+        return self._anime(self.client.call("get_anime", anime_id=anime_id))
+
+    def get_info(self, anime):
+        data = self.client.call("info", anime=anime_to_wire(anime))
+        return InfoRecord(**data).to_info() if data else None
+
+    def get_episodes(self, anime):
+        return self.client.call("episodes", anime=anime_to_wire(anime)) or []
+
+    def get_episode_stream(self, anime, episode, quality):
+        data = self.client.call("stream", anime=anime_to_wire(anime), episode=episode, quality=quality)
+        return stream_from_dict(data) if data else None
+
+    def play_episode(self, anime, episode, stream, start_time: int = 0, alongside: bool = False) -> bool:
+        """True if the daemon's mpv started"""
+        return bool(self.client.call(
+            "play", anime=anime_to_wire(anime), episode=episode,
+            stream=stream_to_dict(stream), start_time=start_time, alongside=alongside
+        ))
+
+    def resolve_queue(self, anime, episodes, quality: int = None):
+        data = self.client.call("resolve_queue", anime=anime_to_wire(anime), episodes=list(episodes), quality=quality)
+        return [(episode, stream_from_dict(stream)) for episode, stream in data or []]
+
+    def play_queue(self, anime, entries) -> bool:
+        return bool(self.client.call(
+            "play_queue", anime=anime_to_wire(anime),
+            entries=[[episode, stream_to_dict(stream)] for episode, stream in entries]
+        ))
+
+    def resolve_resume(self, anime_id, quality: int = None):
+        data = self.client.call("resolve_resume", anime_id=anime_id, quality=quality)
+        if not data:
+            return None
+        return self._anime(data["anime"]), data["episode"], stream_from_dict(data["stream"]), data["start_time"]
+
+    def resume_anime(self, anime_id, quality: int = None):
+        resolved = self.resolve_resume(anime_id, quality)
+        if not resolved:
+            return False
+
+        anime, episode, stream, start_time = resolved
+        return self.play_episode(anime, episode, stream, start_time=start_time)
+
+    def prefetch_anime(self, anime):
+        self.client.call("prefetch", anime=anime_to_wire(anime))
+
+    def prefetch_stream(self, anime, episode, quality=None):
+        self.client.call("prefetch_stream", anime=anime_to_wire(anime), episode=episode, quality=quality)
+
+    def prefetch_resume(self, limit: int = 3):
+        self.client.call("prefetch_resume", limit=limit)
+
+    def get_continue_watching_list(self, limit=10):
+        return self.client.call("continue_watching", limit=limit) or []
+
+    def get_history_entry(self, anime_id):
+        return self.client.call("history_entry", anime_id=anime_id)
+
+    def probe_stream(self, stream):
+        return self.client.call("probe", stream=stream_to_dict(stream))
+
+    def player_running(self) -> bool:
+        return bool(self.client.call("player_running"))
+
+    def wait_for_playback(self, poll: float = 0.5) -> bool:
+        """Block until the daemon's mpv exits, the daemon saves the final progress itself"""
+        while self.player_running():
+            time.sleep(poll)
+        return True
+
+    def get_playback_stats(self, recent: int = 20) -> dict:
+        return self.client.call("playback_stats", recent=recent)
+
+    def reload_settings(self):
+        self.settings.load()
+        self.global_quality = self.settings.get("quality")
+        self.client.call("reload_settings")
+
+    def status(self):
+        return self.client.call("status")
+
+    def close(self):
+        self.scheduler.shutdown()
+
+def connect(socket_path: Path = None):
+    """Return a RemoteBackend if a daemon is running (and RIKKA_NO_DAEMON is unset), else None"""
+    if os.getenv("RIKKA_NO_DAEMON") or os.name == "nt":
+        return None
+
+    if not DaemonClient.is_running(socket_path):
+        return None
+    return RemoteBackend(DaemonClient(socket_path))
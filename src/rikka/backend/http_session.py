@@ -0,0 +1,168 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import Timeout
+
+from src.rikka.backend.rate_limit import MAX_WAIT, RateGovernor, retry_after_seconds
+from src.rikka.utils.logger import get_logger
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; WOW64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/86.0.4240.198 Safari/537.36"
+)
+
+_deadline = threading.local()
+
+@contextmanager
+def request_deadline(deadline: float):
+    """Requests made on this thread give up by deadline (time.monotonic()), nested ones keep the earliest"""
+    previous = getattr(_deadline, "at", None)
+    _deadline.at = deadline if previous is None else min(previous, deadline)
+    try:
+        yield
+    finally:
+        _deadline.at = previous
+
+def with_deadline(fn, deadline: float):
+    """fn bounded by deadline on whichever thread ends up running it"""
+    @functools.wraps(fn)
+    def bounded(*args, **kwargs):
+        with request_deadline(deadline):
+            return fn(*args, **kwargs)
+    return bounded
+
+def _cap_timeout(timeout, remaining: float):
+    if isinstance(timeout, tuple):
+        return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+    return remaining if timeout is None else min(timeout, remaining)
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter with a default timeout, a running request count and per-host rate limits."""
+
+    def __init__(self, timeout, pool_size: int = 10, retries: int = 1, governor: RateGovernor = None):
+        self.timeout = timeout
+        self.governor = governor
+        self.requests_sent = 0
+        self.closed_connections = 0
+        self._lock = threading.Lock()
+        super().__init__(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=retries,
+        )
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+
+        max_wait = MAX_WAIT
+        deadline = getattr(_deadline, "at", None)
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise Timeout(f"Deadline passed before requesting {request.url}", request=request)
+            # urllib3 retries within this send, each attempt gets its share of what is left
+            attempts = 1 + (self.max_retries.total if isinstance(self.max_retries.total, int) else 0)
+            kwargs["timeout"] = _cap_timeout(kwargs["timeout"], remaining / attempts)
+            max_wait = min(max_wait, remaining)
+
+        with self._lock:
+            self.requests_sent += 1
+        if self.governor is None:
+            return super().send(request, **kwargs)
+
+        limit = self.governor.limit_for(urlparse(request.url).hostname or "")
+        limit.acquire(max_wait)
+        status = retry_after = None
+        try:
+            response = super().send(request, **kwargs)
+            status = response.status_code
+            retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+            return response
+
+        finally:
+            limit.release(status, retry_after)
+
+    def open_connections(self) -> int:
+        """Connections opened by the pools that are still alive"""
+        pools = self.poolmanager.pools
+        return sum(pools[key].num_connections for key in list(pools.keys()))
+
+    def close(self):
+        with self._lock:
+            self.closed_connections += self.open_connections()
+        super().close()
+
+def build_session(
+    pool_size: int = 10,
+    connect_timeout: float = 5,
+    read_timeout: float = 20,
+    retries: int = 1,
+    rate_limit: float = 8,
+    rate_burst: int = 16,
+    host_concurrency: int = 6,
+    host_limits: dict = None,
+) -> Session:
+    """One keep-alive session shared by every provider and Rikka's own requests.
+
+    rate_limit is requests/s per host (0 disables the governor), host_limits
+    maps a host to its own {"rate", "burst", "concurrency"}.
+    """
+    session = Session()
+    governor = None
+    if rate_limit and rate_limit > 0:
+        governor = RateGovernor(rate_limit, rate_burst, host_concurrency, host_limits)
+    adapter = PooledAdapter((connect_timeout, read_timeout), pool_size=pool_size, retries=retries, governor=governor)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+def session_stats(session: Session) -> dict:
+    """Request and connection counts, reused = requests served on an existing connection"""
+    adapter = session.get_adapter("https://")
+    if not isinstance(adapter, PooledAdapter):
+        return {}
+
+    connections = adapter.closed_connections + adapter.open_connections()
+    stats = {
+        "requests": adapter.requests_sent,
+        "connections": connections,
+        "reused": max(0, adapter.requests_sent - connections),
+    }
+    if adapter.governor is not None:
+        stats["hosts"] = adapter.governor.stats()
+    return stats
+
+def _provider_session(shared: Session) -> Session:
+    """A session of its own (cookies, headers) on the shared session's adapters and pools"""
+    session = Session()
+    for prefix, adapter in shared.adapters.items():
+        session.mount(prefix, adapter)
+    session.headers.update(shared.headers)
+    return session
+
+def inject_session(provider, session: Session):
+    """Make an anipy provider send its requests through session's pooled adapter.
+
+    Each provider gets its own Session mounted on the shared adapter, so the
+    reset providers do after a connection error only drops that provider's
+    cookies and headers, never the shared pools.
+    """
+    logger = get_logger("HTTPSession")
+    own = getattr(provider, "session", None)
+    if own is not None and own.get_adapter("https://") is not session.get_adapter("https://"):
+        own.close()
+
+    def _reset_session():
+        logger.info("Starting a fresh session for %s after a connection error", provider.NAME)
+        provider.session = _provider_session(session)
+        return provider.session
+
+    provider.session = _provider_session(session)
+    provider._generate_new_session = _reset_session
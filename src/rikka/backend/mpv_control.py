@@ -1,30 +1,157 @@
-import sys
-import time
+import itertools
 import json
+import os
+import re
 import socket
-import threading
 import subprocess
-
+import sys
+import threading
+import time
 from pathlib import Path
 
+from platformdirs import user_runtime_dir
+
+from src.rikka.backend.telemetry import QoEStats
 from src.rikka.utils.logger import get_logger
 
+JOIN_TIMEOUT = 1.0
+EXIT_TIMEOUT = 1.0
+
+# The socket shows up a few ms after spawn, poll fast first and back off to the cap
+IPC_CONNECT_TIMEOUT = 6.0
+IPC_POLL_DELAY = 0.005
+IPC_POLL_MAX_DELAY = 0.025
+
+# Every player gets its own socket, mpv-<pid>-<n>.sock, so sessions and Rikka instances never share one
+_SOCKET_RE = re.compile(r"^mpv-(\d+)-\d+\.sock$")
+_socket_ids = itertools.count(1)
+
+def socket_dir() -> Path:
+    return Path(user_runtime_dir("rikka", "XeonXE534"))
+
+def ipc_socket_path() -> str:
+    """A fresh IPC socket path (named pipe on Windows) for one player"""
+    name = f"mpv-{os.getpid()}-{next(_socket_ids)}"
+    if sys.platform == "win32":
+        return rf"\\.\pipe\rikka-{name}"
+    return str(socket_dir() / f"{name}.sock")
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # alive, owned by someone else
+    return True
+
+def cleanup_orphaned_sockets(directory: Path = None) -> int:
+    """Remove player sockets left behind by Rikka processes that are gone, returns how many"""
+    if sys.platform == "win32":
+        return 0
+
+    removed = 0
+    try:
+        paths = list((directory or socket_dir()).iterdir())
+    except OSError:
+        return 0
+
+    for path in paths:
+        match = _SOCKET_RE.match(path.name)
+        if not match or _pid_alive(int(match.group(1))):
+            continue
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+# observe_property ids -> properties feeding QoEStats
+OBSERVED_PROPERTIES = {
+    10: "paused-for-cache",
+    11: "demuxer-cache-duration",
+    12: "frame-drop-count",
+    13: "cache-speed",
+    14: "playlist-pos",
+}
+
+class PlaylistEntry:
+    """One file of a playlist launch with its own per-file options"""
+
+    def __init__(self, url: str, start_time: int = 0, referrer: str = None):
+        self.url = url
+        self.start_time = start_time
+        self.referrer = referrer
+
+    def args(self) -> list:
+        args = [self.url, f"--start={self.start_time}"]
+        if self.referrer:
+            args.append(f"--referrer={self.referrer}")
+        return args
+
+def playlist_args(entries: list) -> list:
+    """mpv arguments for entries, several files get their options scoped with --{ ... --}"""
+    if len(entries) == 1:
+        return entries[0].args()
+    return [arg for entry in entries for arg in ("--{", *entry.args(), "--}")]
+
+class _Connection:
+    """One launched mpv process and its IPC socket, listener and tracker threads"""
+
+    def __init__(self, generation: int, on_exit=None, on_load_error=None, on_entry_change=None, playlist_size: int = 1):
+        self.generation = generation
+        self.on_exit = on_exit
+        self.on_load_error = on_load_error
+        self.on_entry_change = on_entry_change
+        self.playlist_size = playlist_size
+        self.playlist_pos = 0
+        self.entry_end_reason = None
+        self.process = None
+        self.socket = None
+        self.stopped = threading.Event()
+        self.closed = False  # by close(), its callbacks may no longer launch a successor
+        self.threads = []
+        self.buffer = ""
+        self.qoe = QoEStats()
+
 class MPVControl:
-    def __init__(self):
+    def __init__(self, ipc_path: str = None):
         self.is_windows = sys.platform == "win32"
-        self.ipc_path = r"\\.\pipe\rikka-ipc" if self.is_windows else "/tmp/rikka-ipc"
+        self.ipc_path = ipc_path or ipc_socket_path()
 
         self.process = None
         self.socket = None
-        self.running = False
         self.on_exit = None
+        self.on_load_error = None
+        self.on_entry_change = None
+        self.load_error = None
         self._progress_thread = None
-        self._recv_buffer = ""
         self.current_duration = None
         self._current_position = None
 
+        self._lock = threading.RLock()
+        self._conn = None
+        self._generation = 0
+
         self.logger = get_logger("MPVControl")
 
+    @property
+    def running(self) -> bool:
+        conn = self._conn
+        return conn is not None and not conn.stopped.is_set()
+
+    @property
+    def qoe(self):
+        """QoEStats of the current launch, None before the first one"""
+        conn = self._conn
+        return conn.qoe if conn else None
+
+    @property
+    def generation(self) -> int:
+        """Bumped on every launch; threads of older generations stop on their own"""
+        return self._generation
+
     def _cleanup_socket(self):
         if self.is_windows:
             return
@@ -33,13 +160,37 @@ class MPVControl:
         except FileNotFoundError:
             pass
         except Exception as e:
-            self.logger.error(f"Failed to clean up socket: {e} :(")
+            self.logger.error("Failed to clean up socket: %s :(", e)
 
     def launch(self, url, start_time=0, extra_args=None):
+        return self.launch_playlist([PlaylistEntry(url, start_time)], extra_args)
+
+    def launch_playlist(self, entries: list, extra_args=None):
+        """Launch mpv on one or more PlaylistEntry, on_entry_change fires when it moves to another"""
+        with self._lock:
+            return self._launch(entries, extra_args)
+
+    def _launch(self, entries, extra_args):
+        previous = self._conn
+        if previous is not None and previous.closed and threading.current_thread() in previous.threads:
+            self.logger.info("Player was closed, not launching from its exit callback")
+            return False
+
         if self.process and self.process.poll() is None:
             self.logger.info("Killing existing MPV instances...")
-            self.close()
-            time.sleep(0.2)
+            process = self.process
+            self._close()
+            self._wait_exit(process)
+
+        if previous is not None:
+            self._release(previous)
+            self._join(previous)
+
+        self._generation += 1
+        conn = _Connection(
+            self._generation, self.on_exit, self.on_load_error, self.on_entry_change, playlist_size=len(entries)
+        )
+        self._conn = conn
 
         if extra_args is None:
             extra_args = []
@@ -51,8 +202,7 @@ class MPVControl:
 
         cmd = [
                   "mpv",
-                  url,
-                  f"--start={start_time}",
+                  *playlist_args(entries),
                   f"--input-ipc-server={self.ipc_path}",
                   "--force-window=immediate",
                   "--no-terminal",
@@ -61,36 +211,66 @@ class MPVControl:
                   "--msg-level=ipc=v",
               ] + extra_args
 
-        self.logger.info(f"Launching MPV with socket: {self.ipc_path}")
-        self.logger.debug(f"MPV command: {' '.join(cmd)}")
+        self.logger.info("Launching MPV with socket: %s", self.ipc_path)
+        self.logger.debug("MPV command: %s", ' '.join(cmd))
 
         try:
-            self.process = subprocess.Popen(
+            self.process = conn.process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.DEVNULL,
                 text=True
             )
         except Exception as e:
-            self.logger.error(f"Failed to start MPV process: {e}")
+            self.logger.error("Failed to start MPV process: %s", e)
+            conn.stopped.set()
             return False
 
-        self.running = True
+        self.load_error = None
         self.current_duration = None
         self._current_position = None
-        self._recv_buffer = ""
 
-        connected = self._connect_to_ipc(max_attempts=30, delay=0.2)
+        connected = self._connect_to_ipc()
         if not connected:
             self.logger.error("Failed to connect to MPV IPC!")
-            self.close()
+            self._close()
             return False
 
-        threading.Thread(target=self._listen_ipc, daemon=True).start()
+        conn.socket = self.socket
+        self.send("request_log_messages", ["error"])
+        for observe_id, name in OBSERVED_PROPERTIES.items():
+            self.send("observe_property", [observe_id, name])
+        listener = threading.Thread(
+            target=self._listen_ipc, args=(conn,), name=f"mpv-ipc-{conn.generation}", daemon=True
+        )
+        conn.threads.append(listener)
+        listener.start()
         return True
 
-    def _connect_to_ipc(self, max_attempts=30, delay=0.2):
-        for attempt in range(max_attempts):
+    def _join(self, conn: _Connection):
+        """Wait for the threads of a replaced connection (skipping the calling thread)"""
+        current = threading.current_thread()
+        for thread in conn.threads:
+            if thread is current:
+                continue
+
+            thread.join(JOIN_TIMEOUT)
+            if thread.is_alive():
+                self.logger.warning("%s did not stop in time :/", thread.name)
+
+    def _wait_exit(self, process):
+        """Give a terminated mpv a moment to exit before its socket path is reused"""
+        try:
+            process.wait(EXIT_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.logger.warning("MPV did not exit in time, killing it :/")
+            process.kill()
+
+    def _connect_to_ipc(self, timeout=IPC_CONNECT_TIMEOUT, delay=IPC_POLL_DELAY):
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while True:
+            attempt += 1
             if self.process.poll() is not None:
                 return False
 
@@ -102,80 +282,173 @@ class MPVControl:
                     self.socket.connect(self.ipc_path)
                     self.socket.settimeout(0.5)
 
-                self.logger.info(f"Connected to IPC on attempt {attempt + 1}")
+                self.logger.info("Connected to IPC on attempt %s", attempt)
                 return True
 
             except Exception:
+                if not self.is_windows:
+                    self.socket.close()
+                self.socket = None
+                if time.monotonic() >= deadline:
+                    return False
                 time.sleep(delay)
+                delay = min(delay * 2, IPC_POLL_MAX_DELAY)
 
-        return False
-
-    def _listen_ipc(self):
+    def _listen_ipc(self, conn: _Connection):
         try:
-            while self.running:
-                if not self._process_socket_data():
+            while not conn.stopped.is_set():
+                if not self._process_socket_data(conn):
                     break
 
         except Exception as e:
-            if self.running:
-                self.logger.error(f"IPC Listener Error: {e} :/")
+            if not conn.stopped.is_set():
+                self.logger.error("IPC Listener Error: %s :/", e)
         finally:
-            self.close()
+            # A launch holding the lock is replacing this connection and releases it itself
+            if not self._lock.acquire(blocking=False):
+                self._release(conn)
+                return
+            try:
+                if conn is self._conn:
+                    self._close()
+                else:
+                    self._release(conn)
+            finally:
+                self._lock.release()
 
-    def _process_socket_data(self):
+    def _process_socket_data(self, conn: _Connection):
         """Read and process data from a socket. Returns False if it should stop."""
         try:
-            data = self.socket.recv(4096)
+            data = conn.socket.recv(4096)
             if not data:
                 return False
 
-            self._recv_buffer += data.decode("utf-8")
-            self._process_buffered_lines()
+            conn.buffer += data.decode("utf-8")
+            self._process_buffered_lines(conn)
             return True
 
         except socket.timeout:
             return True
 
-    def _process_buffered_lines(self):
+    def _process_buffered_lines(self, conn: _Connection):
         """Process all complete lines in the buffer"""
-        while "\n" in self._recv_buffer:
-            line, self._recv_buffer = self._recv_buffer.split("\n", 1)
+        while "\n" in conn.buffer:
+            line, conn.buffer = conn.buffer.split("\n", 1)
             if line.strip():
-                self._handle_ipc_line(line)
+                self._handle_ipc_line(conn, line)
 
-    def _handle_ipc_line(self, line):
+    def _handle_ipc_line(self, conn: _Connection, line):
         """Parse and handle a single IPC message line"""
         try:
             msg = json.loads(line)
 
         except json.JSONDecodeError as e:
-            self.logger.warning(f"JSON decode error {e} :/")
+            self.logger.warning("JSON decode error %s :/", e)
             return
 
-        self._handle_ipc_message(msg)
+        self._handle_ipc_message(conn, msg)
+
+    def _handle_ipc_message(self, conn: _Connection, msg):
+        """Process a parsed IPC message, dropping anything from a replaced connection"""
+        if conn is not self._conn:
+            return
 
-    def _handle_ipc_message(self, msg):
-        """Process a parsed IPC message"""
         if msg.get("error") == "success" and "data" in msg:
-            self._handle_response_data(msg)
+            self._handle_response_data(conn, msg)
+
+        event = msg.get("event")
+        if event == "property-change":
+            self._handle_property_change(conn, msg)
+
+        elif event == "playback-restart":
+            conn.qoe.on_playback_restart()
+
+        elif event == "seek":
+            conn.qoe.on_seek()
+
+        if msg.get("event") == "log-message":
+            self._handle_log_message(msg)
 
         if msg.get("event") == "end-file":
-            self._handle_end_file()
+            self._handle_end_file(conn, msg)
 
-    def _handle_response_data(self, msg):
+    def _handle_response_data(self, conn: _Connection, msg):
         """Handle response data based on request_id"""
         request_id = msg.get("request_id", 0)
         if request_id == 1:
             self._current_position = msg["data"]
+            conn.qoe.on_position(msg["data"])
 
         elif request_id == 2:
             self.current_duration = msg["data"]
 
-    def _handle_end_file(self):
-        """Handle end-file event"""
-        self.running = False
-        if self.on_exit:
-            self.on_exit()
+    def _handle_property_change(self, conn: _Connection, msg):
+        """Feed observed properties into the launch's QoE stats"""
+        name, data = msg.get("name"), msg.get("data")
+        if name == "paused-for-cache":
+            conn.qoe.on_paused_for_cache(bool(data))
+
+        elif name == "demuxer-cache-duration":
+            conn.qoe.on_cache_duration(data)
+
+        elif name == "frame-drop-count":
+            conn.qoe.on_dropped_frames(data)
+
+        elif name == "cache-speed":
+            conn.qoe.on_cache_speed(data)
+
+        elif name == "playlist-pos":
+            self._handle_playlist_pos(conn, data)
+
+    def _handle_playlist_pos(self, conn: _Connection, position):
+        """mpv moved to another playlist entry: hand the finished entry's QoE to on_entry_change"""
+        if conn.playlist_size <= 1 or position is None or position < 0 or position == conn.playlist_pos:
+            return
+
+        previous, finished = conn.playlist_pos, conn.qoe
+        reason, conn.entry_end_reason = conn.entry_end_reason, None
+        conn.playlist_pos = position
+        conn.qoe = QoEStats()
+        self.load_error = None
+        self.current_duration = None
+        self._current_position = None
+
+        self.logger.info("Playlist moved from entry %s to %s (%s)", previous, position, reason)
+        if conn.on_entry_change:
+            conn.on_entry_change(previous, position, reason, finished)
+
+    def _handle_log_message(self, msg):
+        """Watch mpv's error log for HTTP failures while opening the stream"""
+        text = msg.get("text", "")
+        if "HTTP error" in text or "403 Forbidden" in text:
+            self.load_error = text.strip()
+
+    def _entry_ended(self, conn: _Connection, msg) -> bool:
+        """True if end-file only finished one playlist entry and mpv goes on with another"""
+        reason = msg.get("reason")
+        if conn.playlist_size <= 1 or reason == "quit":
+            return False
+        return reason == "stop" or conn.playlist_pos < conn.playlist_size - 1
+
+    def _handle_end_file(self, conn: _Connection, msg):
+        """Handle end-file event with the callbacks that were set when conn was launched"""
+        entry_only = self._entry_ended(conn, msg)
+        if not entry_only:
+            conn.stopped.set()
+
+        if msg.get("reason") == "error":
+            self.load_error = self.load_error or msg.get("file_error", "loading failed")
+        conn.qoe.load_error = self.load_error
+
+        if self.load_error and conn.on_load_error:
+            conn.on_load_error(self.load_error)
+
+        if entry_only:
+            conn.entry_end_reason = msg.get("reason")
+            return
+
+        if conn.on_exit:
+            conn.on_exit()
 
     def _connect_to_socket(self, max_attempts=30, delay=0.2):
         """Separate connection logic with better error handling"""
@@ -215,15 +488,15 @@ class MPVControl:
             self.socket.settimeout(2.0)
             self.socket.connect(str(self.ipc_path))
             self.socket.settimeout(0.5)
-            self.logger.info(f"Connected to MPV socket on attempt {attempt + 1}")
+            self.logger.info("Connected to MPV socket on attempt %s", attempt + 1)
             return True
 
         except (ConnectionRefusedError, FileNotFoundError) as e:
-            self.logger.debug(f"Attempt {attempt + 1}: {e}")
+            self.logger.debug("Attempt %s: %s", attempt + 1, e)
             return False
 
         except Exception as e:
-            self.logger.error(f"Unexpected socket error on attempt {attempt + 1}: {e}")
+            self.logger.error("Unexpected socket error on attempt %s: %s", attempt + 1, e)
             return False
 
     def _cleanup_failed_socket(self):
@@ -233,7 +506,7 @@ class MPVControl:
                 self.socket.close()
 
             except Exception as e:
-                self.logger.error(f"Failed to close socket: {e} :/")
+                self.logger.error("Failed to close socket: %s :/", e)
             self.socket = None
 
     def send(self, command, args=None, request_id=0):
@@ -251,7 +524,7 @@ class MPVControl:
             else:
                 self.socket.send(raw_payload)
         except Exception as e:
-            self.logger.error(f"Failed to send command: {e}")
+            self.logger.error("Failed to send command: %s", e)
 
     def get_current_state(self):
         """Get current playback position and duration."""
@@ -263,14 +536,17 @@ class MPVControl:
             return self._current_position, self.current_duration
 
         except Exception as e:
-            self.logger.error(f"Failed to get playback state: {e} :/")
+            self.logger.error("Failed to get playback state: %s :/", e)
             return None, None
 
     def start_progress_tracker(self, callback, interval=10):
-        """Tracks MPV's actual playback time and duration."""
+        """Tracks MPV's actual playback time and duration until this launch ends."""
+        conn = self._conn
+        if conn is None:
+            return
 
         def _track():
-            while self.running:
+            while not conn.stopped.is_set() and conn is self._conn:
                 try:
                     position, duration = self.get_current_state()
 
@@ -282,11 +558,14 @@ class MPVControl:
                         callback(int(position), int(position) + 300)
 
                 except Exception as e:
-                    self.logger.error(f"Error tracking progress: {e} :/")
+                    self.logger.error("Error tracking progress: %s :/", e)
 
-                time.sleep(interval)
+                conn.stopped.wait(interval)
 
-        self._progress_thread = threading.Thread(target=_track, daemon=True)
+        self._progress_thread = threading.Thread(
+            target=_track, name=f"mpv-progress-{conn.generation}", daemon=True
+        )
+        conn.threads.append(self._progress_thread)
         self._progress_thread.start()
 
     def get_elapsed_time(self):
@@ -294,8 +573,31 @@ class MPVControl:
         position, _ = self.get_current_state()
         return int(position) if position is not None else 0
 
+    def _release(self, conn: _Connection):
+        """Stop a connection and close what it owns without touching the current one"""
+        conn.stopped.set()
+        if conn.socket:
+            try:
+                conn.socket.close()
+            except OSError:
+                pass
+
+        if conn.process:
+            try:
+                conn.process.terminate()
+            except OSError:
+                pass
+
     def close(self):
-        self.running = False
+        """Stop the current mpv, waiting for a launch in progress so it cannot outlive this"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.closed = True
+            self._close()
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.stopped.set()
         if self.socket:
             try:
                 self.socket.close()
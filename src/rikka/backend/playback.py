@@ -0,0 +1,131 @@
+import itertools
+import threading
+import time
+
+MAX_SESSIONS = 4
+
+_session_ids = itertools.count(1)
+
+class PlaybackSession:
+    """One play_episode() or play_queue() call: what is playing and whether it still owns the player.
+
+    Player callbacks are bound to a session, so an exit or progress report from a
+    replaced session is ignored instead of clobbering the current one. A queue session
+    holds one (episode, url, quality) entry per mpv playlist entry and follows mpv's
+    playlist position through select().
+    """
+
+    def __init__(self, anime, episode: int, anime_id: str, anime_name: str, url: str, quality: int = None,
+                 queue: list = None):
+        self.id = next(_session_ids)
+        self.anime = anime
+        self.episode = episode
+        self.anime_id = anime_id
+        self.anime_name = anime_name
+        self.url = url
+        self.quality = quality
+        self.cache_profile = None
+        self.player = None
+        self.qoe = None
+        self.started = time.time()
+        self.queue = queue or [(episode, url, quality)]
+        self.position = 0
+        self.last_progress = None
+        self._ended = threading.Event()
+        self._finished = threading.Event()
+
+    @property
+    def active(self) -> bool:
+        return not self._ended.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    def select(self, position: int):
+        """Switch to another queue entry"""
+        self.position = position
+        self.episode, self.url, self.quality = self.queue[position]
+        self.last_progress = None
+
+    def end(self) -> bool:
+        """Mark the session finished, False if it already was (call with the backend lock held)"""
+        if self._ended.is_set():
+            return False
+
+        self._ended.set()
+        return True
+
+    def finish(self):
+        """Its exit has been handled (history saved, auto-next started), or it never gets one"""
+        self._finished.set()
+
+    def wait_finished(self, timeout: float = None) -> bool:
+        return self._finished.wait(timeout)
+
+    def __repr__(self):
+        state = "active" if self.active else "ended"
+        return f"<PlaybackSession #{self.id} {self.anime_name} EP{self.episode} {state}>"
+
+class PlaybackManager:
+    """Which session owns each player, so several sessions (one mpv and IPC socket each) run side by side.
+
+    A new session takes over the player of the session it replaces (by default the
+    foreground one, the last started). Played alongside, it takes an idle player or a
+    new one from player_factory, up to max_sessions. Call with the backend lock held.
+    """
+
+    def __init__(self, player, player_factory=None, max_sessions: int = MAX_SESSIONS):
+        self.player_factory = player_factory
+        self.max_sessions = max(1, max_sessions)
+        self.foreground = None
+        self.players = [player]
+        self._owners = {}
+
+    def owns(self, session: PlaybackSession) -> bool:
+        """True while no other session has taken over session's player"""
+        return session.player is not None and self._owners.get(session.player) is session
+
+    def _idle(self, player) -> bool:
+        owner = self._owners.get(player)
+        return owner is None or not owner.active
+
+    def player_for(self, replace: PlaybackSession = None, alongside: bool = False):
+        """Player for a new session: replace's, else the foreground's unless alongside.
+
+        Alongside, or with no session to replace, an idle player is reused or a new one
+        made; with max_sessions running the oldest session's player is taken.
+        """
+        if replace is None and not alongside:
+            replace = self.foreground
+        if replace is not None and self.owns(replace):
+            return replace.player
+
+        idle = next((player for player in self.players if self._idle(player)), None)
+        if idle is not None:
+            return idle
+
+        if self.player_factory is not None and len(self.players) < self.max_sessions:
+            self.players.append(self.player_factory())
+            return self.players[-1]
+
+        oldest = min(self.active(), key=lambda session: session.started)
+        return oldest.player
+
+    def bind(self, player, session: PlaybackSession):
+        """Give player to session and bring it to the foreground, returns the session it replaced"""
+        previous = self._owners.get(player)
+        self._owners[player] = session
+        session.player = player
+        self.foreground = session
+        return previous
+
+    def active(self) -> list:
+        return [session for session in self._owners.values() if session.active]
+
+    def unfinished(self) -> list:
+        """Sessions still playing or still handling their exit"""
+        return [session for session in self._owners.values() if not session.finished]
+
+    def running(self) -> bool:
+        return any(player.running for player in self.players)
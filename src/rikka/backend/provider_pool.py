@@ -0,0 +1,123 @@
+"""Run provider operations in worker processes.
+
+Response decoding and HTML/JSON parsing then happen outside the TUI process,
+so they no longer compete with rendering for the GIL. Workers keep their own
+providers and pooled session, and send back plain tuples/dicts that the
+parent turns back into anipy result objects.
+"""
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import asdict
+
+from anipy_api.provider import LanguageTypeEnum, ProviderSearchResult
+
+from src.rikka.backend.http_session import build_session, inject_session, request_deadline
+from src.rikka.backend.records import InfoRecord, stream_from_dict, stream_to_dict
+from src.rikka.utils.logger import get_logger
+
+OPERATIONS = ("get_search", "get_info", "get_episodes", "get_video")
+
+_session = None
+_providers = {}
+
+def worker_http_config(http_config: dict, processes: int) -> dict:
+    """Split the per-host rate limits between worker processes so their sum stays the same"""
+    def _split(limits: dict, rate_key: str, concurrency_key: str) -> dict:
+        limits = dict(limits)
+        if limits.get(rate_key):
+            limits[rate_key] = limits[rate_key] / processes
+        if limits.get(concurrency_key):
+            limits[concurrency_key] = max(1, limits[concurrency_key] // processes)
+        return limits
+
+    config = _split(http_config, "rate_limit", "host_concurrency")
+    config["host_limits"] = {
+        host: _split(limits, "rate", "concurrency")
+        for host, limits in (http_config.get("host_limits") or {}).items()
+    }
+    return config
+
+def _init_worker(http_config: dict):
+    global _session
+    _session = build_session(**http_config)
+
+def _warm_up() -> bool:
+    return True
+
+def _worker_provider(name: str):
+    from src.rikka.backend.backend import build_provider
+
+    if name not in _providers:
+        provider = build_provider(name)
+        if provider is None:
+            raise ValueError(f"Unknown provider '{name}'")
+        inject_session(provider, _session)
+        _providers[name] = provider
+    return _providers[name]
+
+def _serialize(method: str, result):
+    if method == "get_search":
+        return [(r.identifier, r.name, [lang.value for lang in r.languages]) for r in result]
+
+    if method == "get_info":
+        return asdict(InfoRecord.from_info(result))
+
+    if method == "get_video":
+        return [stream_to_dict(s) for s in result]
+
+    return list(result)
+
+def _deserialize(method: str, data):
+    if method == "get_search":
+        return [
+            ProviderSearchResult(identifier, name, {LanguageTypeEnum(lang) for lang in languages})
+            for identifier, name, languages in data
+        ]
+
+    if method == "get_info":
+        return InfoRecord(**data).to_info()
+
+    if method == "get_video":
+        return [stream_from_dict(s) for s in data]
+
+    return data
+
+def run_provider_op(provider_name: str, method: str, *args, timeout: float = None):
+    """Entry point executed inside a worker process, timeout bounds the provider's requests"""
+    if method not in OPERATIONS:
+        raise ValueError(f"Unsupported provider operation '{method}'")
+
+    provider = _worker_provider(provider_name)
+    if timeout is None:
+        return _serialize(method, getattr(provider, method)(*args))
+    with request_deadline(time.monotonic() + timeout):
+        return _serialize(method, getattr(provider, method)(*args))
+
+class ProviderProcessPool:
+    """Small spawn-based process pool that executes provider calls by provider name."""
+
+    def __init__(self, processes: int, http_config: dict):
+        self.logger = get_logger("ProviderProcessPool")
+        self.executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(worker_http_config(http_config, processes),),
+        )
+        for _ in range(processes):
+            self.executor.submit(_warm_up)
+        self.logger.info("Started %s provider worker processes", processes)
+
+    def call(self, provider_name: str, method: str, *args, timeout: float = None):
+        future = self.executor.submit(run_provider_op, provider_name, method, *args, timeout=timeout)
+        try:
+            data = future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+        return _deserialize(method, data)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
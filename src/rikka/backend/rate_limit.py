@@ -0,0 +1,158 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from requests.exceptions import RequestException
+
+from src.rikka.utils.logger import get_logger
+
+BACKOFF_FACTOR = 0.5
+RECOVERY_STEP = 0.05  # of the configured rate, per successful response
+MIN_RATE_FRACTION = 1 / 16
+MIN_RATE = 0.05  # req/s, no host is ever throttled below this
+MAX_RETRY_AFTER = 120
+MAX_WAIT = 30
+
+def is_throttle_status(status: Optional[int]) -> bool:
+    return status is not None and (status == 429 or status >= 500)
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return max(0.0, min(seconds, MAX_RETRY_AFTER))
+
+class RateLimited(RequestException):
+    """A request waited longer than MAX_WAIT for its host's rate limit"""
+
+class HostLimit:
+    """Token bucket and concurrency cap for one host.
+
+    The refill rate backs off multiplicatively on 429/5xx responses and recovers
+    additively on successful ones (AIMD), a Retry-After pauses the host entirely.
+    """
+
+    def __init__(self, host: str, rate: float, burst: int, concurrency: int):
+        self.host = host
+        self.max_rate = max(MIN_RATE, float(rate))
+        self.rate = self.max_rate
+        self.burst = max(1, int(burst))
+        self.concurrency = max(1, int(concurrency))
+
+        self.tokens = float(self.burst)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.waited = 0.0
+
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self.logger = get_logger("RateGovernor")
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, max_wait: float = MAX_WAIT):
+        start = time.monotonic()
+        deadline = start + max_wait
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1 and self.in_flight < self.concurrency:
+                    break
+
+                if now >= deadline:
+                    raise RateLimited(f"Waited {max_wait}s for a request slot on {self.host}")
+
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                elif self.tokens < 1:
+                    delay = (1 - self.tokens) / self.rate
+                else:
+                    delay = None  # woken up by release()
+                self._cond.wait(min(delay or max_wait, deadline - now))
+
+            self.tokens -= 1
+            self.in_flight += 1
+            self.requests += 1
+            self.waited += now - start
+
+    def release(self, status: Optional[int] = None, retry_after: Optional[float] = None):
+        with self._cond:
+            self.in_flight -= 1
+            if is_throttle_status(status):
+                self.throttled += 1
+                self.rate = max(MIN_RATE, self.max_rate * MIN_RATE_FRACTION, self.rate * BACKOFF_FACTOR)
+                if retry_after:
+                    self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+                self.logger.warning(
+                    "HTTP %s from %s, backing off to %.2f req/s :/", status, self.host, self.rate
+                )
+            elif status is not None and self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "rate": round(self.rate, 2),
+                "in_flight": self.in_flight,
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "waited": round(self.waited, 2),
+            }
+
+class RateGovernor:
+    """Per-host rate and concurrency limits shared by every outbound request"""
+
+    def __init__(self, rate: float = 8, burst: int = 16, concurrency: int = 6, host_limits: dict = None):
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.host_limits = {host: self._checked(host, custom) for host, custom in (host_limits or {}).items()}
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _checked(self, host: str, custom: dict) -> dict:
+        """custom without a rate that is not a positive number, that host then gets the default"""
+        rate = custom.get("rate")
+        if rate is None:
+            return custom
+        if isinstance(rate, (int, float)) and not isinstance(rate, bool) and rate > 0:
+            return custom
+
+        get_logger("RateGovernor").warning(
+            "http_host_limits rate for %s must be above 0, got %r, using %s req/s :/", host, rate, self.rate
+        )
+        return {key: value for key, value in custom.items() if key != "rate"}
+
+    def limit_for(self, host: str) -> HostLimit:
+        with self._lock:
+            limit = self._hosts.get(host)
+            if limit is None:
+                custom = self.host_limits.get(host, {})
+                limit = HostLimit(
+                    host,
+                    rate=custom.get("rate", self.rate),
+                    burst=custom.get("burst", self.burst),
+                    concurrency=custom.get("concurrency", self.concurrency),
+                )
+                self._hosts[host] = limit
+            return limit
+
+    def stats(self) -> dict:
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {host: limit.stats() for host, limit in hosts.items()}
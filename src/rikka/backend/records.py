@@ -0,0 +1,133 @@
+"""Compact, versioned records for what AnimeBackend keeps in diskcache.
+
+Records hold plain values only and are stored as JSON text, so cache hits skip
+unpickling and never drag provider sessions along. The backend rehydrates
+Anime objects against its live providers.
+"""
+import json
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from anipy_api.anime import Anime
+from anipy_api.provider import LanguageTypeEnum, ProviderInfoResult, ProviderStream, Status
+from anipy_api.provider.base import ExternalSub
+
+RECORD_VERSION = 1
+
+@dataclass(slots=True, frozen=True)
+class AnimeRecord:
+    provider: str
+    identifier: str
+    name: str
+    languages: tuple
+
+    @classmethod
+    def from_anime(cls, anime: Anime) -> "AnimeRecord":
+        return cls(
+            provider=anime.provider.NAME,
+            identifier=anime.identifier,
+            name=anime.name,
+            languages=tuple(sorted(lang.value for lang in anime.languages)),
+        )
+
+    def to_anime(self, provider) -> Anime:
+        languages = {LanguageTypeEnum(lang) for lang in self.languages}
+        return Anime(provider, self.name, self.identifier, languages)
+
+@dataclass(slots=True, frozen=True)
+class InfoRecord:
+    name: Optional[str] = None
+    image: Optional[str] = None
+    genres: Optional[tuple] = None
+    synopsis: Optional[str] = None
+    release_year: Optional[int] = None
+    status: Optional[int] = None
+    alternative_names: Optional[tuple] = None
+
+    @classmethod
+    def from_info(cls, info: ProviderInfoResult) -> "InfoRecord":
+        return cls(
+            name=info.name,
+            image=info.image,
+            genres=tuple(info.genres) if info.genres else None,
+            synopsis=info.synopsis,
+            release_year=info.release_year,
+            status=info.status.value if info.status else None,
+            alternative_names=tuple(info.alternative_names) if info.alternative_names else None,
+        )
+
+    def to_info(self) -> ProviderInfoResult:
+        return ProviderInfoResult(
+            name=self.name,
+            image=self.image,
+            genres=list(self.genres) if self.genres else None,
+            synopsis=self.synopsis,
+            release_year=self.release_year,
+            status=Status(self.status) if self.status else None,
+            alternative_names=list(self.alternative_names) if self.alternative_names else None,
+        )
+
+def stream_to_dict(stream: ProviderStream) -> dict:
+    return {
+        "url": stream.url,
+        "resolution": stream.resolution,
+        "episode": stream.episode,
+        "language": stream.language.value,
+        "subtitle": {k: asdict(v) for k, v in stream.subtitle.items()} if stream.subtitle else None,
+        "referrer": stream.referrer,
+        "container": stream.container,
+    }
+
+def stream_from_dict(data: dict) -> ProviderStream:
+    subtitle = {k: ExternalSub(**v) for k, v in data["subtitle"].items()} if data.get("subtitle") else None
+    return ProviderStream(**{**data, "language": LanguageTypeEnum(data["language"]), "subtitle": subtitle})
+
+def pack(kind: str, data) -> str:
+    """Serialize data (records or plain values) into a versioned JSON payload"""
+    if isinstance(data, (AnimeRecord, InfoRecord)):
+        data = asdict(data)
+    elif isinstance(data, list):
+        data = [asdict(d) if isinstance(d, (AnimeRecord, InfoRecord)) else d for d in data]
+
+    return json.dumps({"v": RECORD_VERSION, "k": kind, "d": data}, separators=(",", ":"))
+
+def unpack(kind: str, payload):
+    """Return the payload's data, or None when it is missing, stale or malformed"""
+    if not isinstance(payload, str):
+        return None
+
+    try:
+        decoded = json.loads(payload)
+    except json.JSONDecodeError:
+        return None
+
+    if decoded.get("v") != RECORD_VERSION or decoded.get("k") != kind:
+        return None
+    return decoded.get("d")
+
+def pack_anime_list(anime_list) -> str:
+    return pack("anime_list", [AnimeRecord.from_anime(a) for a in anime_list])
+
+def unpack_anime_list(payload) -> Optional[list]:
+    data = unpack("anime_list", payload)
+    if data is None:
+        return None
+    return [AnimeRecord(**{**d, "languages": tuple(d["languages"])}) for d in data]
+
+def pack_info(info: ProviderInfoResult) -> str:
+    return pack("info", InfoRecord.from_info(info))
+
+def unpack_info(payload) -> Optional[ProviderInfoResult]:
+    data = unpack("info", payload)
+    if data is None:
+        return None
+    return InfoRecord(**data).to_info()
+
+def pack_languages(available: dict) -> str:
+    return pack("languages", {lang.value: list(episodes) for lang, episodes in available.items()})
+
+def unpack_languages(payload) -> Optional[dict]:
+    data = unpack("languages", payload)
+    if data is None:
+        return None
+    return {LanguageTypeEnum(lang): episodes for lang, episodes in data.items()}
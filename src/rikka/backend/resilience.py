@@ -0,0 +1,172 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from src.rikka.utils.logger import get_logger
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"Circuit open for {endpoint}, retrying in {retry_in:.0f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+class LatencyTracker:
+    """Rolling window of call latencies for one endpoint."""
+
+    def __init__(self, window: int = 100, min_samples: int = 20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, pct: float):
+        """Return the pct (0-1) latency, or None until enough samples are in"""
+        with self._lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+
+        return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+class CircuitBreaker:
+    """Classic closed -> open -> half-open breaker, counted in consecutive failures.
+
+    Half-open lets a single probe through; everyone else is rejected until it closes
+    or re-opens the breaker.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False  # still open, or a half-open probe is in flight
+
+    def retry_in(self) -> float:
+        if self.state == self.HALF_OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+class ResilientCaller:
+    """Runs provider calls behind a per-endpoint circuit breaker.
+
+    Once an endpoint has enough latency samples, a call still running past its
+    p95 gets a second (hedged) attempt and whichever succeeds first wins.
+    """
+
+    def __init__(
+        self,
+        hedge_min_delay: float = 1.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        max_workers: int = 8,
+    ):
+        self.hedge_min_delay = hedge_min_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.hedges = 0
+
+        self._breakers = {}
+        self._latencies = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rikka-hedge")
+        self.logger = get_logger("ResilientCaller")
+
+    def _state_for(self, endpoint: str):
+        with self._lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self._latencies[endpoint] = LatencyTracker()
+            return self._breakers[endpoint], self._latencies[endpoint]
+
+    def call(self, endpoint: str, fn, *args, **kwargs):
+        breaker, latency = self._state_for(endpoint)
+        if not breaker.allow():
+            raise CircuitOpenError(endpoint, breaker.retry_in())
+
+        start = time.monotonic()
+        try:
+            result = self._hedged(endpoint, latency, fn, args, kwargs)
+
+        except Exception:
+            breaker.record_failure()
+            if breaker.state == CircuitBreaker.OPEN:
+                self.logger.warning("Circuit opened for %s :(", endpoint)
+            raise
+
+        breaker.record_success()
+        latency.record(time.monotonic() - start)
+        return result
+
+    def _hedged(self, endpoint, latency, fn, args, kwargs):
+        p95 = latency.percentile(0.95)
+        if p95 is None:
+            return fn(*args, **kwargs)
+
+        first = self._pool.submit(fn, *args, **kwargs)
+        done, _ = wait([first], timeout=max(p95, self.hedge_min_delay))
+        if done:
+            return first.result()
+
+        self.hedges += 1
+        self.logger.info("%s slower than p95 (%.2fs), sending hedged request", endpoint, p95)
+        pending = {first, self._pool.submit(fn, *args, **kwargs)}
+        error = None
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+
+        raise error
+
+    def stats(self) -> dict:
+        """Breaker state and latency percentiles per endpoint"""
+        with self._lock:
+            endpoints = list(self._breakers)
+
+        out = {}
+        for endpoint in endpoints:
+            breaker, latency = self._state_for(endpoint)
+            out[endpoint] = {
+                "state": breaker.state,
+                "failures": breaker.failures,
+                "p50": latency.percentile(0.5),
+                "p95": latency.percentile(0.95),
+            }
+        return out
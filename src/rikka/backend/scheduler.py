@@ -0,0 +1,252 @@
+import contextlib
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from enum import IntEnum
+
+from src.rikka.utils.logger import get_logger
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0  # the user is waiting on it (search, open a show, play)
+    VISIBLE = 1  # fills in something already on screen
+    SPECULATIVE = 2  # a guess about what the user does next (prefetch)
+    MAINTENANCE = 3  # periodic upkeep, nobody is waiting
+
+BACKGROUND = (Priority.SPECULATIVE, Priority.MAINTENANCE)
+
+class _Job:
+    __slots__ = ("priority", "seq", "fn", "args", "kwargs", "future", "submitted")
+
+    def __init__(self, priority, seq, fn, args, kwargs):
+        self.priority = priority
+        self.seq = seq
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.submitted = time.monotonic()
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+class _ClassStats:
+    __slots__ = ("queued", "running", "max_queued", "submitted", "completed", "cancelled", "wait_total", "wait_max")
+
+    def __init__(self):
+        self.queued = self.running = self.max_queued = 0
+        self.submitted = self.completed = self.cancelled = 0
+        self.wait_total = self.wait_max = 0.0
+
+class PriorityScheduler:
+    """Bounded worker threads shared by every screen, serving jobs by priority class.
+
+    One extra worker only ever runs INTERACTIVE jobs, so a user action never queues
+    behind background work that is already running. SPECULATIVE and MAINTENANCE jobs
+    are capped at background_limit concurrent jobs, and an INTERACTIVE submission
+    cancels the speculative jobs that have not started yet.
+
+    A job fanning out to more jobs waits for them in waiting(), a stand-in worker runs
+    in its place meanwhile so the nested jobs cannot starve behind their callers.
+    """
+
+    def __init__(self, workers: int = 4, background_limit: int = None, name: str = "rikka-io"):
+        self.workers = max(1, workers)
+        self.background_limit = background_limit or max(1, self.workers // 2)
+        self.name = name
+        self.logger = get_logger("PriorityScheduler")
+
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stats = {p: _ClassStats() for p in Priority}
+        self._waiting = {p: 0 for p in Priority}  # running jobs parked in waiting()
+        self._local = threading.local()
+        self._shutdown = False
+
+        self._threads = [
+            threading.Thread(target=self._worker, args=(False,), name=f"{name}-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        self._threads.append(
+            threading.Thread(target=self._worker, args=(True,), name=f"{name}-interactive", daemon=True)
+        )
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn, *args, priority: Priority = Priority.VISIBLE, **kwargs) -> Future:
+        job = _Job(Priority(priority), next(self._seq), fn, args, kwargs)
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new jobs after shutdown")
+
+            if job.priority == Priority.INTERACTIVE:
+                self._preempt_speculative()
+
+            heapq.heappush(self._queue, job)
+            stats = self._stats[job.priority]
+            stats.submitted += 1
+            stats.queued += 1
+            stats.max_queued = max(stats.max_queued, stats.queued)
+            self._cond.notify_all()
+        return job.future
+
+    def current_priority(self, default: Priority = Priority.INTERACTIVE) -> Priority:
+        """Class of the job running on this thread, default outside the workers"""
+        job = getattr(self._local, "job", None)
+        return default if job is None else job.priority
+
+    @contextlib.contextmanager
+    def waiting(self):
+        """Park the job running on this thread while it waits on jobs it submitted.
+
+        A stand-in worker runs until the block exits, and the parked job no longer counts
+        against background_limit. Outside the workers (UI, CLI, daemon threads) it does nothing.
+        """
+        job = getattr(self._local, "job", None)
+        if job is None:
+            yield
+            return
+
+        released = threading.Event()
+        with self._cond:
+            self._waiting[job.priority] += 1
+            self._cond.notify_all()
+        threading.Thread(
+            target=self._worker, args=(self._local.interactive_only, released),
+            name=f"{self.name}-standin", daemon=True,
+        ).start()
+        try:
+            yield
+        finally:
+            released.set()
+            with self._cond:
+                self._waiting[job.priority] -= 1
+                self._cond.notify_all()
+
+    def as_completed(self, futures, timeout: float = None):
+        """concurrent.futures.as_completed for jobs of this scheduler, safe to call from a job"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pending = set(futures)
+        while pending:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            with self.waiting():
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                raise FutureTimeoutError(f"{len(pending)} (of {len(futures)}) futures unfinished")
+            yield from done
+
+    def _preempt_speculative(self):
+        """Cancel queued speculative jobs, the user just did something else"""
+        kept = []
+        for job in self._queue:
+            if job.priority == Priority.SPECULATIVE and job.future.cancel():
+                job.future.set_running_or_notify_cancel()
+                stats = self._stats[job.priority]
+                stats.queued -= 1
+                stats.cancelled += 1
+            else:
+                kept.append(job)
+
+        dropped = len(self._queue) - len(kept)
+        if dropped:
+            heapq.heapify(kept)
+            self._queue = kept
+            self.logger.debug("Interactive job preempted %s speculative jobs", dropped)
+
+    def _runnable(self, interactive_only: bool):
+        """Pop the next job this worker may run, None if it has to wait (call with _cond held)"""
+        while self._queue:
+            job = self._queue[0]
+            if job.future.cancelled():
+                # Cancelled by its caller: wake wait() and as_completed() on it
+                heapq.heappop(self._queue)
+                job.future.set_running_or_notify_cancel()
+                stats = self._stats[job.priority]
+                stats.queued -= 1
+                stats.cancelled += 1
+                continue
+
+            if interactive_only and job.priority != Priority.INTERACTIVE:
+                return None
+
+            if job.priority in BACKGROUND:
+                running = sum(self._stats[p].running - self._waiting[p] for p in BACKGROUND)
+                if running >= self.background_limit:
+                    return None
+
+            return heapq.heappop(self._queue)
+        return None
+
+    def _worker(self, interactive_only: bool, released: threading.Event = None):
+        """Run jobs until shutdown, a stand-in only until the worker it replaces is released"""
+        self._local.interactive_only = interactive_only
+        while True:
+            with self._cond:
+                job = self._runnable(interactive_only)
+                while job is None:
+                    if self._shutdown or (released is not None and released.is_set()):
+                        return
+                    self._cond.wait()
+                    job = self._runnable(interactive_only)
+
+                stats = self._stats[job.priority]
+                stats.queued -= 1
+                if not job.future.set_running_or_notify_cancel():
+                    stats.cancelled += 1
+                    continue
+
+                waited = time.monotonic() - job.submitted
+                stats.running += 1
+                stats.wait_total += waited
+                stats.wait_max = max(stats.wait_max, waited)
+
+            self._local.job = job
+            try:
+                job.future.set_result(job.fn(*job.args, **job.kwargs))
+            except BaseException as e:
+                job.future.set_exception(e)
+            finally:
+                self._local.job = None
+                with self._cond:
+                    stats.running -= 1
+                    stats.completed += 1
+                    self._cond.notify_all()
+
+            if released is not None and released.is_set():
+                return
+
+    def stats(self) -> dict:
+        """Queue depth, running jobs and queue wait per priority class"""
+        with self._cond:
+            report = {}
+            for priority, s in self._stats.items():
+                started = s.completed + s.running
+                report[priority.name.lower()] = {
+                    "queued": s.queued,
+                    "running": s.running,
+                    "waiting": self._waiting[priority],
+                    "max_queued": s.max_queued,
+                    "submitted": s.submitted,
+                    "completed": s.completed,
+                    "cancelled": s.cancelled,
+                    "wait_avg_ms": round(s.wait_total / started * 1000, 1) if started else None,
+                    "wait_max_ms": round(s.wait_max * 1000, 1),
+                }
+            return report
+
+    def shutdown(self):
+        """Cancel queued jobs and let the workers exit once their current job is done"""
+        with self._cond:
+            self._shutdown = True
+            for job in self._queue:
+                job.future.cancel()
+                job.future.set_running_or_notify_cancel()
+                stats = self._stats[job.priority]
+                stats.queued -= 1
+                stats.cancelled += 1
+            self._queue = []
+            self._cond.notify_all()
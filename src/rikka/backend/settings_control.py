@@ -1,24 +1,53 @@
 import json
-import yaml
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, Dict
+
+import yaml
 from platformdirs import user_config_dir
 
 from src.rikka.utils.logger import get_logger
 
+
 class AnimeSettings:
     DEFAULT_SETTINGS = {
         "quality": 1080,
+        "languages": ["sub", "dub"],
 
         "auto_resume": True,
         "fullscreen": True,
         "skip_intro_seconds": 0,
         "skip_outro_seconds": 0,
         "auto_next_episode": False,
+        "cache_profile": "auto",
+        "cache_profiles": {},
 
         "save_progress_interval": 30,
         "minimal_progress_threshold": 0.1,
         "history_limit": 50,
+
+        "io_workers": 4,
+        "background_workers": 2,
+        "queue_concurrency": 3,
+        "max_playback_sessions": 4,
+        "providers": ["allanime"],
+        "provider_timeout": 10,
+        "hedge_min_delay": 1.0,
+        "breaker_failure_threshold": 5,
+        "breaker_reset_seconds": 30,
+
+        "http_pool_size": 10,
+        "http_connect_timeout": 5,
+        "http_read_timeout": 20,
+        "http_retries": 1,
+        "http_rate_limit": 8,
+        "http_rate_burst": 16,
+        "http_host_concurrency": 6,
+        "http_host_limits": {},
+
+        "provider_processes": 0,
+        "daemon_refresh_interval": 900,
+
+        "log_levels": {},
     }
 
     def __init__(self, use_yaml: bool = True):
@@ -42,7 +71,7 @@ class AnimeSettings:
     def load(self):
         """Load settings from disk, create defaults if missing"""
         if not self.config_path.exists():
-            self.logger.info(f"No config found at {self.config_path}, creating defaults")
+            self.logger.info("No config found at %s, creating defaults", self.config_path)
             self.save()
             return
 
@@ -54,16 +83,16 @@ class AnimeSettings:
                     loaded = json.load(f)
 
             self.settings.update(loaded)
-            self.logger.info(f"Settings loaded from {self.config_path}")
+            self.logger.info("Settings loaded from %s", self.config_path)
 
         except yaml.YAMLError as e:
-            self.logger.error(f"Invalid YAML in config: {e}, using defaults :|")
+            self.logger.error("Invalid YAML in config: %s, using defaults :|", e)
 
         except json.JSONDecodeError as e:
-            self.logger.error(f"Invalid JSON in config: {e}, using defaults :|")
+            self.logger.error("Invalid JSON in config: %s, using defaults :|", e)
 
         except Exception as e:
-            self.logger.error(f"Failed to load settings: {e}, using defaults :|")
+            self.logger.error("Failed to load settings: %s, using defaults :|", e)
 
     def save(self):
         """Persist current settings to disk"""
@@ -82,10 +111,10 @@ class AnimeSettings:
                 else:
                     json.dump(self.settings, f, indent=2)
 
-            self.logger.debug(f"Settings saved to {self.config_path} :)")
+            self.logger.debug("Settings saved to %s :)", self.config_path)
 
         except Exception as e:
-            self.logger.error(f"Failed to save settings: {e} :(")
+            self.logger.error("Failed to save settings: %s :(", e)
 
     def get(self, key: str, default=None):
         """Get a setting value with optional default"""
@@ -106,13 +135,13 @@ class AnimeSettings:
             self.save()
 
         if old_value != value:
-            self.logger.info(f"Setting '{key}' changed: {old_value} -> {value}")
+            self.logger.info("Setting '%s' changed: %s -> %s", key, old_value, value)
 
     def update_multiple(self, updates: Dict[str, Any]):
         """Update multiple settings at once"""
         self.settings.update(updates)
         self.save()
-        self.logger.info(f"Updated {len(updates)} settings")
+        self.logger.info("Updated %s settings", len(updates))
 
     def reset(self):
         """Reset to default settings"""
@@ -124,9 +153,9 @@ class AnimeSettings:
         """Reset a single setting to its default value"""
         if key in self.DEFAULT_SETTINGS:
             self.set(key, self.DEFAULT_SETTINGS[key])
-            self.logger.info(f"Reset '{key}' to default: {self.DEFAULT_SETTINGS[key]}")
+            self.logger.info("Reset '%s' to default: %s", key, self.DEFAULT_SETTINGS[key])
         else:
-            self.logger.warning(f"No default value for '{key}'")
+            self.logger.warning("No default value for '%s'", key)
 
     def get_all(self) -> Dict[str, Any]:
         """Return copy of all settings"""
@@ -140,9 +169,9 @@ class AnimeSettings:
                     yaml.dump(self.settings, f, default_flow_style=False, indent=2)
                 else:
                     json.dump(self.settings, f, indent=2)
-            self.logger.info(f"Settings exported to {path}")
+            self.logger.info("Settings exported to %s", path)
         except Exception as e:
-            self.logger.error(f"Failed to export settings: {e}")
+            self.logger.error("Failed to export settings: %s", e)
 
     def import_from_file(self, path: Path):
         """Import settings from another file"""
@@ -155,10 +184,10 @@ class AnimeSettings:
 
             self.settings.update(loaded)
             self.save()
-            self.logger.info(f"Settings imported from {path}")
+            self.logger.info("Settings imported from %s", path)
 
         except Exception as e:
-            self.logger.error(f"Failed to import settings: {e}")
+            self.logger.error("Failed to import settings: %s", e)
 
     def __str__(self):
         """Pretty print current settings"""
@@ -0,0 +1,88 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+from platformdirs import user_cache_dir
+
+from src.rikka.utils.logger import get_logger
+
+SNAPSHOT_VERSION = 1
+RECENT_SEARCHES = 5
+RESULTS_PER_SEARCH = 50
+CONTINUE_ROWS = 10
+RESTORABLE_SCREENS = ("search", "continue_watching")
+
+class Snapshot:
+    """What the TUI showed when it last exited, rendered at startup before the backend is up.
+
+    Plain JSON in the cache dir, so reading it costs no anipy/requests imports. Search
+    results keep their anime as a record dict (see AnimeBackend.anime_to_record).
+    """
+
+    def __init__(self, cache_dir: Path = None):
+        self.cache_dir = Path(cache_dir or user_cache_dir("Rikka"))
+        self.file_path = self.cache_dir / "snapshot.json"
+
+        self.logger = get_logger("Snapshot")
+        self._lock = threading.Lock()
+        self.data = self.load()
+
+    def load(self) -> dict:
+        if self.file_path.exists():
+            try:
+                data = json.loads(self.file_path.read_text())
+                if data.get("version") == SNAPSHOT_VERSION:
+                    return data
+
+            except Exception as e:
+                self.logger.error("Failed to load session snapshot: %s :/", e)
+
+        return {"version": SNAPSHOT_VERSION, "last_screen": None, "continue_watching": None, "searches": []}
+
+    def save(self):
+        tmp_path = self.file_path.with_suffix(".json.tmp")
+        try:
+            with self._lock:
+                self.data["saved_at"] = time.time()
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path.write_text(json.dumps(self.data))
+                tmp_path.replace(self.file_path)
+
+        except Exception as e:
+            self.logger.error("Failed to save session snapshot: %s :/", e)
+
+    @property
+    def last_screen(self):
+        return self.data.get("last_screen")
+
+    @last_screen.setter
+    def last_screen(self, name):
+        self.data["last_screen"] = name if name in RESTORABLE_SCREENS else None
+
+    @property
+    def continue_watching(self):
+        """Continue-watching rows as of the last run, None if never recorded"""
+        return self.data.get("continue_watching")
+
+    def set_continue_watching(self, rows: list):
+        with self._lock:
+            self.data["continue_watching"] = list(rows[:CONTINUE_ROWS])
+
+    @property
+    def queries(self) -> list:
+        return [s["query"] for s in self.data.get("searches", [])]
+
+    def latest_search(self):
+        searches = self.data.get("searches")
+        return searches[0] if searches else None
+
+    def find_search(self, query: str):
+        return next((s for s in self.data.get("searches", []) if s["query"] == query), None)
+
+    def add_search(self, query: str, results: list):
+        """Remember a query and its first results, newest first"""
+        entry = {"query": query, "results": list(results[:RESULTS_PER_SEARCH])}
+        with self._lock:
+            searches = [s for s in self.data.get("searches", []) if s["query"] != query]
+            self.data["searches"] = [entry, *searches][:RECENT_SEARCHES]
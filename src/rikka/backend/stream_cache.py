@@ -0,0 +1,123 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit
+
+from anipy_api.provider import ProviderStream
+
+DEFAULT_TTL = 300
+MAX_TTL = 6 * 3600
+SAFETY_MARGIN = 60
+MAX_ENTRIES = 256
+
+# Query parameters that carry an absolute unix expiry on common CDNs
+EXPIRY_PARAMS = ("expires", "expire", "expiry", "exp", "e", "validto", "valid_until")
+# Akamai-style tokens embed the expiry inside another parameter or the path (hdnts=exp=...~acl=...)
+_EMBEDDED_EXPIRY_RE = re.compile(r"\bexp(?:ires)?[=:](\d{10,13})")
+
+def _to_epoch(value: str) -> Optional[float]:
+    if not value.isdigit():
+        return None
+
+    number = int(value)
+    if number > 10**12:
+        number /= 1000
+    return number if number > 10**9 else None
+
+def url_expiry(url: str) -> Optional[float]:
+    """Return the absolute expiry (unix time) encoded in a signed URL, if any"""
+    params = {k.lower(): v for k, v in parse_qsl(urlsplit(url).query)}
+
+    for name in EXPIRY_PARAMS:
+        if name in params:
+            expiry = _to_epoch(params[name])
+            if expiry:
+                return expiry
+
+    if "x-amz-date" in params and params.get("x-amz-expires", "").isdigit():
+        try:
+            signed = datetime.strptime(params["x-amz-date"], "%Y%m%dT%H%M%SZ")
+            return signed.replace(tzinfo=timezone.utc).timestamp() + int(params["x-amz-expires"])
+        except ValueError:
+            pass
+
+    match = _EMBEDDED_EXPIRY_RE.search(url)
+    if match:
+        return _to_epoch(match.group(1))
+    return None
+
+def stream_ttl(url: str, default_ttl: float = DEFAULT_TTL, now: float = None) -> float:
+    """Seconds a resolved stream URL can be reused for.
+
+    Signed URLs live until their expiry minus a safety margin, anything else
+    gets the conservative default.
+    """
+    expiry = url_expiry(url)
+    if expiry is None:
+        return default_ttl
+
+    now = time.time() if now is None else now
+    return max(0.0, min(MAX_TTL, expiry - now - SAFETY_MARGIN))
+
+class StreamCache:
+    """In-memory cache of resolved ProviderStreams keyed by (anime, episode, quality, language).
+
+    Holds at most max_entries streams, the least recently used one is dropped first.
+    """
+
+    def __init__(self, default_ttl: float = DEFAULT_TTL, max_entries: int = MAX_ENTRIES):
+        self.default_ttl = default_ttl
+        self.max_entries = max(1, max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(anime_id, episode, quality, lang):
+        return anime_id, episode, quality, str(lang)
+
+    def get(self, key) -> Optional[ProviderStream]:
+        with self._lock:
+            cached = self._entries.get(key)
+            if not cached:
+                return None
+
+            expires_at, stream = cached
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return stream
+
+    def put(self, key, stream: ProviderStream):
+        ttl = stream_ttl(stream.url, self.default_ttl)
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, stream)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_url(self, url: str) -> int:
+        """Drop every entry resolved to url, returns how many were removed"""
+        with self._lock:
+            stale = [k for k, (_, stream) in self._entries.items() if stream.url == url]
+            for k in stale:
+                del self._entries[k]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
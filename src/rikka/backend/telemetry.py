@@ -0,0 +1,225 @@
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlparse
+
+from platformdirs import user_data_dir
+
+from src.rikka.utils.logger import get_logger
+
+MAX_SESSIONS = 500
+
+def stream_host(url: str) -> str:
+    return urlparse(url).hostname or "unknown"
+
+def _mean(values):
+    values = [v for v in values if v is not None]
+    return round(sum(values) / len(values), 3) if values else None
+
+class QoEStats:
+    """Quality-of-experience numbers for one mpv launch, fed from IPC events"""
+
+    def __init__(self, launched_at: float = None):
+        self.launched_at = launched_at or time.monotonic()
+        self.first_frame = None
+        self.stalls = 0
+        self.stall_seconds = 0.0
+        self.dropped_frames = 0
+        self.seek_latencies = []
+        self.load_error = None
+        self.watched_seconds = 0.0
+
+        self._speed_total = 0.0
+        self._speed_samples = 0
+
+        self._cache_total = 0.0
+        self._cache_samples = 0
+        self.cache_min = None
+        self._stall_start = None
+        self._seek_start = None
+        self._lock = threading.Lock()
+
+    def on_playback_restart(self, now: float = None):
+        """mpv started (or resumed after a seek) rendering frames"""
+        now = now or time.monotonic()
+        with self._lock:
+            if self.first_frame is None:
+                self.first_frame = now - self.launched_at
+            elif self._seek_start is not None:
+                self.seek_latencies.append(now - self._seek_start)
+            self._seek_start = None
+
+    def on_seek(self, now: float = None):
+        with self._lock:
+            if self.first_frame is not None:
+                self._seek_start = now or time.monotonic()
+
+    def on_paused_for_cache(self, paused: bool, now: float = None):
+        now = now or time.monotonic()
+        with self._lock:
+            if paused and self._stall_start is None and self.first_frame is not None:
+                self._stall_start = now
+                self.stalls += 1
+            elif not paused and self._stall_start is not None:
+                self.stall_seconds += now - self._stall_start
+                self._stall_start = None
+
+    def on_cache_duration(self, seconds):
+        if seconds is None:
+            return
+        with self._lock:
+            self._cache_total += seconds
+            self._cache_samples += 1
+            if self.first_frame is not None:
+                self.cache_min = seconds if self.cache_min is None else min(self.cache_min, seconds)
+
+    def on_cache_speed(self, bytes_per_second):
+        """Download speed while the cache is filling (0 once it is full is not a sample)"""
+        if not bytes_per_second:
+            return
+        with self._lock:
+            self._speed_total += bytes_per_second
+            self._speed_samples += 1
+
+    def on_dropped_frames(self, count):
+        if count is not None:
+            self.dropped_frames = int(count)
+
+    def on_position(self, seconds):
+        if seconds is not None:
+            self.watched_seconds = max(self.watched_seconds, seconds)
+
+    def finish(self, now: float = None):
+        """Close a stall that is still open when playback ends"""
+        self.on_paused_for_cache(False, now)
+
+    @property
+    def cache_avg(self):
+        return round(self._cache_total / self._cache_samples, 2) if self._cache_samples else None
+
+    @property
+    def bandwidth(self):
+        return round(self._speed_total / self._speed_samples) if self._speed_samples else None
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "first_frame": round(self.first_frame, 3) if self.first_frame is not None else None,
+                "stalls": self.stalls,
+                "stall_seconds": round(self.stall_seconds, 2),
+                "cache_avg": self.cache_avg,
+                "cache_min": self.cache_min,
+                "bandwidth": self.bandwidth,
+                "dropped_frames": self.dropped_frames,
+                "seek_latencies": [round(s, 3) for s in self.seek_latencies],
+                "load_error": self.load_error,
+                "watched_seconds": round(self.watched_seconds),
+            }
+
+class Telemetry:
+    """Per-session playback QoE, kept next to the watch history in telemetry.json"""
+
+    def __init__(self, data_dir: Path = None):
+        self.data_dir = Path(data_dir or user_data_dir("rikka", "XeonXE534"))
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.file_path = self.data_dir / "telemetry.json"
+
+        self.logger = get_logger("Telemetry")
+        self._lock = threading.RLock()
+        self.sessions = self.load()
+
+    def load(self):
+        if self.file_path.exists():
+            try:
+                return json.loads(self.file_path.read_text())
+
+            except Exception as e:
+                self.logger.error("Failed to load playback telemetry: %s :/", e)
+
+        return []
+
+    def save(self):
+        tmp_path = self.file_path.with_suffix(".json.tmp")
+        try:
+            with self._lock:
+                tmp_path.write_text(json.dumps(self.sessions))
+                tmp_path.replace(self.file_path)
+
+        except Exception as e:
+            self.logger.error("Failed to save playback telemetry: %s :/", e)
+
+    @staticmethod
+    def entry(url: str, quality, anime_name: str, episode, stats: QoEStats, cache_profile: str = None) -> dict:
+        """Close out the stats of a finished session and build its record, keyed by stream host and quality"""
+        stats.finish()
+        return {
+            "host": stream_host(url),
+            "quality": quality,
+            "cache_profile": cache_profile,
+            "anime_name": anime_name,
+            "episode": episode,
+            "ended": datetime.now().isoformat(timespec="seconds"),
+            **stats.to_dict(),
+        }
+
+    def add(self, *entries: dict):
+        """Append records built by entry() and save them in one write"""
+        if not entries:
+            return
+        with self._lock:
+            self.sessions.extend(entries)
+            del self.sessions[:-MAX_SESSIONS]
+            self.save()
+        for entry in entries:
+            self.logger.debug("Recorded playback telemetry: %s", entry)
+
+    def summary(self) -> list:
+        """Aggregate sessions per (host, quality), worst stall rate first"""
+        with self._lock:
+            sessions = list(self.sessions)
+
+        groups = {}
+        for entry in sessions:
+            groups.setdefault((entry["host"], entry["quality"]), []).append(entry)
+
+        rows = []
+        for (host, quality), entries in groups.items():
+            watched_hours = sum(e["watched_seconds"] for e in entries) / 3600
+            stalls = sum(e["stalls"] for e in entries)
+            seeks = [s for e in entries for s in e["seek_latencies"]]
+            rows.append({
+                "host": host,
+                "quality": quality,
+                "sessions": len(entries),
+                "load_errors": sum(1 for e in entries if e["load_error"]),
+                "first_frame": _mean(e["first_frame"] for e in entries),
+                "stalls": stalls,
+                "stalls_per_hour": round(stalls / watched_hours, 1) if watched_hours else None,
+                "stall_seconds": round(sum(e["stall_seconds"] for e in entries), 1),
+                "cache_avg": _mean(e["cache_avg"] for e in entries),
+                "bandwidth": _mean(e.get("bandwidth") for e in entries),
+                "dropped_frames": sum(e["dropped_frames"] for e in entries),
+                "seek_latency": _mean(seeks),
+            })
+
+        return sorted(rows, key=lambda r: (-(r["stalls_per_hour"] or 0), r["host"]))
+
+    def host_history(self, host: str, limit: int = 10) -> dict:
+        """Bandwidth and stall rate over the latest sessions that loaded from host"""
+        with self._lock:
+            entries = [e for e in reversed(self.sessions) if e["host"] == host and not e["load_error"]][:limit]
+
+        watched_hours = sum(e["watched_seconds"] for e in entries) / 3600
+        stalls = sum(e["stalls"] for e in entries)
+        return {
+            "sessions": len(entries),
+            "bandwidth": _mean(e.get("bandwidth") for e in entries),
+            "stalls_per_hour": round(stalls / watched_hours, 1) if watched_hours else None,
+        }
+
+    def clear(self):
+        with self._lock:
+            self.sessions = []
+            self.save()
@@ -1,10 +1,13 @@
 import json
-from pathlib import Path
+import threading
 from datetime import datetime
+from pathlib import Path
+
 from platformdirs import user_data_dir
 
 from src.rikka.utils.logger import get_logger
 
+
 class WatchHistory:
     def __init__(self):
         self.data_dir = Path(user_data_dir("rikka", "XeonXE534"))
@@ -12,6 +15,8 @@ class WatchHistory:
         self.file_path = self.data_dir / "progress.json"
 
         self.logger = get_logger("WatchHistory")
+        # The progress tracker, mpv's exit callback and UI workers all write here
+        self._lock = threading.RLock()
         self.history = self.load()
 
     def load(self):
@@ -20,41 +25,48 @@ class WatchHistory:
                 return json.loads(self.file_path.read_text())
 
             except Exception as e:
-                self.logger.error("Failed to load watch history: " + str(e) + ":/")
+                self.logger.error("Failed to load watch history: %s :/", e)
                 return {}
 
         return {}
 
     def save(self):
+        """Write history atomically so a concurrent reader never sees a half-written file"""
+        tmp_path = self.file_path.with_suffix(".json.tmp")
         try:
-            self.file_path.write_text(json.dumps(self.history, indent=2))
+            with self._lock:
+                tmp_path.write_text(json.dumps(self.history, indent=2))
+                tmp_path.replace(self.file_path)
 
         except Exception as e:
-            self.logger.error("Failed to save watch history: " + str(e) + ":/")
+            self.logger.error("Failed to save watch history: %s :/", e)
 
     def update_progress(self, anime_id, anime_name, episode, timestamp, total_duration):
         if isinstance(anime_id, int):
-            self.logger.warning(f"Received memory ID for {anime_name}. History might not persist!")
+            self.logger.warning("Received memory ID for %s. History might not persist!", anime_name)
 
         percent = 0
         if total_duration > 0:
             percent = round((timestamp / total_duration) * 100, 1)
 
-        self.history[anime_id] = {
-            "anime_name": anime_name,
-            "episode": episode,
-            "timestamp": timestamp,
-            "total_duration": total_duration,
-            "last_watched": datetime.now().isoformat(),
-            "progress_percent": percent,
-        }
-        self.save()
-        self.logger.debug(f"Updated {anime_name} EP{episode}: {timestamp}s :3")
+        with self._lock:
+            self.history[anime_id] = {
+                "anime_name": anime_name,
+                "episode": episode,
+                "timestamp": timestamp,
+                "total_duration": total_duration,
+                "last_watched": datetime.now().isoformat(),
+                "progress_percent": percent,
+            }
+            self.save()
+        self.logger.debug("Updated %s EP%s: %ss :3", anime_name, episode, timestamp)
 
     def get_continue_watching(self, limit=10):
         active = {}
+        with self._lock:
+            items = list(self.history.items())
 
-        for k, v in self.history.items():
+        for k, v in items:
             if 5 < v["timestamp"] < v["total_duration"] * 0.95:
                 active[k] = v
 
@@ -67,7 +79,10 @@ class WatchHistory:
         return self.history.get(anime_id)
 
     def remove_entry(self, anime_id):
-        if anime_id in self.history:
+        with self._lock:
+            if anime_id not in self.history:
+                return
+
             del self.history[anime_id]
             self.save()
-            self.logger.info(f"Removed {anime_id} from watch history >:3")
\ No newline at end of file
+        self.logger.info("Removed %s from watch history >:3", anime_id)
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""Headless subcommands for scripting. They use AnimeBackend (or the daemon when one runs) and never import Textual."""
+import argparse
+import json
+import sys
+
+from src.rikka.backend.backend import AnimeBackend
+from src.rikka.backend.daemon import DaemonClient, DaemonError, RikkaDaemon, connect
+from src.rikka.backend.records import stream_to_dict
+
+COMMANDS = ("search", "episodes", "play", "resume", "history", "daemon")
+
+def anime_to_dict(anime) -> dict:
+    return {
+        "anime_id": anime.identifier,
+        "name": anime.name,
+        "provider": anime.provider.NAME,
+        "languages": sorted(str(lang) for lang in anime.languages),
+    }
+
+def emit(data):
+    json.dump(data, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+
+def cmd_search(backend: AnimeBackend, args) -> int:
+    results = backend.search_anime(args.query)
+    emit([anime_to_dict(anime) for anime in results])
+    return 0 if results else 1
+
+def cmd_episodes(backend: AnimeBackend, args) -> int:
+    anime = backend.get_anime(args.anime_id)
+    if not anime:
+        emit({"error": f"anime {args.anime_id} not found"})
+        return 1
+
+    episodes = backend.get_episodes(anime)
+    emit({**anime_to_dict(anime), "episodes": episodes})
+    return 0 if episodes else 1
+
+def cmd_play(backend: AnimeBackend, args) -> int:
+    anime = backend.get_anime(args.anime_id)
+    if not anime:
+        emit({"error": f"anime {args.anime_id} not found"})
+        return 1
+
+    quality = args.quality or backend.global_quality
+    stream = backend.get_episode_stream(anime, args.episode, quality)
+    if not stream:
+        emit({"error": f"no stream for episode {args.episode}"})
+        return 1
+
+    output = {**anime_to_dict(anime), "stream": stream_to_dict(stream)}
+    if args.probe:
+        output["status"] = backend.probe_stream(stream)
+
+    emit(output)
+    if args.dry_run:
+        return 0
+
+    if not backend.play_episode(anime, args.episode, stream, start_time=args.start):
+        emit({"error": f"mpv failed to start episode {args.episode}"})
+        return 1
+
+    if not args.detach:
+        # Not only until mpv exits: the final progress is written after that
+        backend.wait_for_playback()
+    return 0
+
+def cmd_resume(backend: AnimeBackend, args) -> int:
+    if args.anime_ids:
+        anime_ids = args.anime_ids
+    else:
+        limit = None if args.all else 1
+        anime_ids = [e["anime_id"] for e in backend.get_continue_watching_list(limit=limit)]
+
+    resolved, output = [], []
+    for anime_id in anime_ids:
+        result = backend.resolve_resume(anime_id, args.quality)
+        if not result:
+            output.append({"anime_id": anime_id, "error": "could not resolve"})
+            continue
+
+        anime, episode, stream, start_time = result
+        resolved.append(result)
+        output.append({
+            **anime_to_dict(anime),
+            "episode": episode,
+            "start_time": start_time,
+            "stream": stream_to_dict(stream),
+        })
+        if args.probe:
+            output[-1]["status"] = backend.probe_stream(stream)
+
+    emit(output)
+    if not args.dry_run:
+        for i, (anime, episode, stream, start_time) in enumerate(resolved):
+            if not backend.play_episode(anime, episode, stream, start_time=start_time):
+                emit({"anime_id": anime.identifier, "error": f"mpv failed to start episode {episode}"})
+                return 1
+            if not args.detach or i < len(resolved) - 1:
+                backend.wait_for_playback()
+
+    return 0 if resolved else 1
+
+def cmd_history(backend: AnimeBackend, args) -> int:
+    emit(backend.get_continue_watching_list(limit=args.limit))
+    return 0
+
+def cmd_daemon(args) -> int:
+    client = DaemonClient()
+    if args.status or args.stop:
+        try:
+            emit(client.call("shutdown" if args.stop else "status"))
+        except DaemonError as e:
+            emit({"error": str(e)})
+            return 1
+        return 0
+
+    try:
+        RikkaDaemon(AnimeBackend()).serve_forever()
+    except DaemonError as e:
+        emit({"error": str(e)})
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="rikka", description="Rikka headless commands (JSON output)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("search", help="Search for anime")
+    p.add_argument("query")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("episodes", help="List episodes of an anime")
+    p.add_argument("anime_id")
+    p.set_defaults(func=cmd_episodes)
+
+    p = sub.add_parser("play", help="Resolve and play an episode")
+    p.add_argument("anime_id")
+    p.add_argument("episode", type=float)
+    p.add_argument("--quality", type=int, default=None)
+    p.add_argument("--start", type=int, default=0, help="Start offset in seconds")
+    p.add_argument("--dry-run", action="store_true", help="Only resolve the stream")
+    p.add_argument("--probe", action="store_true", help="Check the stream URL responds")
+    p.add_argument("--detach", action="store_true", help="Return once mpv starts (the daemon keeps tracking progress)")
+    p.set_defaults(func=cmd_play)
+
+    p = sub.add_parser("resume", help="Resume from watch history")
+    p.add_argument("anime_ids", nargs="*", help="Defaults to the most recent entry")
+    p.add_argument("--all", action="store_true", help="Resume every continue-watching entry in turn")
+    p.add_argument("--quality", type=int, default=None)
+    p.add_argument("--dry-run", action="store_true", help="Only resolve the streams")
+    p.add_argument("--probe", action="store_true", help="Check the stream URLs respond")
+    p.add_argument("--detach", action="store_true", help="Return once the last mpv starts")
+    p.set_defaults(func=cmd_resume)
+
+    p = sub.add_parser("history", help="Show the continue-watching list")
+    p.add_argument("--limit", type=int, default=10)
+    p.set_defaults(func=cmd_history)
+
+    p = sub.add_parser("daemon", help="Run the background daemon (keeps caches and playback tracking alive)")
+    group = p.add_mutually_exclusive_group()
+    group.add_argument("--status", action="store_true", help="Show the running daemon's status")
+    group.add_argument("--stop", action="store_true", help="Stop the running daemon")
+    p.set_defaults(func=None)
+
+    return parser
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if getattr(args, "episode", None) is not None and float(args.episode).is_integer():
+        args.episode = int(args.episode)
+
+    if args.command == "daemon":
+        return cmd_daemon(args)
+
+    backend = connect() or AnimeBackend()
+    try:
+        return args.func(backend, args)
+    finally:
+        backend.close()
@@ -1,10 +1,19 @@
-from textual.screen import Screen
+from typing import TYPE_CHECKING
+
+from textual import work
 from textual.app import ComposeResult
-from textual.widgets import Static, Footer
+from textual.screen import Screen
+from textual.widgets import Static
 
 from src.rikka import CSS_PATH
+from src.rikka.backend.scheduler import Priority
+from src.rikka.screens.footer import Footer
+from src.rikka.utils.profiling import profiled
 
-from anipy_api.anime import Anime
+if TYPE_CHECKING:
+    from anipy_api.anime import Anime
+
+    from src.rikka.backend.backend import AnimeBackend
 
 class AnimeDetailScreen(Screen):
     BINDINGS = [
@@ -13,16 +22,26 @@ class AnimeDetailScreen(Screen):
 
     CSS_PATH = CSS_PATH / "details_styles.css"
 
-    def __init__(self, anime: Anime, synopsis: str):
+    def __init__(self, anime: "Anime", synopsis: str, backend: "AnimeBackend"):
         super().__init__()
         self.anime = anime
         self.synopsis = synopsis
+        self.backend = backend
 
     def compose(self) -> ComposeResult:
-        info = self.anime.get_info()
-        yield Static(info.name, classes='detail_title')
+        yield Static(self.anime.name, id='detail_title', classes='detail_title')
         yield Static(self.synopsis, classes='detail_synopsis')
         yield Footer()
 
+    def on_mount(self):
+        self.load_info()
+
+    @work(exclusive=True, name='InfoWorker')
+    @profiled('InfoWorker')
+    async def load_info(self):
+        info = await self.backend.aio.info(self.anime, priority=Priority.INTERACTIVE)
+        if info and info.name:
+            self.query_one('#detail_title', Static).update(info.name)
+
     def action_go_back(self):
-        self.app.pop_screen()
\ No newline at end of file
+        self.app.pop_screen()
@@ -1,43 +1,117 @@
-from textual.screen import Screen
+from typing import TYPE_CHECKING
+
+from textual import work
 from textual.app import ComposeResult
 from textual.containers import Vertical
-from textual.widgets import Static, Footer, Header, Button
+from textual.screen import Screen
+from textual.widgets import Button, Header, Static
 
 from src.rikka import CSS_PATH
-from src.rikka.backend.backend import AnimeBackend
+from src.rikka.backend.snapshot import CONTINUE_ROWS
+from src.rikka.screens.footer import Footer
+from src.rikka.utils.logger import get_logger
+from src.rikka.utils.profiling import profiled
+
+if TYPE_CHECKING:
+    from src.rikka.backend.backend import AnimeBackend
+
+PREFETCH_LIMIT = 3
 
 class ContinueWatchingScreen(Screen):
+    """Resume list, painted from snapshot rows when given and reconciled with the history once the backend is up"""
     CSS_PATH = CSS_PATH / "continue_watching_styles.css"
     BINDINGS = [
         ("escape", "quit_app", "Quit")
     ]
 
-    def __init__(self, backend: AnimeBackend, **kwargs):
+    def __init__(self, backend: "AnimeBackend" = None, rows: list = None, **kwargs):
         super().__init__(**kwargs)
         self.backend = backend
+        self.rows = rows
+        self._visited = False
+        self.logger = get_logger("ContinueWatchingScreen")
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=False)
         yield Static("Continue Watching", classes="title")
 
-        cont_list = self.backend.get_continue_watching_list(limit=10)
-        if not cont_list:
-            yield Static("No anime to continue watching.", classes="subtitle")
-
-        else:
-            buttons = []
-            for entry in cont_list:
-                percent = entry["progress_percent"]
-                btn_text = f"{entry['anime_name']} EP{entry['episode']} ({percent}%)"
-                buttons.append(Button(btn_text, id=entry["anime_id"]))
-            yield Vertical(*buttons, classes="menu")
+        self._stale = self.rows is not None or self.backend is None
+        if self.rows is None:
+            self.rows = self.backend.get_continue_watching_list(limit=CONTINUE_ROWS) if self.backend else []
 
+        yield Static("No anime to continue watching.", id="cw_empty", classes="subtitle")
+        yield Vertical(*self.build_buttons(self.rows), id="cw_menu", classes="menu")
         yield Footer()
 
+    def build_buttons(self, rows: list) -> list:
+        buttons = []
+        for entry in rows:
+            percent = entry["progress_percent"]
+            btn_text = f"{entry['anime_name']} EP{entry['episode']} ({percent}%)"
+            buttons.append(Button(btn_text, id=entry["anime_id"]))
+        return buttons
+
+    def _toggle_empty(self) -> None:
+        self.query_one("#cw_empty", Static).display = not self.rows
+        self.query_one("#cw_menu", Vertical).display = bool(self.rows)
+
+    def on_mount(self) -> None:
+        self._toggle_empty()
+        self.reconcile()
+
+    def on_screen_resume(self) -> None:
+        """Pooled and shown again: the history has likely moved on since"""
+        if self._visited:
+            self._stale = True
+            self.reconcile()
+        self._visited = True
+
+    async def _get_backend(self) -> "AnimeBackend":
+        if self.backend is None:
+            self.backend = await self.app.get_backend()
+        return self.backend
+
+    @work(exclusive=True, group='reconcile', name='ContinueWatchingWorker')
+    async def reconcile(self) -> None:
+        """Swap snapshot rows for the live list if they differ, then warm the resume caches"""
+        backend = await self._get_backend()
+        if self._stale:
+            rows = await backend.aio.continue_watching(limit=CONTINUE_ROWS)
+            if rows != self.rows:
+                self.rows = rows
+                menu = self.query_one("#cw_menu", Vertical)
+                await menu.remove_children()
+                await menu.mount_all(self.build_buttons(rows))
+                self._toggle_empty()
+            self._stale = False
+
+        self.app.snapshot.set_continue_watching(self.rows)
+        self.prefetch_streams()
+
+    @work(exclusive=True, group='prefetch', name='ResumePrefetchWorker')
+    async def prefetch_streams(self) -> None:
+        await self.backend.aio.prefetch_resume(limit=PREFETCH_LIMIT)
+
     def on_button_pressed(self, event: Button.Pressed) -> None:
-        anime_id = event.button.id
-        self.backend.resume_anime(anime_id)
-        self.app.pop_screen()
+        self.notify("Resuming... :3", timeout=2)
+        self.resume(event.button.id)
+
+    @work(exclusive=True, group='resume', name='ResumeWorker')
+    @profiled('ResumeWorker')
+    async def resume(self, anime_id: str) -> None:
+        backend = await self._get_backend()
+        resolved = await backend.aio.resume(anime_id)
+        if not resolved:
+            self.app.notify("Could not resume this anime :(", severity="error", timeout=3)
+            return
+
+        anime, episode, stream, start_time = resolved
+        await backend.aio.play(anime, episode, stream, start_time)
+        self._close()
+
+    def _close(self) -> None:
+        if self.app.screen is self:
+            self.app.pop_screen()
 
     def action_quit_app(self) -> None:
-        self.app.pop_screen()
\ No newline at end of file
+        self.app.pop_screen()
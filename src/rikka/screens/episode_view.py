@@ -1,26 +1,41 @@
-import time
+from typing import TYPE_CHECKING
 
 from textual import work
-from textual.screen import Screen
 from textual.app import ComposeResult
-from textual.widgets import ListView, ListItem, Static, Footer
+from textual.screen import Screen
+from textual.widgets import ListItem, ListView, Static
 
 from src.rikka import CSS_PATH
-from src.rikka.backend.backend import AnimeBackend
+from src.rikka.screens.footer import Footer
 from src.rikka.utils.logger import get_logger
+from src.rikka.utils.profiling import profiled
+
+if TYPE_CHECKING:
+    from src.rikka.backend.backend import AnimeBackend
+
+PREFETCH_DELAY = 0.6
+MAX_QUEUE = 12
 
 class EpisodeDetailScreen(Screen):
     BINDINGS = [
         ("escape", "go_back", "Go Back"),
+        ("o", "play_alongside", "Play Alongside"),
+        ("space", "toggle_queue", "Mark"),
+        ("r", "queue_range", "Mark Range"),
+        ("p", "play_queue", "Play Queue"),
+        ("c", "clear_queue", "Clear Queue"),
     ]
     CSS_PATH = CSS_PATH / "episode_styles.css"
 
-    def __init__(self, anime, backend: AnimeBackend, **kwargs):
+    def __init__(self, anime, backend: "AnimeBackend", **kwargs):
         super().__init__(**kwargs)
         self.anime = anime
         self.backend = backend
         self.episodes = []
+        self.queued = set()
+        self._anchor = None
         self.logger = get_logger("EpisodeScreen")
+        self._prefetch_timer = None
 
     def compose(self) -> ComposeResult:
         yield Static(self.anime.name, id="title")
@@ -31,31 +46,46 @@ class EpisodeDetailScreen(Screen):
     def on_mount(self):
         self.load_episodes()
 
-    @work(thread=True, exclusive=True, name='EpisodesWorker')
-    def load_episodes(self):
-        self.app.call_from_thread(self._set_loading_text, "Loading episodes... :3")
+    @work(exclusive=True, name='EpisodesWorker')
+    @profiled('EpisodesWorker')
+    async def load_episodes(self):
+        self._set_loading_text("Loading episodes... :3")
 
         episode_list = self.query_one("#episode_list", ListView)
-        self.app.call_from_thread(episode_list.clear)
+        await episode_list.clear()
 
-        self.episodes = self.backend.get_episodes(self.anime)
+        self.episodes = await self.backend.aio.episodes(self.anime)
 
         if not self.episodes:
-            self.app.call_from_thread(
-                episode_list.append,
-                ListItem(Static("No episodes found :("))
-            )
-            self.app.call_from_thread(self._set_loading_text, "")
+            await episode_list.append(ListItem(Static("No episodes found :(")))
+            self._set_loading_text("")
             return
 
-        for idx, ep_num in enumerate(self.episodes):
-            label = f"Ep {ep_num}"
-            item = ListItem(Static(label))
+        items = []
+        for ep_num in self.episodes:
+            item = ListItem(Static(f"Ep {ep_num}"), classes="queued" if ep_num in self.queued else "")
             item.episode_number = ep_num
-            self.app.call_from_thread(episode_list.append, item)
-            time.sleep(0.001)
+            items.append(item)
 
-        self.app.call_from_thread(self._set_loading_text, "")
+        await episode_list.extend(items)
+        self._set_loading_text("")
+
+    def on_list_view_highlighted(self, event: ListView.Highlighted) -> None:
+        """Resolve the stream for an episode the cursor rests on"""
+        if self._prefetch_timer:
+            self._prefetch_timer.stop()
+
+        episode_number = getattr(event.item, "episode_number", None)
+        if episode_number is None:
+            return
+
+        self._prefetch_timer = self.set_timer(
+            PREFETCH_DELAY, lambda: self.prefetch_stream(episode_number)
+        )
+
+    @work(exclusive=True, group='prefetch', name='StreamPrefetchWorker')
+    async def prefetch_stream(self, episode_number) -> None:
+        await self.backend.aio.prefetch_stream(self.anime, episode_number)
 
     def on_list_view_selected(self, event: ListView.Selected) -> None:
         """Handle when a user clicks or presses enter on an episode"""
@@ -66,52 +96,115 @@ class EpisodeDetailScreen(Screen):
 
         self.fetch_and_play(episode_number)
 
-    @work(thread=True)
-    def fetch_and_play(self, episode_number):
-        self.app.call_from_thread(
-            self._set_loading_text,
-            f"Loading episode {episode_number}... :3"
-        )
+    @work(exclusive=True, group='playback', name='PlaybackWorker')
+    @profiled('PlaybackWorker')
+    async def fetch_and_play(self, episode_number, alongside: bool = False):
+        self._set_loading_text(f"Loading episode {episode_number}... :3")
 
-        stream = self.backend.get_episode_stream(
-            self.anime,
-            episode_number,
-            self.backend.global_quality
-        )
+        stream = await self.backend.aio.stream(self.anime, episode_number)
 
         if not stream:
-            self.app.call_from_thread(
-                self.app.notify,
+            self.app.notify(
                 "No stream available for this episode :(",
                 severity="error",
                 timeout=3
             )
-            self.app.call_from_thread(self._set_loading_text, "")
+            self._set_loading_text("")
             return
 
         anime_id = getattr(self.anime, "identifier", None)
         if not anime_id:
-            self.app.call_from_thread(
-                self.app.notify,
-                "Anime has no identifier :/",
-                severity="error"
-            )
-            self.app.call_from_thread(self._set_loading_text, "")
+            self.app.notify("Anime has no identifier :/", severity="error")
+            self._set_loading_text("")
             return
 
-        entry = self.backend.watch_history.get_entry(anime_id)
+        entry = self.backend.get_history_entry(anime_id)
         start_time = 0
         if entry and entry["episode"] == episode_number:
             start_time = entry["timestamp"]
 
-        self.app.call_from_thread(self._set_loading_text, "")
-        self.app.call_from_thread(
-            self.backend.play_episode,
-            self.anime,
-            episode_number,
-            stream,
-            start_time
-        )
+        self._set_loading_text("")
+        await self.backend.aio.play(self.anime, episode_number, stream, start_time, alongside)
+
+    def action_play_alongside(self):
+        """Play the highlighted episode in another mpv, keeping what is playing open"""
+        episode_number = self._highlighted_episode()
+        if episode_number is not None:
+            self.fetch_and_play(episode_number, alongside=True)
+
+    def _highlighted_episode(self):
+        item = self.query_one("#episode_list", ListView).highlighted_child
+        return getattr(item, "episode_number", None)
+
+    def _set_queued(self, episodes: set):
+        self.queued = episodes
+        for item in self.query_one("#episode_list", ListView).children:
+            item.set_class(getattr(item, "episode_number", None) in episodes, "queued")
+
+        if episodes:
+            self._set_loading_text(f"Queue: {len(episodes)} episodes, press p to play :3")
+        else:
+            self._set_loading_text("")
+
+    def action_toggle_queue(self):
+        episode_number = self._highlighted_episode()
+        if episode_number is None:
+            return
+
+        self._anchor = episode_number
+        self._set_queued(self.queued ^ {episode_number})
+
+    def action_queue_range(self):
+        """Mark every episode between the last marked one and the cursor"""
+        episode_number = self._highlighted_episode()
+        if episode_number is None:
+            return
+
+        anchor = self._anchor if self._anchor is not None else episode_number
+        low, high = sorted((anchor, episode_number))
+        self._anchor = episode_number
+        self._set_queued(self.queued | {ep for ep in self.episodes if low <= ep <= high})
+
+    def action_clear_queue(self):
+        self._anchor = None
+        self._set_queued(set())
+
+    def action_play_queue(self):
+        """Play the marked episodes back to back, or binge on from the cursor if none are marked"""
+        if self.queued:
+            episodes = [ep for ep in self.episodes if ep in self.queued]
+        else:
+            episode_number = self._highlighted_episode()
+            if episode_number is None:
+                return
+            episodes = [ep for ep in self.episodes if ep >= episode_number]
+
+        if len(episodes) > MAX_QUEUE:
+            self.app.notify(f"Queueing the first {MAX_QUEUE} episodes :3", timeout=2)
+            episodes = episodes[:MAX_QUEUE]
+
+        self.fetch_and_play_queue(episodes)
+
+    @work(exclusive=True, group='playback', name='QueuePlaybackWorker')
+    @profiled('QueuePlaybackWorker')
+    async def fetch_and_play_queue(self, episodes):
+        self._set_loading_text(f"Loading {len(episodes)} episodes... :3")
+
+        entries = await self.backend.aio.resolve_queue(self.anime, episodes)
+        if not entries:
+            self.app.notify("No streams available for these episodes :(", severity="error", timeout=3)
+            self._set_loading_text("")
+            return
+
+        if len(entries) < len(episodes):
+            self.app.notify(
+                f"{len(episodes) - len(entries)} episodes had no stream, skipping them :/",
+                severity="warning",
+                timeout=3
+            )
+
+        self.action_clear_queue()
+        await self.backend.aio.play_queue(self.anime, entries)
 
     def _set_loading_text(self, text: str):
         self.query_one('#loading_display', Static).update(text)
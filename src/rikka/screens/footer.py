@@ -0,0 +1,14 @@
+from textual.widgets import Footer as TextualFooter
+
+
+class Footer(TextualFooter):
+    """Footer for screens that live for the whole session (Home, pooled screens).
+
+    Textual's Footer data-binds every key it composes to its compact reactive and only
+    drops those watchers when compact changes, so a long-lived footer would keep every
+    key it ever showed. Re-setting compact after a recompose prunes the removed ones.
+    """
+
+    async def recompose(self) -> None:
+        await super().recompose()
+        self.mutate_reactive(TextualFooter.compact)
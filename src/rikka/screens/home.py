@@ -1,13 +1,15 @@
-from textual.screen import Screen
+from textual import work
 from textual.app import ComposeResult
 from textual.containers import Vertical
-from textual.widgets import Static, Footer, Header, Button
+from textual.screen import Screen
+from textual.widgets import Button, Header, Static
 
 from src.rikka import CSS_PATH
+from src.rikka.screens.continue_watching import ContinueWatchingScreen
+from src.rikka.screens.footer import Footer
 from src.rikka.screens.search import SearchScreen
 from src.rikka.screens.settings import SettingsScreen
-from src.rikka.backend.backend import AnimeBackend
-from src.rikka.screens.continue_watching import ContinueWatchingScreen
+
 
 class Home(Screen):
     CSS_PATH = CSS_PATH / "home_styles.css"
@@ -27,10 +29,6 @@ class Home(Screen):
         ("t", "settings", "Settings"),
     ]
 
-    def __init__(self, backend: AnimeBackend, **kwargs):
-        super().__init__(**kwargs)
-        self.backend = backend
-
     def compose(self) -> ComposeResult:
         yield Header(show_clock=False)
         yield Static(self.banner, classes="title")
@@ -47,13 +45,13 @@ class Home(Screen):
     def on_button_pressed(self, event: Button.Pressed) -> None:
         button_id = event.button.id
         if button_id == "search":
-            self.app.push_screen(SearchScreen(self.backend))
+            self.action_search()
 
         elif button_id == "continue":
-            self.app.push_screen(ContinueWatchingScreen(self.backend))
+            self.action_continue()
 
         elif button_id == "settings":
-            self.app.push_screen(SettingsScreen(self.backend))
+            self.action_settings()
 
         elif button_id == "quit":
             self.app.exit()
@@ -62,10 +60,16 @@ class Home(Screen):
         self.app.exit()
 
     def action_search(self) -> None:
-        self.app.push_screen(SearchScreen(self.backend))
+        # Search and continue watching cope with the backend still starting up
+        self.app.screen_pool.open("search", lambda: SearchScreen(self.app.backend))
 
     def action_continue(self) -> None:
-        self.app.push_screen(ContinueWatchingScreen(self.backend))
+        rows = None if self.app.backend else self.app.snapshot.continue_watching
+        self.app.screen_pool.open("continue_watching", lambda: ContinueWatchingScreen(self.app.backend, rows=rows))
 
     def action_settings(self) -> None:
-        self.app.push_screen(SettingsScreen(self.backend))
+        self.open_settings()
+
+    @work(exclusive=True, group='open', name='OpenSettingsWorker')
+    async def open_settings(self) -> None:
+        self.app.push_screen(SettingsScreen(await self.app.get_backend()))
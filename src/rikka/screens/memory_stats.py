@@ -0,0 +1,74 @@
+from textual.app import ComposeResult
+from textual.screen import Screen
+from textual.widgets import DataTable, Footer, Header, Static
+
+from src.rikka import CSS_PATH
+from src.rikka.utils import memory
+
+REFRESH_INTERVAL = 5
+SUMMARY_COLUMNS = ("What", "Value")
+SITE_COLUMNS = ("Allocated at", "KiB", "Blocks")
+
+def _mib(value):
+    return "-" if value is None else f"{value / 1048576:.1f} MiB"
+
+class MemoryStatsScreen(Screen):
+    """Debug view of memory use: RSS, tracemalloc totals and top sites, pooled screens and cache sizes"""
+    CSS_PATH = CSS_PATH / "playback_stats_styles.css"
+    BINDINGS = [
+        ("escape", "go_back", "Back"),
+        ("r", "refresh_stats", "Refresh"),
+        ("t", "toggle_tracing", "Toggle tracing"),
+    ]
+
+    def compose(self) -> ComposeResult:
+        yield Header(show_clock=False)
+        yield Static("Memory", classes="title")
+        yield DataTable(id="memory_summary", zebra_stripes=True)
+        yield Static("Top allocation sites (tracemalloc)", classes="subtitle")
+        yield DataTable(id="memory_sites", zebra_stripes=True)
+        yield Footer()
+
+    def on_mount(self) -> None:
+        self.query_one("#memory_summary", DataTable).add_columns(*SUMMARY_COLUMNS)
+        self.query_one("#memory_sites", DataTable).add_columns(*SITE_COLUMNS)
+        self.load_stats()
+        self.set_interval(REFRESH_INTERVAL, self.load_stats)
+
+    def load_stats(self) -> None:
+        report = memory.usage()
+        rows = [
+            ("RSS", _mib(report["rss"])),
+            ("Tracing", "on" if report["tracing"] else "off (t to start)"),
+            ("Traced now", _mib(report["current"])),
+            ("Traced peak", _mib(report["peak"])),
+        ]
+
+        pool = self.app.screen_pool.stats()
+        rows.append(("Pooled screens", ", ".join(pool["screens"]) or "-"))
+        rows.append(("Screens reused / evicted", f"{pool['reused']} / {pool['evicted']}"))
+
+        memory_stats = getattr(self.app.backend, "memory_stats", None)
+        if memory_stats:
+            rows.extend((name.replace("_", " ").capitalize(), str(value)) for name, value in memory_stats().items())
+
+        summary = self.query_one("#memory_summary", DataTable)
+        summary.clear()
+        summary.add_rows(rows)
+
+        sites = self.query_one("#memory_sites", DataTable)
+        sites.clear()
+        sites.add_rows((site["site"], round(site["size"] / 1024, 1), site["count"]) for site in report["top"])
+
+    def action_refresh_stats(self) -> None:
+        self.load_stats()
+
+    def action_toggle_tracing(self) -> None:
+        if memory.toggle():
+            self.notify("Memory tracing on, it slows things down a little", timeout=3)
+        else:
+            self.notify("Memory tracing off", timeout=2)
+        self.load_stats()
+
+    def action_go_back(self) -> None:
+        self.app.pop_screen()
@@ -0,0 +1,105 @@
+from typing import TYPE_CHECKING
+
+from textual import work
+from textual.app import ComposeResult
+from textual.screen import Screen
+from textual.widgets import DataTable, Footer, Header, Static
+
+from src.rikka import CSS_PATH
+from src.rikka.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from src.rikka.backend.backend import AnimeBackend
+
+SUMMARY_COLUMNS = (
+    "Host", "Quality", "Sessions", "Load errors", "First frame (s)", "Stalls",
+    "Stalls/h", "Stall time (s)", "Avg cache (s)", "KB/s", "Dropped", "Seek (s)",
+)
+RECENT_COLUMNS = (
+    "Ended", "Anime", "EP", "Host", "Quality", "Cache", "First frame (s)", "Stalls", "KB/s", "Dropped", "Error",
+)
+SCHEDULER_COLUMNS = (
+    "Class", "Queued", "Running", "Waiting", "Max queued", "Submitted", "Completed", "Cancelled",
+    "Avg wait (ms)", "Max wait (ms)",
+)
+
+def _cell(value):
+    return "-" if value is None else str(value)
+
+def _kbps(value):
+    return None if value is None else round(value / 1000)
+
+class PlaybackStatsScreen(Screen):
+    """Debug view of the playback telemetry collected from mpv, and of the backend's job scheduler"""
+    CSS_PATH = CSS_PATH / "playback_stats_styles.css"
+    BINDINGS = [
+        ("escape", "go_back", "Back"),
+        ("r", "refresh_stats", "Refresh"),
+    ]
+
+    def __init__(self, backend: "AnimeBackend", **kwargs):
+        super().__init__(**kwargs)
+        self.backend = backend
+        self.logger = get_logger("PlaybackStatsScreen")
+
+    def compose(self) -> ComposeResult:
+        yield Header(show_clock=False)
+        yield Static("Playback Stats", classes="title")
+        yield Static("Per host and quality, worst stall rate first", classes="subtitle")
+        yield DataTable(id="summary_table", zebra_stripes=True)
+        yield Static("Recent sessions", classes="subtitle")
+        yield DataTable(id="recent_table", zebra_stripes=True)
+        yield Static("Scheduler, per priority class", classes="subtitle")
+        yield DataTable(id="scheduler_table", zebra_stripes=True)
+        yield Footer()
+
+    def on_mount(self) -> None:
+        self.query_one("#summary_table", DataTable).add_columns(*SUMMARY_COLUMNS)
+        self.query_one("#recent_table", DataTable).add_columns(*RECENT_COLUMNS)
+        self.query_one("#scheduler_table", DataTable).add_columns(*SCHEDULER_COLUMNS)
+        self.load_stats()
+
+    @work(exclusive=True, group='stats', name='PlaybackStatsWorker')
+    async def load_stats(self) -> None:
+        stats = await self.backend.aio.playback_stats()
+
+        summary = self.query_one("#summary_table", DataTable)
+        summary.clear()
+        summary.add_rows([
+            tuple(_cell(value) for value in (
+                row["host"], row["quality"], row["sessions"], row["load_errors"], row["first_frame"],
+                row["stalls"], row["stalls_per_hour"], row["stall_seconds"], row["cache_avg"],
+                _kbps(row["bandwidth"]), row["dropped_frames"], row["seek_latency"],
+            ))
+            for row in stats["summary"]
+        ])
+
+        recent = self.query_one("#recent_table", DataTable)
+        recent.clear()
+        recent.add_rows([
+            tuple(_cell(value) for value in (
+                entry["ended"], entry["anime_name"], entry["episode"], entry["host"], entry["quality"],
+                entry.get("cache_profile"), entry["first_frame"], entry["stalls"],
+                _kbps(entry.get("bandwidth")), entry["dropped_frames"], entry["load_error"],
+            ))
+            for entry in stats["recent"]
+        ])
+
+        scheduler = self.query_one("#scheduler_table", DataTable)
+        scheduler.clear()
+        scheduler.add_rows([
+            tuple(_cell(value) for value in (
+                name, row["queued"], row["running"], row.get("waiting"), row["max_queued"], row["submitted"],
+                row["completed"], row["cancelled"], row["wait_avg_ms"], row["wait_max_ms"],
+            ))
+            for name, row in stats.get("scheduler", {}).items()
+        ])
+
+        if not stats["summary"]:
+            self.notify("No playback recorded yet :3", timeout=2)
+
+    def action_refresh_stats(self) -> None:
+        self.load_stats()
+
+    def action_go_back(self) -> None:
+        self.app.pop_screen()
@@ -0,0 +1,63 @@
+from collections import OrderedDict
+
+from src.rikka.utils.logger import get_logger
+
+POOL_SIZE = 6
+
+class ScreenPool:
+    """Named screens installed on the app so revisiting one reuses it, state and all.
+
+    At most size screens are kept; past that the least recently opened one that is
+    not on the screen stack is uninstalled and removed.
+    """
+
+    def __init__(self, app, size: int = POOL_SIZE):
+        self.app = app
+        self.size = max(1, size)
+        self.evicted = 0
+        self.reused = 0
+        self.logger = get_logger("ScreenPool")
+        self._names = OrderedDict()
+
+    def get(self, name: str):
+        return self.app.get_screen(name) if name in self._names else None
+
+    def add(self, name: str, screen):
+        """Install screen under name and pool it"""
+        self.app.install_screen(screen, name)
+        self._names[name] = None
+        self._evict()
+        return screen
+
+    def open(self, name: str, factory):
+        """Push the screen pooled under name, building it with factory on the first visit"""
+        screen = self.get(name)
+        if screen is not None and screen in self.app.screen_stack:
+            # Already open further down, a second copy would share its widgets
+            return self.app.push_screen(factory())
+
+        if screen is None:
+            screen = self.add(name, factory())
+        else:
+            self.reused += 1
+            self._names.move_to_end(name)
+        return self.app.push_screen(screen)
+
+    def _evict(self):
+        stack = self.app.screen_stack
+        for name in list(self._names):
+            if len(self._names) <= self.size:
+                break
+
+            screen = self.app.get_screen(name)
+            if screen in stack:
+                continue
+
+            del self._names[name]
+            self.app.uninstall_screen(name)
+            screen.remove()
+            self.evicted += 1
+            self.logger.debug("Evicted pooled screen %s", name)
+
+    def stats(self) -> dict:
+        return {"screens": list(self._names), "reused": self.reused, "evicted": self.evicted}
@@ -1,14 +1,31 @@
+import asyncio
+from typing import TYPE_CHECKING
+
 from textual import work
-from textual.screen import Screen
 from textual.app import ComposeResult
-from textual.widgets import Input, ListView, ListItem, Static, Footer
+from textual.screen import Screen
+from textual.suggester import SuggestFromList
+from textual.widgets import Input, ListItem, ListView, Static
 
 from src.rikka import CSS_PATH
-from src.rikka.utils.general import clean_html
-from src.rikka.utils.logger import get_logger
-from src.rikka.backend.backend import AnimeBackend
+from src.rikka.backend.scheduler import Priority
+from src.rikka.backend.snapshot import RESULTS_PER_SEARCH
 from src.rikka.screens.anime_detail import AnimeDetailScreen
 from src.rikka.screens.episode_view import EpisodeDetailScreen
+from src.rikka.screens.footer import Footer
+from src.rikka.utils.general import clean_html
+from src.rikka.utils.logger import get_logger
+from src.rikka.utils.profiling import profiled
+
+if TYPE_CHECKING:
+    from src.rikka.backend.backend import AnimeBackend
+
+PREFETCH_DELAY = 0.3
+RESULT_CHUNK = 25
+FIRST_PAGE = 20  # restored results composed into the first frame, about a terminal's worth
+
+async def _single_batch(items):
+    yield items
 
 class SearchScreen(Screen):
     BINDINGS = [
@@ -17,68 +34,181 @@ class SearchScreen(Screen):
     ]
     CSS_PATH = CSS_PATH / "search_styles.css"
 
-    def __init__(self, backend: AnimeBackend, **kwargs):
+    def __init__(self, backend: "AnimeBackend" = None, recent: dict = None, **kwargs):
         super().__init__(**kwargs)
         self.backend = backend
+        self.recent = recent
         self.logger = get_logger("SearchScreen")
+        self._prefetch_timer = None
+        self._restoring = []
 
     def compose(self) -> ComposeResult:
-        yield Input(placeholder='Search for anime :3', id='search_input')
-        yield ListView(id='search_results')
+        query, items = "", []
+        if self.recent:
+            query, items = self.recent["query"], self.recent_items(self.recent)
+            self._restoring = items[FIRST_PAGE:]
+
+        suggester = SuggestFromList(self.app.snapshot.queries)
+        yield Input(query, placeholder='Search for anime :3', id='search_input', suggester=suggester)
+        yield ListView(*items[:FIRST_PAGE], id='search_results')
         yield Static('', id='loading_display')
         yield Footer()
 
-    def on_input_submitted(self, event: Input.Submitted) -> None:
+    def on_mount(self) -> None:
+        """The last session's first page of results is composed in, the rest follows after the first paint"""
+        if self.recent:
+            self.call_after_refresh(self.show_recent, self.recent, self._restoring)
+
+    async def _get_backend(self) -> "AnimeBackend":
+        if self.backend is None:
+            self.backend = await self.app.get_backend()
+        return self.backend
+
+    async def on_input_submitted(self, event: Input.Submitted) -> None:
         query = event.input.value.strip()
 
         list_view = self.query_one('#search_results', ListView)
-        list_view.clear()
+        await list_view.clear()
 
-        self.do_search(query)
         if not query:
             list_view.append(ListItem(Static('Anime not found! :/')))
             return
 
-    @work(thread=True, exclusive=True, name='SearchWorker')
-    def do_search(self, query: str) -> None:
-        self.app.call_from_thread(self._set_loading_text, "Searching... :3")
-
-        anime_list = self.backend.search_anime(query)
-        if not anime_list:
-            self.app.call_from_thread(self._set_loading_text, "Anime not found! :/")
-            return
+        recent = self.app.snapshot.find_search(query)
+        if recent:
+            await self.show_recent(recent, self.recent_items(recent))
+        else:
+            self.do_search(query)
+
+    def recent_items(self, recent: dict) -> list:
+        items = []
+        for idx, result in enumerate(recent["results"]):
+            item = self.build_result_item(None, result["title"], result["synopsis"], idx)
+            item.record = result["anime"]
+            items.append(item)
+        return items
+
+    async def show_recent(self, recent: dict, items: list) -> None:
+        """Paint remembered results, then re-run the search in the background to reconcile them"""
+        for start in range(0, len(items), RESULT_CHUNK):
+            await self.flush_results(items[start:start + RESULT_CHUNK])
+        self.do_search(recent["query"], recent=recent["results"])
+
+    @work(exclusive=True, name='SearchWorker')
+    @profiled('SearchWorker')
+    async def do_search(self, query: str, recent: list = None) -> None:
+        backend = await self._get_backend()
+        list_view = self.query_one('#search_results', ListView)
 
-        for idx, anime in enumerate(anime_list):
+        idx = 0
+        pending = []
+        remembered = []
+        if recent:
+            self._set_loading_text("Refreshing... :3")
+            found = await backend.aio.search(query, priority=Priority.VISIBLE)
+            if [a.identifier for a in found[:len(recent)]] == [r["anime"]["identifier"] for r in recent]:
+                for item, anime in zip(list_view.children, found):
+                    item.anime = anime
+                idx = len(recent)
+                remembered = list(recent)
+            else:
+                self.logger.debug("Remembered results for %s are stale, replacing them", query)
+                await list_view.clear()
+            batches = _single_batch(found[idx:])
+        else:
+            self._set_loading_text("Searching... :3")
+            batches = backend.aio.iter_search(query)
 
+        async for batch in batches:
+            tasks = [asyncio.ensure_future(backend.aio.info(anime)) for anime in batch]
             try:
-                info = anime.get_info()
-                title = info.name
-                synopsis = clean_html(info.synopsis)
-                self.app.call_from_thread(self.add_result_item, anime, title, synopsis, idx)
-
-            except Exception as e:
-                self.logger.error(f"Failed to load info for an item: {e}")
+                for anime, task in zip(batch, tasks):
+                    info = await task
+                    if info is None:
+                        self.logger.error("Failed to load info for %s", anime.name)
+                        continue
+
+                    synopsis = clean_html(info.synopsis)
+                    pending.append(self.build_result_item(anime, info.name, synopsis, idx))
+                    if idx < RESULTS_PER_SEARCH:
+                        remembered.append({"anime": backend.anime_to_record(anime), "title": info.name, "synopsis": synopsis})
+                    idx += 1
+                    if len(pending) >= RESULT_CHUNK:
+                        await self.flush_results(pending)
+
+                await self.flush_results(pending)
+
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        if not idx:
+            self._set_loading_text("Anime not found! :/")
+            return
 
-        self.app.call_from_thread(self._set_loading_text, "")
+        self.app.snapshot.add_search(query, remembered)
+        # The screen is pooled, so suggest the new query on the next visit too
+        self.query_one('#search_input', Input).suggester = SuggestFromList(self.app.snapshot.queries)
+        self._set_loading_text("")
 
-    def add_result_item(self, anime, title, synopsis, idx):
-        list_view = self.query_one('#search_results', ListView)
+    def build_result_item(self, anime, title, synopsis, idx) -> ListItem:
         list_item = ListItem(Static(title))
         list_item.index = idx
         list_item.synopsis = synopsis
         list_item.anime = anime
-        list_view.append(list_item)
+        return list_item
+
+    async def flush_results(self, pending: list) -> None:
+        """Mount a chunk of results and yield, so the list paints while the rest hydrates"""
+        if not pending:
+            return
+
+        await self.query_one('#search_results', ListView).extend(pending)
+        pending.clear()
+        await asyncio.sleep(0)
+
+    def on_list_view_highlighted(self, event: ListView.Highlighted) -> None:
+        """Debounce highlights, then warm the caches for the show under the cursor"""
+        if self._prefetch_timer:
+            self._prefetch_timer.stop()
+
+        anime = getattr(event.item, 'anime', None)
+        if anime is None:
+            return
+
+        self._prefetch_timer = self.set_timer(PREFETCH_DELAY, lambda: self.prefetch(anime))
+
+    @work(exclusive=True, group='prefetch', name='PrefetchWorker')
+    async def prefetch(self, anime) -> None:
+        await self.backend.aio.prefetch(anime)
 
     def on_list_view_selected(self, event: ListView.Selected) -> None:
         """Handle when a user clicks or presses enter on a list item"""
-        selected_item = event.item
-        anime = getattr(selected_item, 'anime', None)
+        self.open_item(event.item)
 
+    @work(exclusive=True, group='open', name='OpenResultWorker')
+    async def open_item(self, item: ListItem, synopsis: bool = False) -> None:
+        anime = await self._item_anime(item)
         if anime is None:
-            self.logger.warning(f"Selected item has no anime data attached :/")
+            self.logger.warning("Selected item has no anime data attached :/")
             return
 
-        self.app.push_screen(EpisodeDetailScreen(anime, self.backend))
+        if synopsis:
+            text = getattr(item, 'synopsis', 'No synopsis available.')
+            self.app.screen_pool.open(
+                f"detail:{anime.identifier}", lambda: AnimeDetailScreen(anime, text, self.backend)
+            )
+        else:
+            self.app.screen_pool.open(f"episodes:{anime.identifier}", lambda: EpisodeDetailScreen(anime, self.backend))
+
+    async def _item_anime(self, item: ListItem):
+        """The item's Anime, rebuilt from its snapshot record if the live search has not caught up yet"""
+        anime = getattr(item, 'anime', None)
+        record = getattr(item, 'record', None)
+        if anime is None and record is not None:
+            backend = await self._get_backend()
+            anime = item.anime = backend.anime_from_record(record)
+        return anime
 
     def _set_loading_text(self, text: str):
         self.query_one('#loading_display', Static).update(text)
@@ -95,14 +225,7 @@ class SearchScreen(Screen):
             self.logger.warning("Selected index out of bounds :/")
             return
 
-        selected = children[selected_index]
-        anime = getattr(selected, 'anime', None)
-        synopsis = getattr(selected, 'synopsis', 'No synopsis available.')
-
-        if anime:
-            self.app.push_screen(AnimeDetailScreen(anime, synopsis))
-        else:
-            self.logger.warning("Selected item has no anime data attached :/")
+        self.open_item(children[selected_index], synopsis=True)
 
     def action_go_back(self):
         self.app.pop_screen()
\ No newline at end of file
@@ -1,12 +1,24 @@
+from typing import TYPE_CHECKING
+
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.containers import Container, Horizontal, ScrollableContainer
 from textual.screen import Screen
-from textual.widgets import Static, Footer, Button, Input, Select, Label, SelectionList
+from textual.widgets import Button, Footer, Input, Label, Select, SelectionList, Static
 from textual.widgets.selection_list import Selection
 
 from src.rikka import CSS_PATH
-from src.rikka.backend.backend import AnimeBackend
+from src.rikka.backend.cache_profiles import AUTO, resolve_profiles
+
+LANGUAGE_OPTIONS = [
+    ("Sub, then Dub", "sub,dub"),
+    ("Dub, then Sub", "dub,sub"),
+    ("Sub only", "sub"),
+    ("Dub only", "dub"),
+]
+
+if TYPE_CHECKING:
+    from src.rikka.backend.backend import AnimeBackend
 
 class SettingsScreen(Screen):
     BINDINGS = [
@@ -16,7 +28,7 @@ class SettingsScreen(Screen):
     ]
     CSS_PATH = CSS_PATH / "settings_styles.css"
 
-    def __init__(self, backend: AnimeBackend):
+    def __init__(self, backend: "AnimeBackend"):
         super().__init__()
         self.backend = backend
         self.settings = backend.settings
@@ -37,6 +49,27 @@ class SettingsScreen(Screen):
                     classes="setting-widget"
                 )
 
+                yield Label("Language", classes="section-header")
+                languages = ",".join(self.settings.get("languages") or ["sub", "dub"])
+                options = LANGUAGE_OPTIONS
+                if languages not in (value for _, value in options):
+                    options = options + [(languages.replace(",", ", ").title(), languages)]
+                yield Select(
+                    options=options,
+                    value=languages,
+                    id="language_select",
+                    classes="setting-widget"
+                )
+
+                yield Label("Stream Cache", classes="section-header")
+                profiles = resolve_profiles(self.settings.get("cache_profiles"))
+                yield Select(
+                    options=[("Auto (per host)", AUTO)] + [(name.title(), name) for name in profiles],
+                    value=self.settings.get("cache_profile", AUTO),
+                    id="cache_profile_select",
+                    classes="setting-widget"
+                )
+
                 yield Label("Player Options", classes="section-header")
                 yield SelectionList[str](
                     Selection("Fullscreen Mode", "fullscreen", self.settings.get("fullscreen", True)),
@@ -131,6 +164,8 @@ class SettingsScreen(Screen):
             updates = {}
 
             updates["quality"] = self.query_one("#quality_select", Select).value
+            updates["languages"] = self.query_one("#language_select", Select).value.split(",")
+            updates["cache_profile"] = self.query_one("#cache_profile_select", Select).value
 
             player_options = self.query_one("#player_options", SelectionList)
             updates["fullscreen"] = "fullscreen" in player_options.selected
@@ -146,7 +181,7 @@ class SettingsScreen(Screen):
             updates["minimal_progress_threshold"] = max(0.0, min(100.0, threshold)) / 100.0
 
             self.settings.update_multiple(updates)
-            self.backend.global_quality = updates["quality"]
+            self.backend.reload_settings()
 
             self.modified = False
             self._show_status("✓ Settings saved", "success")
@@ -161,7 +196,7 @@ class SettingsScreen(Screen):
         """Reset all settings to defaults"""
         try:
             self.settings.reset()
-            self.backend.global_quality = self.settings.get("quality", 1080)
+            self.backend.reload_settings()
 
             self.app.pop_screen()
             self.app.push_screen(SettingsScreen(self.backend))
@@ -1,10 +1,21 @@
+import atexit
+import copy
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
 APP_NAME = "Rikka"
+DEFAULT_LEVEL = "INFO"
+
+_queue = None
+_listener = None
+_setup_lock = threading.Lock()
+_module_levels = {}
+_exc_formatter = logging.Formatter()
 
 def get_log_dir() -> Path:
     if sys.platform.startswith("win"):
@@ -14,34 +25,98 @@ def get_log_dir() -> Path:
     base = Path(os.getenv("XDG_STATE_HOME", Path.home() / ".local" / "state"))
     return base / APP_NAME.lower() / "log"
 
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves the log line layout to the listener thread.
+
+    The message is merged with its args here, like the stock handler does, so
+    args mutated after the call still log as they were. Only the formatter
+    (timestamp, level, name) runs on the listener thread.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def parse_levels(spec: str) -> dict:
+    """Parse 'Name=LEVEL,Other=LEVEL' (as in RIKKA_LOG_LEVELS) into a dict"""
+    levels = {}
+    for part in spec.split(","):
+        name, sep, level = part.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def _level_for(name: str) -> int:
+    level = _module_levels.get(name) or os.getenv("RIKKA_LOG_LEVEL", DEFAULT_LEVEL).upper()
+    return getattr(logging, level, logging.INFO)
+
+def _get_queue() -> queue.SimpleQueue:
+    """Start the shared file-writing listener on first use"""
+    global _queue, _listener
+
+    with _setup_lock:
+        if _queue is not None:
+            return _queue
+
+        log_dir = get_log_dir()
+        log_dir.mkdir(parents=True, exist_ok=True)
+
+        formatter = logging.Formatter(
+            "%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+            "%Y-%m-%d %H:%M:%S",
+        )
+
+        fh = RotatingFileHandler(
+            log_dir / "app.log",
+            maxBytes=10*1024*1024,
+            backupCount=5,
+            encoding="utf-8"
+        )
+        fh.setLevel(logging.DEBUG)
+        fh.setFormatter(formatter)
+
+        _queue = queue.SimpleQueue()
+        _listener = QueueListener(_queue, fh, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+        _module_levels.update(parse_levels(os.getenv("RIKKA_LOG_LEVELS", "")))
+        return _queue
+
 def get_logger(name: str = "rikka") -> logging.Logger:
     logger = logging.getLogger(name)
 
     if logger.handlers:
         return logger
 
-    log_level = os.getenv("RIKKA_LOG_LEVEL", "DEBUG").upper()
-    logger.setLevel(getattr(logging, log_level, logging.DEBUG))
+    logger.addHandler(DeferredQueueHandler(_get_queue()))
+    logger.setLevel(_level_for(name))
+    logger.propagate = False
 
-    log_dir = get_log_dir()
-    log_dir.mkdir(parents=True, exist_ok=True)
-    log_path = log_dir / "app.log"
+    return logger
 
-    formatter = logging.Formatter(
-        "%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-        "%Y-%m-%d %H:%M:%S",
-    )
+def configure_log_levels(levels: dict | None):
+    """Apply per-module levels (e.g. from settings), RIKKA_LOG_LEVELS still wins"""
+    _get_queue()
+    env_levels = parse_levels(os.getenv("RIKKA_LOG_LEVELS", ""))
+    _module_levels.update({k: str(v).upper() for k, v in (levels or {}).items()})
+    _module_levels.update(env_levels)
 
-    fh = RotatingFileHandler(
-        log_path,
-        maxBytes=10*1024*1024,
-        backupCount=5,
-        encoding="utf-8"
-    )
-    fh.setLevel(logging.DEBUG)
-    fh.setFormatter(formatter)
-    logger.addHandler(fh)
+    for name in _module_levels:
+        logger = logging.getLogger(name)
+        if logger.handlers:
+            logger.setLevel(_level_for(name))
 
-    logger.propagate = False
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
 
-    return logger
\ No newline at end of file
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
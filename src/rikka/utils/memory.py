@@ -0,0 +1,86 @@
+"""tracemalloc-based memory readout for long TUI sessions.
+
+Tracing slows allocations down, so it is off until RIKKA_TRACE_MEMORY=1 (or
+a frame count, for deeper allocation sites) or until it is switched on from
+the memory screen (F7). The process RSS is reported either way.
+"""
+import os
+import sys
+import tracemalloc
+from pathlib import Path
+
+from src.rikka.utils.logger import get_logger
+
+TOP_SITES = 15
+DEFAULT_FRAMES = 1
+
+logger = get_logger("Memory")
+
+def _env_frames():
+    value = os.getenv("RIKKA_TRACE_MEMORY", "").strip().lower()
+    if value in ("", "0", "false", "no", "off"):
+        return None
+    return int(value) if value.isdigit() else DEFAULT_FRAMES
+
+def start(frames: int = DEFAULT_FRAMES):
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+        logger.info("Memory tracing on (%s frames)", frames)
+
+def stop():
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+        logger.info("Memory tracing off")
+
+def is_tracing() -> bool:
+    return tracemalloc.is_tracing()
+
+def toggle() -> bool:
+    """Flip tracing on/off, returns the new state"""
+    if is_tracing():
+        stop()
+    else:
+        start()
+    return is_tracing()
+
+def rss_bytes():
+    """Resident set size of this process, None where it cannot be read"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # Peak, not current, but the best there is without /proc (kB on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def _site(trace) -> str:
+    frame = trace.traceback[0]
+    return f"{Path(frame.filename).name}:{frame.lineno}"
+
+def usage(top: int = TOP_SITES) -> dict:
+    """Current/peak traced memory, RSS and the biggest allocation sites by line"""
+    report = {"tracing": is_tracing(), "rss": rss_bytes(), "current": None, "peak": None, "top": []}
+    if not report["tracing"]:
+        return report
+
+    report["current"], report["peak"] = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    report["top"] = [
+        {"site": _site(stat), "size": stat.size, "count": stat.count}
+        for stat in snapshot.statistics("lineno")[:top]
+    ]
+    return report
+
+_frames = _env_frames()
+if _frames:
+    start(_frames)
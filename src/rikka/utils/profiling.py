@@ -0,0 +1,201 @@
+"""Opt-in profiling for workers and backend calls.
+
+Enable with RIKKA_PROFILE=sample (or 1) for a sampling profiler over every
+thread, or RIKKA_PROFILE=cprofile for a deterministic profile of the calling
+thread. The TUI can also toggle sampling at runtime. Reports land in
+<log dir>/profiles: sampled runs as folded stacks (flamegraph.pl / speedscope),
+cProfile runs as .prof files plus a text summary.
+"""
+import cProfile
+import functools
+import inspect
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from src.rikka.utils.logger import get_log_dir, get_logger
+
+SAMPLE = "sample"
+CPROFILE = "cprofile"
+SAMPLE_INTERVAL = 0.005
+
+_mode = os.getenv("RIKKA_PROFILE", "").strip().lower() or None
+if _mode in ("1", "true", "yes", "on"):
+    _mode = SAMPLE
+elif _mode not in (SAMPLE, CPROFILE):
+    _mode = None
+
+_active_lock = threading.Lock()
+_sampling_active = False
+_cprofile_lock = threading.Lock()
+logger = get_logger("Profiling")
+
+def get_profile_dir() -> Path:
+    return get_log_dir() / "profiles"
+
+def is_enabled() -> bool:
+    return _mode is not None
+
+def set_mode(mode: str | None):
+    """Switch profiling to SAMPLE, CPROFILE or off (None)"""
+    global _mode
+    _mode = mode
+    logger.info("Profiling mode set to %s", mode or "off")
+
+def toggle() -> bool:
+    """Flip sampling on/off, returns the new enabled state"""
+    set_mode(None if is_enabled() else SAMPLE)
+    return is_enabled()
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+class StackSampler:
+    """Samples the stacks of every other thread, rooted at the thread name."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rikka-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write_folded(self, path: Path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+def _report_path(action: str, suffix: str) -> Path:
+    out_dir = get_profile_dir()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return out_dir / f"{stamp}-{action}{suffix}"
+
+@contextmanager
+def _sampled(action: str):
+    global _sampling_active
+
+    with _active_lock:
+        if _sampling_active:
+            owner = False
+        else:
+            _sampling_active = owner = True
+
+    if not owner:
+        # Another action is already sampling every thread, this one shows up in it
+        yield
+        return
+
+    sampler = StackSampler()
+    start = time.perf_counter()
+    sampler.start()
+    try:
+        yield
+    finally:
+        sampler.stop()
+        with _active_lock:
+            _sampling_active = False
+
+        path = _report_path(action, ".folded")
+        sampler.write_folded(path)
+        logger.info(
+            "Profiled %s: %.3fs, %s samples -> %s",
+            action, time.perf_counter() - start, sampler.samples, path
+        )
+
+@contextmanager
+def _deterministic(action: str):
+    # Only one cProfile may be enabled per process (3.12+ raises otherwise),
+    # overlapping actions and nested ones run unprofiled
+    if not _cprofile_lock.acquire(blocking=False):
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Some other tool already holds the profiling hook
+        _cprofile_lock.release()
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _cprofile_lock.release()
+
+        try:
+            path = _report_path(action, ".prof")
+            profiler.dump_stats(path)
+            with open(path.with_suffix(".txt"), "w", encoding="utf-8") as f:
+                pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(40)
+            logger.info("Profiled %s: %.3fs -> %s", action, time.perf_counter() - start, path)
+        except OSError as e:
+            logger.warning("Could not write the %s profile: %s :/", action, e)
+
+@contextmanager
+def profile(action: str):
+    """Profile the enclosed block as one action, a no-op unless profiling is enabled"""
+    if _mode == SAMPLE:
+        with _sampled(action):
+            yield
+
+    elif _mode == CPROFILE:
+        with _deterministic(action):
+            yield
+
+    else:
+        yield
+
+def profiled(action: str):
+    """Decorator form of profile(), works for plain and async functions"""
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with profile(action):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with profile(action):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,43 @@
+import os
+import time
+
+import pytest
+
+from benchmarks.fakes import FakeProvider, install_fake_mpv
+from src.rikka import cli
+from src.rikka.backend.backend import AnimeBackend
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    for var in ("XDG_CACHE_HOME", "XDG_CONFIG_HOME", "XDG_DATA_HOME", "XDG_STATE_HOME", "XDG_RUNTIME_DIR"):
+        monkeypatch.setenv(var, str(tmp_path / var.lower()))
+    monkeypatch.setenv("PATH", os.environ["PATH"])
+    monkeypatch.setenv("RIKKA_FAKE_MPV_PLAY", "0.3")
+    install_fake_mpv()
+
+    backend = AnimeBackend(providers=[FakeProvider(results=1)])
+    backend.fullscreen = False
+    yield backend
+    backend.close()
+
+
+def test_play_saves_final_progress_before_returning(backend, monkeypatch):
+    anime = backend.search_anime("cli")[0]
+
+    # A slow history write: cmd_play must wait for it, not just for mpv to exit
+    update_progress = backend.watch_history.update_progress
+
+    def slow_update_progress(*args, **kwargs):
+        time.sleep(0.5)
+        return update_progress(*args, **kwargs)
+
+    monkeypatch.setattr(backend.watch_history, "update_progress", slow_update_progress)
+
+    args = cli.build_parser().parse_args(["play", anime.identifier, "3"])
+    assert cli.cmd_play(backend, args) == 0
+
+    entry = backend.watch_history.get_entry(anime.identifier)
+    assert entry is not None
+    assert entry["episode"] == 3
+    assert not backend.player_running()